@@ -0,0 +1,62 @@
+"""add indexes from database_schema.sql
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (索引名, 表, 列)；与 database_schema.sql 对应，SQLite 中索引名全库唯一，因此带表名前缀
+INDEXES = [
+    ('ix_users_role_id', 'users', ['role_id']),
+    ('ix_users_email', 'users', ['email']),
+    ('ix_courses_teacher_id', 'courses', ['teacher_id']),
+    ('ix_courses_category_id', 'courses', ['category_id']),
+    ('ix_courses_is_active', 'courses', ['is_active']),
+    ('ix_course_sections_course_order', 'course_sections', ['course_id', 'order_index']),
+    ('ix_course_enrollments_student_id', 'course_enrollments', ['student_id']),
+    ('ix_course_enrollments_status', 'course_enrollments', ['status']),
+    ('ix_tasks_course_id', 'tasks', ['course_id']),
+    ('ix_tasks_teacher_id', 'tasks', ['teacher_id']),
+    ('ix_tasks_type', 'tasks', ['type']),
+    ('ix_tasks_deadline', 'tasks', ['deadline']),
+    ('ix_submissions_student_id', 'submissions', ['student_id']),
+    ('ix_submissions_status', 'submissions', ['status']),
+    ('ix_submissions_submitted_at', 'submissions', ['submitted_at']),
+    ('ix_announcements_created_by', 'announcements', ['created_by']),
+    ('ix_announcements_created_at', 'announcements', ['created_at']),
+    ('ix_announcements_is_active', 'announcements', ['is_active']),
+    ('ix_operation_logs_user_id', 'operation_logs', ['user_id']),
+    ('ix_operation_logs_created_at', 'operation_logs', ['created_at']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False, if_not_exists=True)
+
+    # 并发提交可能留下同一 (task_id, student_id) 的多条记录，建唯一索引前只保留最新一条
+    op.execute(sa.text(
+        "DELETE FROM submissions WHERE id NOT IN ("
+        "SELECT keep_id FROM (SELECT MAX(id) AS keep_id FROM submissions GROUP BY task_id, student_id) AS latest)"
+    ))
+    op.create_index('uq_submissions_task_student', 'submissions', ['task_id', 'student_id'], unique=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_submissions_task_student', table_name='submissions')
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
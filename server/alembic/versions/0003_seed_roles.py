@@ -0,0 +1,46 @@
+"""seed roles
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ROLES = [
+    {'id': 1, 'name': 'student', 'description': 'Student role'},
+    {'id': 2, 'name': 'teacher', 'description': 'Teacher role'},
+    {'id': 3, 'name': 'admin', 'description': 'Admin role'},
+]
+
+roles = sa.table(
+    'roles',
+    sa.column('id', sa.Integer),
+    sa.column('name', sa.String),
+    sa.column('description', sa.String),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 幂等：旧版本启动时已经写入过角色的库只补缺失的行
+    existing = set(op.get_bind().execute(sa.select(roles.c.id)).scalars())
+    missing = [role for role in ROLES if role['id'] not in existing]
+    if missing:
+        op.bulk_insert(roles, missing)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # 用户通过 role_id 引用角色，回退时保留数据
+    pass
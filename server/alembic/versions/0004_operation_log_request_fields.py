@@ -0,0 +1,68 @@
+"""operation log request fields
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# SQLite 中 create_all 建出的外键没有名字；批量模式按此约定为反射到的外键命名后才能删除
+NAMING_CONVENTION = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+FK_NAME = 'fk_operation_logs_user_id_users'
+
+
+def _columns():
+    return [
+        sa.Column('method', sa.String(length=10), nullable=True),
+        sa.Column('route', sa.String(length=255), nullable=True),
+        sa.Column('status_code', sa.Integer(), nullable=True),
+        sa.Column('duration_ms', sa.Float(), nullable=True),
+    ]
+
+
+def _user_fk(inspector):
+    return next(
+        (fk for fk in inspector.get_foreign_keys('operation_logs') if fk['constrained_columns'] == ['user_id']),
+        None,
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 原地修改（SQLite 下 batch 模式建新表并复制数据），保留已有日志；
+    # 按当前模型 create_all 建出的旧库已有这些列和外键，跳过
+    inspector = sa.inspect(op.get_bind())
+    existing = {column['name'] for column in inspector.get_columns('operation_logs')}
+    fk = _user_fk(inspector)
+    with op.batch_alter_table('operation_logs', naming_convention=NAMING_CONVENTION) as batch_op:
+        for column in _columns():
+            if column.name not in existing:
+                batch_op.add_column(column)
+        # 删除用户时保留其操作日志，user_id 置空
+        if fk is None or (fk.get('options') or {}).get('ondelete', '').upper() != 'SET NULL':
+            if fk is not None:
+                batch_op.drop_constraint(fk['name'] or FK_NAME, type_='foreignkey')
+            batch_op.create_foreign_key(FK_NAME, 'users', ['user_id'], ['id'], ondelete='SET NULL')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    fk = _user_fk(sa.inspect(op.get_bind()))
+    with op.batch_alter_table('operation_logs', naming_convention=NAMING_CONVENTION) as batch_op:
+        if fk is not None:
+            batch_op.drop_constraint(fk['name'] or FK_NAME, type_='foreignkey')
+        batch_op.create_foreign_key(FK_NAME, 'users', ['user_id'], ['id'])
+        for column in reversed(_columns()):
+            batch_op.drop_column(column.name)
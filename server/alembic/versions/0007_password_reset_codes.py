@@ -0,0 +1,36 @@
+"""password reset codes
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, Sequence[str], None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 按当前模型 create_all 建出的旧库、以及早先版本的 0001 已经建过此表，if_not_exists 跳过
+    op.create_table('password_reset_codes',
+    sa.Column('email', sa.String(length=100), nullable=False),
+    sa.Column('code', sa.String(length=6), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('email'),
+    if_not_exists=True,
+    )
+    op.create_index('ix_password_reset_codes_expires_at', 'password_reset_codes', ['expires_at'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('password_reset_codes')
@@ -0,0 +1,44 @@
+"""backfill grading counters
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0011'
+down_revision: Union[str, Sequence[str], None] = '0010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 之后计数行随课程插入，调整和读取都不再按需计算：为还没有计数行的课程按 submissions 表补齐，
+    # 口径与 app/crud/grading_counters.py 相同（submitted / late 且学生在读）
+    op.execute(sa.text(
+        """
+        INSERT INTO grading_counters (course_id, pending)
+        SELECT c.id, (
+            SELECT COUNT(s.id)
+            FROM submissions s
+            JOIN tasks t ON t.id = s.task_id
+            JOIN course_enrollments e ON e.course_id = t.course_id AND e.student_id = s.student_id
+            WHERE t.course_id = c.id AND s.status IN ('submitted', 'late') AND e.status = 'active'
+        )
+        FROM courses c
+        WHERE NOT EXISTS (SELECT 1 FROM grading_counters g WHERE g.course_id = c.id)
+        """
+    ))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # 补齐的计数行与增量维护的行无法区分，回退时保留
+    pass
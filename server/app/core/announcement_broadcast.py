@@ -0,0 +1,209 @@
+"""
+公告邮件群发：把选课学生批量写入邮件发件箱，由 email_outbox 的发送器复用 SMTP 连接投递。
+
+群发在后台任务中进行，HTTP 请求只创建 announcement_broadcasts 记录。收件人按 users.id
+做键集分页，每批在同一个事务里写入发件箱并推进 last_student_id 断点，因此重启后从断点继续，
+不会重复也不会遗漏；推进断点用带条件的 UPDATE，多个 worker 同时处理同一任务时只有一个能提交。
+"""
+import asyncio
+import logging
+from typing import Callable, Optional
+
+from sqlalchemy import insert, select, update
+
+from app.core.config import settings
+from app.core.email import personalize, render_announcement_email
+from app.core.email_outbox import email_outbox_sender
+from app.core.time_utils import get_now
+from app.db.session import SessionLocal
+from app.models import (
+    Announcement,
+    AnnouncementBroadcast,
+    BroadcastStatus,
+    CourseEnrollment,
+    EmailOutbox,
+    EmailStatus,
+    EnrollmentStatus,
+    User,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def recipients_query(course_id: Optional[int], after_student_id: int, limit: int):
+    """在读（或指定课程中）的有效学生，只取发信需要的列，按 id 升序。"""
+    enrolled = select(CourseEnrollment.id).where(
+        CourseEnrollment.student_id == User.id,
+        CourseEnrollment.status == EnrollmentStatus.ACTIVE,
+    )
+    if course_id is not None:
+        enrolled = enrolled.where(CourseEnrollment.course_id == course_id)
+    return (
+        select(User.id, User.email, User.full_name, User.username)
+        .where(
+            User.id > after_student_id,
+            User.is_active.is_(True),
+            User.email.is_not(None),
+            User.email != "",
+            enrolled.exists(),
+        )
+        .order_by(User.id)
+        .limit(limit)
+    )
+
+
+class AnnouncementBroadcaster:
+    def __init__(
+        self,
+        session_factory,
+        batch_size: int = 500,
+        poll_seconds: float = 5,
+        on_enqueued: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self._session_factory = session_factory
+        self._batch_size = batch_size
+        self._poll_seconds = poll_seconds
+        self._on_enqueued = on_enqueued
+        self._templates: dict[int, tuple[str, str]] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def notify(self) -> None:
+        self._wakeup.set()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.process_pending()
+            except Exception as e:
+                logger.error(f"Announcement broadcast failed: {e}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def process_pending(self) -> int:
+        """处理所有未完成的群发任务，返回本次写入发件箱的邮件数。"""
+        async with self._session_factory() as session:
+            result = await session.execute(
+                select(AnnouncementBroadcast.id)
+                .where(AnnouncementBroadcast.status == BroadcastStatus.PENDING)
+                .order_by(AnnouncementBroadcast.id)
+            )
+            broadcast_ids = list(result.scalars().all())
+
+        total = 0
+        for broadcast_id in broadcast_ids:
+            while True:
+                enqueued = await self.advance(broadcast_id)
+                if enqueued is None:
+                    break
+                total += enqueued
+                await asyncio.sleep(0)  # 让出事件循环，发送器可以同时投递已入队的邮件
+        return total
+
+    async def _template(self, session, broadcast: AnnouncementBroadcast) -> Optional[tuple[str, str]]:
+        template = self._templates.get(broadcast.id)
+        if template is None:
+            announcement = await session.get(Announcement, broadcast.announcement_id)
+            if announcement is None:
+                return None
+            template = render_announcement_email(announcement.title, announcement.content)
+            self._templates[broadcast.id] = template
+        return template
+
+    async def _finish(self, session, broadcast_id: int, previous: int) -> None:
+        await session.execute(
+            update(AnnouncementBroadcast)
+            .where(AnnouncementBroadcast.id == broadcast_id, AnnouncementBroadcast.last_student_id == previous)
+            .values(status=BroadcastStatus.DONE, finished_at=get_now())
+        )
+        await session.commit()
+        self._templates.pop(broadcast_id, None)
+
+    async def advance(self, broadcast_id: int) -> Optional[int]:
+        """
+        写入下一批收件人，返回写入条数；任务已完成（或被其他 worker 抢先推进）时返回 None。
+        """
+        async with self._session_factory() as session:
+            broadcast = await session.get(AnnouncementBroadcast, broadcast_id)
+            if broadcast is None or broadcast.status != BroadcastStatus.PENDING:
+                return None
+            previous = broadcast.last_student_id
+
+            template = await self._template(session, broadcast)
+            if template is None:
+                logger.warning(f"Announcement {broadcast.announcement_id} is gone, dropping broadcast {broadcast_id}")
+                await self._finish(session, broadcast_id, previous)
+                return None
+            subject, html_template = template
+
+            result = await session.execute(recipients_query(broadcast.course_id, previous, self._batch_size))
+            recipients = result.all()
+            if not recipients:
+                await self._finish(session, broadcast_id, previous)
+                return None
+
+            now = get_now()
+            await session.execute(
+                insert(EmailOutbox),
+                [
+                    {
+                        "to_email": email,
+                        "subject": subject,
+                        "html_body": personalize(html_template, full_name or username),
+                        "status": EmailStatus.PENDING,
+                        "attempts": 0,
+                        "next_attempt_at": now,
+                        "broadcast_id": broadcast_id,
+                    }
+                    for _, email, full_name, username in recipients
+                ],
+            )
+            values = {
+                "last_student_id": recipients[-1].id,
+                "enqueued": AnnouncementBroadcast.enqueued + len(recipients),
+            }
+            if len(recipients) < self._batch_size:
+                values.update(status=BroadcastStatus.DONE, finished_at=now)
+            advanced = await session.execute(
+                update(AnnouncementBroadcast)
+                .where(
+                    AnnouncementBroadcast.id == broadcast_id,
+                    AnnouncementBroadcast.last_student_id == previous,
+                    AnnouncementBroadcast.status == BroadcastStatus.PENDING,
+                )
+                .values(**values)
+            )
+            if advanced.rowcount != 1:
+                await session.rollback()
+                return None
+            await session.commit()
+
+        if len(recipients) < self._batch_size:
+            self._templates.pop(broadcast_id, None)
+        if self._on_enqueued is not None:
+            self._on_enqueued()
+        return len(recipients)
+
+
+announcement_broadcaster = AnnouncementBroadcaster(
+    SessionLocal,
+    batch_size=settings.ANNOUNCEMENT_EMAIL_BATCH_SIZE,
+    poll_seconds=settings.EMAIL_OUTBOX_POLL_SECONDS,
+    on_enqueued=email_outbox_sender.notify,
+)
@@ -2,6 +2,7 @@ from pydantic_settings import BaseSettings
 from typing import Optional
 import os
 from pathlib import Path
+import tempfile
 
 # 获取项目根目录
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
@@ -13,12 +14,85 @@ class Settings(BaseSettings):
     # Database
     # 默认使用 SQLite，如果 .env 中配置了 DATABASE_URL 则使用 MySQL
     DATABASE_URL: str = "sqlite+aiosqlite:///./sql_app.db"
+    # 启动时表结构落后于 alembic head 则自动迁移；多 worker 部署时关闭，在发布步骤执行 alembic upgrade head
+    DB_AUTO_MIGRATE: bool = True
+    # 只读从库：为空时所有读请求走主库；写过主库的用户在 PIN_SECONDS 内读主库，从库延迟超过 MAX_LAG 时回退主库
+    DATABASE_REPLICA_URL: str = ""
+    REPLICA_PIN_SECONDS: float = 5
+    REPLICA_MAX_LAG_SECONDS: float = 5
+    REPLICA_CHECK_SECONDS: float = 1
+    # 连接池：常驻连接数、允许额外创建的连接数、取连接的最长等待秒数；WARMUP 为启动时预建的连接数
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 3600
+    DB_POOL_WARMUP: int = 0
+    # SQLite 生产模式：WAL + PRAGMA 调优，读连接池 + 单写连接（仅 DATABASE_URL 为 SQLite 时生效）
+    SQLITE_PRODUCTION_MODE: bool = False
+    SQLITE_READ_POOL_SIZE: int = 4
+    SQLITE_CACHE_SIZE_KB: int = 65536
+    SQLITE_MMAP_SIZE: int = 268435456
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    # 是否把每条 SQL 打印到日志（开销较大，仅用于本地调试）
+    SQL_ECHO: bool = False
+    # 慢查询记录：超过阈值的语句全部记录，其余按 SAMPLE_RATE 抽样；LOG_PATH 非空时同时追加写入 JSONL
+    SLOW_QUERY_LOG_ENABLED: bool = True
+    SLOW_QUERY_THRESHOLD_MS: float = 200
+    SLOW_QUERY_SAMPLE_RATE: float = 0.0
+    SLOW_QUERY_BUFFER_SIZE: int = 500
+    SLOW_QUERY_LOG_PATH: str = ""
+    # 按请求统计 SQL 条数；同一语句在一个请求中执行不少于 N_PLUS_ONE_THRESHOLD 次记为疑似 N+1
+    QUERY_COUNTER_ENABLED: bool = True
+    N_PLUS_ONE_THRESHOLD: int = 5
+    # 操作日志：请求记录先进内存缓冲区，攒够 BATCH_SIZE 条或每隔 FLUSH_MS 毫秒批量写入；缓冲区满时丢弃并计数
+    OPERATION_LOG_ENABLED: bool = True
+    OPERATION_LOG_BATCH_SIZE: int = 200
+    OPERATION_LOG_FLUSH_MS: float = 1000
+    OPERATION_LOG_BUFFER_SIZE: int = 10000
+    # Prometheus 指标（GET /metrics），需携带 Authorization: Bearer <METRICS_TOKEN>；未设置 METRICS_TOKEN 时返回 503
+    METRICS_ENABLED: bool = False
+    METRICS_TOKEN: str = ""
+    # 事件循环延迟监控：每 INTERVAL_MS 测一次调度延迟，超过 THRESHOLD_MS 时记录阻塞代码的调用栈和路由
+    LOOP_MONITOR_ENABLED: bool = True
+    LOOP_LAG_INTERVAL_MS: float = 100
+    LOOP_LAG_THRESHOLD_MS: float = 100
+    LOOP_LAG_MAX_REPORTS: int = 100
+    # 按请求采样分析：管理员请求带 PROFILER_HEADER 头时启用；同时分析的请求数上限、采样间隔、保存的结果数
+    PROFILER_ENABLED: bool = True
+    PROFILER_HEADER: str = "X-Profile"
+    PROFILER_MAX_CONCURRENT: int = 2
+    PROFILER_SAMPLE_INTERVAL_MS: float = 1
+    PROFILER_MAX_STORED: int = 50
+    # 链路追踪：按 TRACE_SAMPLE_RATE 抽样（请求带 traceparent 头时沿用其采样标记），保存最近 TRACE_MAX_STORED 条；
+    # TRACE_EXPORT_PATH 非空时另外追加写入该 JSONL 文件
+    TRACING_ENABLED: bool = True
+    TRACE_SAMPLE_RATE: float = 0.01
+    TRACE_MAX_STORED: int = 200
+    TRACE_EXPORT_PATH: str = ""
+    # 写 TRACE_EXPORT_PATH 时，客户端通过 traceparent 强制采样的请求每分钟最多这么多条
+    TRACE_FORCED_SAMPLES_PER_MINUTE: int = 60
     
     # Security
     SECRET_KEY: str = "CHANGE_THIS_TO_A_SECURE_SECRET_KEY"  # 请在生产环境中修改
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
-    
+
+    # 认证用户缓存（get_current_principal 使用），TTL 为 0 时关闭
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    # 已验证 JWT 的 claims 缓存容量，0 表示关闭
+    TOKEN_CACHE_MAX_ENTRIES: int = 10000
+    # 学生待完成作业数缓存（/student/pending-tasks-count 使用），TTL 为 0 时关闭
+    PENDING_TASK_CACHE_TTL_SECONDS: float = 30
+    PENDING_TASK_CACHE_MAX_ENTRIES: int = 10000
+
+    # bcrypt 线程池：WORKERS 为 0 时在事件循环中同步计算；排队超过 MAX_QUEUE 时返回 429
+    PASSWORD_HASH_WORKERS: int = min(4, os.cpu_count() or 1)
+    PASSWORD_HASH_MAX_QUEUE: int = 64
+    # bcrypt 工作因子，可用 scripts/calibrate_bcrypt.py 按目标耗时标定；旧因子的哈希在登录成功后后台重算
+    BCRYPT_ROUNDS: int = 12
+
     # Email / SMTP Configuration
     SMTP_HOST: str = "smtp.gmail.com"  # 或使用 smtp.qq.com, smtp.163.com 等
     SMTP_PORT: int = 587
@@ -28,8 +102,26 @@ class Settings(BaseSettings):
     FROM_EMAIL: str = ""  # 发件人邮箱（通常与 SMTP_USER 相同）
     FROM_NAME: str = "USTC数据库学习平台"
     
+    # 密码重置验证码存储：memory（单 worker）、sql（数据库表，多主机共享）、file（单机多 worker 共享）
+    PASSWORD_RESET_BACKEND: str = "memory"
+    PASSWORD_RESET_TTL_MINUTES: int = 10
+    PASSWORD_RESET_MAX_ENTRIES: int = 10000
+    PASSWORD_RESET_SWEEP_SECONDS: float = 60
+    PASSWORD_RESET_FILE_PATH: str = os.path.join(
+        "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "ustc-password-reset.json"
+    )
+
+    # 邮件发件箱：后台发送器复用的 SMTP 连接数（即并发上限）、每批条数、重试次数与退避
+    EMAIL_OUTBOX_SMTP_CONNECTIONS: int = 2
+    EMAIL_OUTBOX_BATCH_SIZE: int = 50
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 5
+    EMAIL_OUTBOX_RETRY_BASE_SECONDS: float = 30
+    EMAIL_OUTBOX_POLL_SECONDS: float = 5
+    # 公告群发每批写入发件箱的收件人数（同时也是断点粒度）
+    ANNOUNCEMENT_EMAIL_BATCH_SIZE: int = 500
+
     # Development mode - skip actual email sending
-    DEV_MODE: bool = True  # 开发模式：不实际发送邮件，直接返回验证码
+    DEV_MODE: bool = True  # 开发模式：不实际发送邮件，直接返回验证码；响应带 Server-Timing（SQL 条数与耗时）
     
     class Config:
         case_sensitive = True
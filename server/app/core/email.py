@@ -1,4 +1,6 @@
+import html
 import smtplib
+from email.header import Header
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from typing import Optional
@@ -8,46 +10,12 @@ from app.core.config import settings
 logger = logging.getLogger(__name__)
 
 
-class EmailService:
-    def __init__(self):
-        self.smtp_host = settings.SMTP_HOST
-        self.smtp_port = settings.SMTP_PORT
-        self.smtp_user = settings.SMTP_USER
-        self.smtp_password = settings.SMTP_PASSWORD
-        self.from_email = settings.FROM_EMAIL
-        self.from_name = settings.FROM_NAME
-
-    def send_verification_code(self, to_email: str, code: str, purpose: str = "密码重置") -> bool:
-        """
-        发送验证码邮件
-        
-        Args:
-            to_email: 收件人邮箱
-            code: 验证码
-            purpose: 验证码用途（如 "密码重置"、"邮箱验证" 等）
-        
-        Returns:
-            bool: 发送是否成功
-        """
-    def send_verification_code(self, to_email: str, code: str, purpose: str = "密码重置") -> bool:
-        try:
-            # 1. 准备邮件内容
-            # 使用 MIMEMultipart 以支持 HTML，如果只想发纯文本可改为 MIMEText
-            msg = MIMEMultipart('alternative')
-            
-            # 修正1：Subject 使用 Header 封装，防止乱码
-            from email.header import Header
-            subject = f'{settings.PROJECT_NAME} - {purpose}验证码'
-            msg['Subject'] = Header(subject, 'utf-8')
-            
-            # 修正2：From 头严格使用发送账号，避免被 163 拦截
-            # 很多国内邮箱要求 From 必须和 login 的 user 完全一致
-            sender = self.smtp_user
-            msg['From'] = sender 
-            msg['To'] = to_email
+def render_verification_email(code: str, purpose: str = "密码重置") -> tuple[str, str]:
+    """返回验证码邮件的 (subject, html_body)。"""
+    subject = f'{settings.PROJECT_NAME} - {purpose}验证码'
 
-            # 邮件正文（保留 HTML 格式以维持美观，但在发送层参考了您的简单逻辑）
-            html_body = f"""
+    # 邮件正文（保留 HTML 格式以维持美观，但在发送层参考了您的简单逻辑）
+    html_body = f"""
 <!DOCTYPE html>
 <html>
 <head>
@@ -70,26 +38,122 @@ class EmailService:
 </body>
 </html>
             """
-            
-            # 如果只想发纯文本：
-            # msg.attach(MIMEText(f"您的验证码是：{code}", 'plain', 'utf-8'))
-            msg.attach(MIMEText(html_body, 'html', 'utf-8'))
+    return subject, html_body
+
+
+# 公告模板中的收件人占位符，整封邮件只渲染一次，逐个收件人仅做字符串替换
+RECIPIENT_PLACEHOLDER = "{{recipient_name}}"
+
+
+def render_announcement_email(title: str, content: str) -> tuple[str, str]:
+    """返回公告邮件的 (subject, html_body 模板)，模板中保留 RECIPIENT_PLACEHOLDER。"""
+    subject = f'{settings.PROJECT_NAME} - {title}'
+    paragraphs = "".join(f"<p>{html.escape(line)}</p>" for line in content.splitlines() if line.strip())
+    html_body = f"""
+<!DOCTYPE html>
+<html>
+<head>
+    <style>
+        .container {{ padding: 20px; background-color: #f5f5f5; }}
+        .box {{ background: white; padding: 20px; border-radius: 5px; }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="box">
+            <p>{RECIPIENT_PLACEHOLDER}，您好：</p>
+            <h3>{html.escape(title)}</h3>
+            {paragraphs}
+            <p style="font-size: 12px; color: #999;">{settings.PROJECT_NAME} 系统邮件</p>
+        </div>
+    </div>
+</body>
+</html>
+            """
+    return subject, html_body
+
+
+def personalize(html_template: str, recipient_name: str) -> str:
+    return html_template.replace(RECIPIENT_PLACEHOLDER, html.escape(recipient_name))
+
+
+def build_message(sender: str, to_email: str, subject: str, html_body: str) -> MIMEMultipart:
+    # 使用 MIMEMultipart 以支持 HTML，如果只想发纯文本可改为 MIMEText
+    msg = MIMEMultipart('alternative')
+
+    # 修正1：Subject 使用 Header 封装，防止乱码
+    msg['Subject'] = Header(subject, 'utf-8')
+
+    # 修正2：From 头严格使用发送账号，避免被 163 拦截
+    # 很多国内邮箱要求 From 必须和 login 的 user 完全一致
+    msg['From'] = sender
+    msg['To'] = to_email
+
+    # 如果只想发纯文本：
+    # msg.attach(MIMEText(f"您的验证码是：{code}", 'plain', 'utf-8'))
+    msg.attach(MIMEText(html_body, 'html', 'utf-8'))
+    return msg
+
+
+def open_smtp_connection(
+    host: str,
+    port: int,
+    user: str,
+    password: str,
+    use_tls: bool,
+    timeout: Optional[float] = None,
+) -> smtplib.SMTP:
+    """建立并登录 SMTP 连接（未配置账号时跳过登录，例如本地测试服务器）。"""
+    timeout_args = {"timeout": timeout} if timeout else {}
+    # 根据端口自动选择 SSL
+    if port == 465:
+        # 端口 465 强制使用 SSL
+        smtp_obj = smtplib.SMTP_SSL(host, 465, **timeout_args)
+    else:
+        # 其他端口（如 25, 587）使用普通 SMTP + STARTTLS
+        smtp_obj = smtplib.SMTP(host, port, **timeout_args)
+        if use_tls:
+            smtp_obj.starttls()
+
+    if user:
+        smtp_obj.login(user, password)
+    return smtp_obj
+
+
+class EmailService:
+    def __init__(self):
+        self.smtp_host = settings.SMTP_HOST
+        self.smtp_port = settings.SMTP_PORT
+        self.smtp_user = settings.SMTP_USER
+        self.smtp_password = settings.SMTP_PASSWORD
+        self.from_email = settings.FROM_EMAIL
+        self.from_name = settings.FROM_NAME
+
+    def send_verification_code(self, to_email: str, code: str, purpose: str = "密码重置") -> bool:
+        """
+        同步发送验证码邮件（每次新建连接，供命令行脚本使用；请求路径请走 email_outbox）
+
+        Args:
+            to_email: 收件人邮箱
+            code: 验证码
+            purpose: 验证码用途（如 "密码重置"、"邮箱验证" 等）
+
+        Returns:
+            bool: 发送是否成功
+        """
+        try:
+            # 1. 准备邮件内容
+            subject, html_body = render_verification_email(code, purpose)
+            sender = self.smtp_user
+            msg = build_message(sender, to_email, subject, html_body)
 
             # 2. 发送邮件 (参考您的 sendEmail 函数逻辑)
-            # 根据端口自动选择 SSL
-            if self.smtp_port == 465:
-                # 端口 465 强制使用 SSL
-                smtp_obj = smtplib.SMTP_SSL(self.smtp_host, 465)
-            else:
-                # 其他端口（如 25, 587）使用普通 SMTP + STARTTLS
-                smtp_obj = smtplib.SMTP(self.smtp_host, self.smtp_port)
-                if settings.SMTP_USE_TLS:
-                    smtp_obj.starttls()
-
-            smtp_obj.login(self.smtp_user, self.smtp_password)
+            smtp_obj = open_smtp_connection(
+                self.smtp_host, self.smtp_port, self.smtp_user, self.smtp_password, settings.SMTP_USE_TLS
+            )
             smtp_obj.sendmail(sender, [to_email], msg.as_string())
             smtp_obj.quit()
-            
+
             logger.info(f"Email sent successfully to {to_email}")
             return True
 
@@ -0,0 +1,274 @@
+"""
+邮件发件箱：请求路径只把邮件写入 email_outbox 表，由后台发送器批量投递。
+
+发送器复用已登录的 SMTP 连接，并发数受连接池大小限制，失败后按指数退避重试。
+认领记录时写入租约（next_attempt_at = now + lease），进程崩溃后租约到期的记录会被重新认领。
+"""
+import asyncio
+from datetime import timedelta
+import logging
+import secrets
+import smtplib
+import threading
+from typing import Optional
+
+from sqlalchemy import or_, select, update
+
+from app.core.config import settings
+from app.core.email import build_message, open_smtp_connection
+from app.core.time_utils import get_now
+from app.db.session import SessionLocal
+from app.models.email_outbox import EmailOutbox, EmailStatus
+
+logger = logging.getLogger(__name__)
+
+
+class SMTPConnectionPool:
+    """可复用的 SMTP 连接池；smtplib 是阻塞的，实际收发在线程中执行。"""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: str,
+        password: str,
+        use_tls: bool,
+        size: int = 2,
+        timeout: float = 30,
+    ) -> None:
+        self._host = host
+        self._port = port
+        self._user = user
+        self._password = password
+        self._use_tls = use_tls
+        self._timeout = timeout
+        self._idle: list[smtplib.SMTP] = []
+        self._lock = threading.Lock()
+        self._semaphore = asyncio.Semaphore(size)
+        self.size = size
+        self.connections_opened = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        conn = open_smtp_connection(
+            self._host, self._port, self._user, self._password, self._use_tls, timeout=self._timeout
+        )
+        with self._lock:
+            self.connections_opened += 1
+        return conn
+
+    @staticmethod
+    def _close(conn: smtplib.SMTP) -> None:
+        try:
+            conn.quit()
+        except Exception:
+            conn.close()
+
+    def _send_blocking(self, sender: str, to_email: str, message: str) -> None:
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        if conn is not None:
+            try:
+                conn.sendmail(sender, [to_email], message)
+                with self._lock:
+                    self._idle.append(conn)
+                return
+            except smtplib.SMTPServerDisconnected:
+                conn.close()  # 空闲连接被服务器关闭，换新连接重试一次
+            except Exception:
+                self._close(conn)
+                raise
+        conn = self._connect()
+        try:
+            conn.sendmail(sender, [to_email], message)
+        except Exception:
+            self._close(conn)
+            raise
+        with self._lock:
+            self._idle.append(conn)
+
+    async def send(self, sender: str, to_email: str, message: str) -> None:
+        async with self._semaphore:
+            await asyncio.to_thread(self._send_blocking, sender, to_email, message)
+
+    def close_all(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self._close(conn)
+
+
+class EmailOutboxSender:
+    def __init__(
+        self,
+        session_factory,
+        pool: SMTPConnectionPool,
+        sender_address: str,
+        batch_size: int = 50,
+        max_attempts: int = 5,
+        retry_base_seconds: float = 30,
+        poll_seconds: float = 5,
+        lease_seconds: float = 300,
+    ) -> None:
+        self._session_factory = session_factory
+        self._pool = pool
+        self._sender_address = sender_address
+        self._batch_size = batch_size
+        self._max_attempts = max_attempts
+        self._retry_base = retry_base_seconds
+        self._poll_seconds = poll_seconds
+        self._lease = timedelta(seconds=lease_seconds)
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+
+    def notify(self) -> None:
+        self._wakeup.set()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self._pool.close_all)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                processed = await self.process_batch()
+            except Exception as e:
+                logger.error(f"Email outbox batch failed: {e}")
+                processed = 0
+            if processed < self._batch_size:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self._poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    async def _claim(self) -> list[EmailOutbox]:
+        now = get_now()
+        claimable = or_(
+            EmailOutbox.status == EmailStatus.PENDING,
+            EmailOutbox.status == EmailStatus.SENDING,  # 租约已过期的记录
+        )
+        token = secrets.token_hex(8)
+        async with self._session_factory() as session:
+            result = await session.execute(
+                select(EmailOutbox.id)
+                .where(claimable, EmailOutbox.next_attempt_at <= now)
+                .order_by(EmailOutbox.next_attempt_at)
+                .limit(self._batch_size)
+            )
+            ids = list(result.scalars().all())
+            if not ids:
+                return []
+            # 多个 worker 可能选中同一批记录，带条件的 UPDATE 保证每条只被一个 worker 认领
+            await session.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.id.in_(ids), claimable, EmailOutbox.next_attempt_at <= now)
+                .values(status=EmailStatus.SENDING, next_attempt_at=now + self._lease, claim_token=token)
+            )
+            await session.commit()
+            result = await session.execute(
+                select(EmailOutbox).where(EmailOutbox.status == EmailStatus.SENDING, EmailOutbox.claim_token == token)
+            )
+            return list(result.scalars().all())
+
+    async def _deliver(self, row: EmailOutbox) -> Optional[str]:
+        try:
+            message = build_message(self._sender_address, row.to_email, row.subject, row.html_body).as_string()
+            await self._pool.send(self._sender_address, row.to_email, message)
+            return None
+        except Exception as e:
+            return str(e)[:255] or e.__class__.__name__
+
+    async def process_batch(self) -> int:
+        rows = await self._claim()
+        if not rows:
+            return 0
+        errors = await asyncio.gather(*(self._deliver(row) for row in rows))
+
+        now = get_now()
+        sent_ids = [row.id for row, error in zip(rows, errors) if error is None]
+        async with self._session_factory() as session:
+            if sent_ids:
+                await session.execute(
+                    update(EmailOutbox)
+                    .where(EmailOutbox.id.in_(sent_ids))
+                    .values(status=EmailStatus.SENT, sent_at=now, attempts=EmailOutbox.attempts + 1, last_error=None)
+                )
+            for row, error in zip(rows, errors):
+                if error is None:
+                    continue
+                attempts = row.attempts + 1
+                values = {"attempts": attempts, "last_error": error}
+                if attempts >= self._max_attempts:
+                    values["status"] = EmailStatus.FAILED
+                    self.failed += 1
+                    logger.error(f"Giving up on email {row.id} to {row.to_email}: {error}")
+                else:
+                    delay = min(self._retry_base * 2 ** (attempts - 1), 3600)
+                    values["status"] = EmailStatus.PENDING
+                    values["next_attempt_at"] = now + timedelta(seconds=delay)
+                    self.retried += 1
+                await session.execute(update(EmailOutbox).where(EmailOutbox.id == row.id).values(**values))
+            await session.commit()
+        self.sent += len(sent_ids)
+        return len(rows)
+
+    def stats(self) -> dict:
+        return {
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+            "smtp_connections": self._pool.size,
+            "smtp_connections_opened": self._pool.connections_opened,
+        }
+
+
+def create_email_outbox_sender(session_factory) -> EmailOutboxSender:
+    pool = SMTPConnectionPool(
+        settings.SMTP_HOST,
+        settings.SMTP_PORT,
+        settings.SMTP_USER,
+        settings.SMTP_PASSWORD,
+        settings.SMTP_USE_TLS,
+        size=settings.EMAIL_OUTBOX_SMTP_CONNECTIONS,
+    )
+    return EmailOutboxSender(
+        session_factory,
+        pool,
+        sender_address=settings.SMTP_USER or settings.FROM_EMAIL,
+        batch_size=settings.EMAIL_OUTBOX_BATCH_SIZE,
+        max_attempts=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+        retry_base_seconds=settings.EMAIL_OUTBOX_RETRY_BASE_SECONDS,
+        poll_seconds=settings.EMAIL_OUTBOX_POLL_SECONDS,
+    )
+
+
+email_outbox_sender = create_email_outbox_sender(SessionLocal)
+
+
+async def enqueue_email(session, to_email: str, subject: str, html_body: str) -> EmailOutbox:
+    """写入发件箱并唤醒发送器，不等待 SMTP。"""
+    row = EmailOutbox(
+        to_email=to_email,
+        subject=subject,
+        html_body=html_body,
+        status=EmailStatus.PENDING,
+        attempts=0,
+        next_attempt_at=get_now(),
+    )
+    session.add(row)
+    await session.commit()
+    email_outbox_sender.notify()
+    return row
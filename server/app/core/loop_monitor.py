@@ -0,0 +1,134 @@
+"""
+事件循环延迟监控：找出 async 接口中阻塞事件循环的调用（bcrypt、smtplib、同步文件读写等）。
+
+- 协程每隔 interval 休眠一次，实际醒来时间与预期之差即调度延迟（lag），计入直方图；
+- 看门狗线程检查协程的心跳，事件循环卡住超过 threshold 时，从 sys._current_frames() 取出事件循环线程
+  此刻的调用栈（即正在阻塞的代码），并沿栈向上找到 ASGI scope，得到所属路由；
+- 卡顿结束后生成报告（实际延迟、路由、调用栈），进入环形缓冲区（管理员接口读取）并写入 app.loop_lag 日志。
+"""
+import asyncio
+from collections import deque
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+from app.core.config import settings
+from app.core.metrics import Histogram
+from app.core.ring_buffer import newest_first
+from app.middleware.request_context import route_path
+
+logger = logging.getLogger("app.loop_lag")
+
+MAX_STACK_FRAMES = 25
+
+
+def request_route_from_frame(frame) -> Optional[str]:
+    """沿调用栈向上查找 ASGI 中间件的 scope 局部变量，返回 "<方法> <路由模板>"。"""
+    while frame is not None:
+        scope = frame.f_locals.get("scope")
+        if isinstance(scope, dict) and scope.get("type") == "http":
+            return f"{scope.get('method', '')} {route_path(scope)}"
+        frame = frame.f_back
+    return None
+
+
+class LoopLagMonitor:
+    def __init__(self, interval_ms: float = 100, threshold_ms: float = 100, max_reports: int = 100) -> None:
+        self._interval = interval_ms / 1000
+        self.threshold_ms = threshold_ms
+        self.lag_ms = Histogram()
+        self._reports: deque[dict] = deque(maxlen=max_reports)
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat = time.monotonic()
+        self._captured_beat: Optional[float] = None
+        self._pending: Optional[dict] = None
+        self.stalls = 0
+        self.max_lag_ms = 0.0
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._tick())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+    async def _tick(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self._interval)
+            lag_ms = max(0.0, (time.perf_counter() - started - self._interval) * 1000)
+            self._heartbeat = time.monotonic()
+            self.lag_ms.observe(lag_ms)
+            if lag_ms >= self.threshold_ms:
+                self._record_stall(lag_ms)
+
+    def _watch(self) -> None:
+        stall_after = self._interval + self.threshold_ms / 1000
+        while not self._stop.wait(min(self._interval, self.threshold_ms / 1000) / 2):
+            beat = self._heartbeat
+            if time.monotonic() - beat < stall_after or beat == self._captured_beat:
+                continue
+            # 每次卡顿只取一次栈：此时事件循环线程正停在阻塞调用上
+            self._captured_beat = beat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = traceback.extract_stack(frame)[-MAX_STACK_FRAMES:]
+            self._pending = {
+                "route": request_route_from_frame(frame),
+                "stack": [f"{entry.filename}:{entry.lineno} in {entry.name}" for entry in stack],
+            }
+
+    def _record_stall(self, lag_ms: float) -> None:
+        self.stalls += 1
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+        captured, self._pending = self._pending, None
+        report = {"at": time.time(), "lag_ms": round(lag_ms, 1), "route": None, "stack": []}
+        if captured is not None:
+            report.update(captured)
+        self._reports.append(report)
+        where = report["stack"][-1] if report["stack"] else "stack not captured"
+        logger.warning(f"Event loop blocked for {lag_ms:.0f}ms on {report['route'] or 'no request'}: {where}")
+
+    def reports(self, limit: Optional[int] = None) -> list[dict]:
+        """最近的卡顿报告，新的在前。"""
+        return newest_first(self._reports, limit)
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None,
+            "interval_ms": self._interval * 1000,
+            "threshold_ms": self.threshold_ms,
+            "stalls": self.stalls,
+            "max_lag_ms": round(self.max_lag_ms, 1),
+            "lag_ms": self.lag_ms.snapshot(),
+        }
+
+
+loop_lag_monitor = LoopLagMonitor(
+    interval_ms=settings.LOOP_LAG_INTERVAL_MS,
+    threshold_ms=settings.LOOP_LAG_THRESHOLD_MS,
+    max_reports=settings.LOOP_LAG_MAX_REPORTS,
+)
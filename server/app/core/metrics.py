@@ -0,0 +1,149 @@
+from bisect import bisect_left
+import threading
+
+# 默认的耗时分桶（毫秒）
+DEFAULT_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histogram:
+    """固定分桶的直方图；snapshot 返回累计计数，最后一个桶为 +Inf。"""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS_MS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+        cumulative, running = {}, 0
+        for bound, bucket_count in zip([*map(str, self.buckets), "+Inf"], counts):
+            running += bucket_count
+            cumulative[bound] = running
+        return {"count": count, "sum": round(total, 3), "buckets": cumulative}
+
+
+class RouteMetrics:
+    __slots__ = ("statuses", "errors", "duration_ms")
+
+    def __init__(self) -> None:
+        self.statuses: dict[int, int] = {}
+        self.errors = 0
+        self.duration_ms = Histogram()
+
+
+class RequestMetrics:
+    """
+    按 (方法, 路由模板) 汇总的请求数、5xx 错误数和耗时直方图，以及正在处理的请求数。
+
+    只在事件循环线程中更新，计数不加锁；直方图沿用 Histogram 的锁（无竞争时约数十纳秒）。
+    """
+
+    def __init__(self) -> None:
+        self._routes: dict[tuple[str, str], RouteMetrics] = {}
+        self.in_flight = 0
+
+    def observe(self, method: str, route: str, status_code: int, duration_ms: float) -> None:
+        key = (method, route)
+        metrics = self._routes.get(key)
+        if metrics is None:
+            metrics = self._routes[key] = RouteMetrics()
+        metrics.statuses[status_code] = metrics.statuses.get(status_code, 0) + 1
+        if status_code >= 500:
+            metrics.errors += 1
+        metrics.duration_ms.observe(duration_ms)
+
+    def routes(self) -> list[tuple[tuple[str, str], RouteMetrics]]:
+        return sorted(self._routes.items())
+
+    def reset(self) -> None:
+        self._routes.clear()
+
+
+request_metrics = RequestMetrics()
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _seconds(ms: float) -> str:
+    return f"{ms / 1000:g}"
+
+
+def _histogram_lines(name: str, snapshot: dict, **labels) -> list[str]:
+    lines = []
+    for bound, count in snapshot["buckets"].items():
+        le = bound if bound == "+Inf" else _seconds(float(bound))
+        lines.append(f"{name}_bucket{_labels(**labels, le=le)} {count}")
+    suffix = _labels(**labels) if labels else ""
+    lines.append(f"{name}_sum{suffix} {_seconds(snapshot['sum'])}")
+    lines.append(f"{name}_count{suffix} {snapshot['count']}")
+    return lines
+
+
+def render_prometheus(metrics: RequestMetrics, pools: dict[str, dict]) -> str:
+    """Prometheus 文本格式（0.0.4）；耗时以秒为单位输出。pools 为 {名称: pool_stats(engine)}。"""
+    lines = [
+        "# HELP http_requests_total HTTP requests by route template and status code.",
+        "# TYPE http_requests_total counter",
+    ]
+    routes = metrics.routes()
+    for (method, route), m in routes:
+        for status_code, count in sorted(m.statuses.items()):
+            lines.append(f"http_requests_total{_labels(method=method, route=route, status=status_code)} {count}")
+    lines += [
+        "# HELP http_request_errors_total HTTP requests that returned a 5xx status.",
+        "# TYPE http_request_errors_total counter",
+    ]
+    for (method, route), m in routes:
+        lines.append(f"http_request_errors_total{_labels(method=method, route=route)} {m.errors}")
+    lines += [
+        "# HELP http_request_duration_seconds HTTP request latency until the response is fully sent.",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for (method, route), m in routes:
+        lines += _histogram_lines("http_request_duration_seconds", m.duration_ms.snapshot(), method=method, route=route)
+    lines += [
+        "# HELP http_requests_in_flight HTTP requests currently being processed.",
+        "# TYPE http_requests_in_flight gauge",
+        f"http_requests_in_flight {metrics.in_flight}",
+    ]
+
+    instrumented = {name: stats for name, stats in pools.items() if "checkouts" in stats}
+    gauges = (
+        ("db_pool_size", "pool_size", "Configured number of pooled connections."),
+        ("db_pool_checked_out", "checked_out", "Connections currently checked out."),
+        ("db_pool_overflow", "overflow", "Connections open beyond pool_size."),
+    )
+    for metric, key, help_text in gauges:
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} gauge"]
+        lines += [f"{metric}{_labels(pool=name)} {stats[key]}" for name, stats in instrumented.items()]
+    counters = (
+        ("db_pool_checkouts_total", "checkouts", "Successful connection checkouts."),
+        ("db_pool_timeouts_total", "timeouts", "Checkouts that timed out waiting for a connection."),
+    )
+    for metric, key, help_text in counters:
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+        lines += [f"{metric}{_labels(pool=name)} {stats[key]}" for name, stats in instrumented.items()]
+    lines += [
+        "# HELP db_pool_checkout_wait_seconds Time spent waiting for a pooled connection.",
+        "# TYPE db_pool_checkout_wait_seconds histogram",
+    ]
+    for name, stats in instrumented.items():
+        lines += _histogram_lines("db_pool_checkout_wait_seconds", stats["checkout_wait_ms"], pool=name)
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,114 @@
+"""
+操作日志的批量写入：中间件把每个请求的记录放进内存缓冲区（不等待数据库），
+后台任务在攒够 batch_size 条或距上次写入满 flush_ms 毫秒时，用一条多行 INSERT 写入 operation_logs。
+
+缓冲区满时丢弃新记录并计数（dropped）；写库失败的整批记录计入 failed，不重试，避免拖慢请求。
+"""
+import asyncio
+from collections import deque
+import logging
+from typing import Optional
+
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.operation_log import OperationLog
+
+logger = logging.getLogger(__name__)
+
+
+class OperationLogWriter:
+    def __init__(
+        self,
+        session_factory,
+        batch_size: int = 200,
+        flush_ms: float = 1000,
+        max_buffer: int = 10_000,
+    ) -> None:
+        self._session_factory = session_factory
+        self._batch_size = batch_size
+        self._flush_seconds = flush_ms / 1000
+        self._buffer: deque[dict] = deque()
+        self._max_buffer = max_buffer
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+
+    def record(self, row: dict) -> None:
+        """请求路径上调用：只追加到缓冲区，不做 IO。"""
+        if len(self._buffer) >= self._max_buffer:
+            self.dropped += 1
+            return
+        self._buffer.append(row)
+        self.recorded += 1
+        if len(self._buffer) >= self._batch_size:
+            self._wakeup.set()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while self._buffer:
+            await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            while self._buffer:
+                await self.flush()
+                if len(self._buffer) < self._batch_size:
+                    break
+
+    async def flush(self) -> int:
+        """写入缓冲区中最多 batch_size 条记录，返回写入条数。"""
+        rows = [self._buffer.popleft() for _ in range(min(self._batch_size, len(self._buffer)))]
+        if not rows:
+            return 0
+        try:
+            async with self._session_factory() as session:
+                await session.execute(insert(OperationLog).values(rows))
+                await session.commit()
+        except Exception as e:
+            self.failed += len(rows)
+            logger.error(f"Failed to write {len(rows)} operation logs: {e}")
+            return 0
+        self.written += len(rows)
+        self.flushes += 1
+        return len(rows)
+
+    def stats(self) -> dict:
+        return {
+            "buffered": len(self._buffer),
+            "max_buffer": self._max_buffer,
+            "batch_size": self._batch_size,
+            "recorded": self.recorded,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "flushes": self.flushes,
+        }
+
+
+operation_log_writer = OperationLogWriter(
+    SessionLocal,
+    batch_size=settings.OPERATION_LOG_BATCH_SIZE,
+    flush_ms=settings.OPERATION_LOG_FLUSH_MS,
+    max_buffer=settings.OPERATION_LOG_BUFFER_SIZE,
+)
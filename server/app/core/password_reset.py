@@ -1,7 +1,18 @@
+from abc import ABC, abstractmethod
+import asyncio
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+import json
+import logging
+import os
+from pathlib import Path
 import secrets
+from sqlalchemy import delete, select
+from app.core.config import settings
 from app.core.time_utils import get_now, APP_TIMEZONE
+from app.models.password_reset import PasswordResetCode
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -10,19 +21,63 @@ class ResetEntry:
     expires_at: datetime
 
 
-class PasswordResetStore:
+def _generate_code() -> str:
+    return f"{secrets.randbelow(1_000_000):06d}"
+
+
+class PasswordResetStore(ABC):
+    """
+    密码重置验证码存储接口。
+
+    verify 必须是原子的“比较并删除”：同一个验证码只能被一个请求（或一个 worker）消费。
+    """
+
     def __init__(self, ttl_minutes: int = 10) -> None:
         self._ttl = timedelta(minutes=ttl_minutes)
-        self._entries: dict[str, ResetEntry] = {}
 
+    @abstractmethod
+    async def issue(self, email: str) -> str:
+        """签发新验证码（替换该邮箱之前的验证码）并返回。"""
+
+    @abstractmethod
+    async def verify(self, email: str, code: str, consume: bool = True) -> bool:
+        """验证码正确且未过期时返回 True；consume 为 True 时同时删除。"""
+
+    @abstractmethod
+    async def sweep(self) -> int:
+        """删除过期条目，返回删除数量。"""
+
+    async def run_sweeper(self, interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                removed = await self.sweep()
+                if removed:
+                    logger.info(f"Swept {removed} expired password reset codes")
+            except Exception as e:
+                logger.error(f"Password reset sweep failed: {e}")
+
+
+class InMemoryPasswordResetStore(PasswordResetStore):
+    """进程内存储，仅适用于单 worker。条目数超过 max_entries 时淘汰最早签发的验证码。"""
 
-    def issue(self, email: str) -> str:
-        code = f"{secrets.randbelow(1_000_000):06d}"
-        expires_at = get_now() + self._ttl
-        self._entries[email.lower()] = ResetEntry(code=code, expires_at=expires_at)
+    def __init__(self, ttl_minutes: int = 10, max_entries: int = 10_000) -> None:
+        super().__init__(ttl_minutes)
+        self._max_entries = max_entries
+        self._entries: dict[str, ResetEntry] = {}
+
+    async def issue(self, email: str) -> str:
+        key = email.lower()
+        code = _generate_code()
+        self._entries.pop(key, None)
+        if len(self._entries) >= self._max_entries:
+            await self.sweep()
+        while len(self._entries) >= self._max_entries:
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[key] = ResetEntry(code=code, expires_at=get_now() + self._ttl)
         return code
 
-    def verify(self, email: str, code: str, consume: bool = True) -> bool:
+    async def verify(self, email: str, code: str, consume: bool = True) -> bool:
         key = email.lower()
         entry = self._entries.get(key)
         if not entry:
@@ -36,5 +91,156 @@ class PasswordResetStore:
             self._entries.pop(key, None)
         return True
 
+    async def sweep(self) -> int:
+        now = get_now()
+        expired = [key for key, entry in self._entries.items() if now > entry.expires_at]
+        for key in expired:
+            self._entries.pop(key, None)
+        return len(expired)
+
+
+class SqlPasswordResetStore(PasswordResetStore):
+    """存放在 password_reset_codes 表中，多个 worker / 多台主机共享。"""
+
+    def __init__(self, session_factory, ttl_minutes: int = 10) -> None:
+        super().__init__(ttl_minutes)
+        self._session_factory = session_factory
+
+    async def issue(self, email: str) -> str:
+        key = email.lower()
+        code = _generate_code()
+        async with self._session_factory() as session:
+            await session.execute(delete(PasswordResetCode).where(PasswordResetCode.email == key))
+            session.add(PasswordResetCode(email=key, code=code, expires_at=get_now() + self._ttl))
+            await session.commit()
+        return code
+
+    async def verify(self, email: str, code: str, consume: bool = True) -> bool:
+        conditions = (
+            PasswordResetCode.email == email.lower(),
+            PasswordResetCode.code == code,
+            PasswordResetCode.expires_at > get_now(),
+        )
+        async with self._session_factory() as session:
+            if not consume:
+                result = await session.execute(select(PasswordResetCode.email).where(*conditions))
+                return result.first() is not None
+            # 单条 DELETE 即“比较并删除”，rowcount 为 1 的请求才算验证成功
+            result = await session.execute(delete(PasswordResetCode).where(*conditions))
+            await session.commit()
+            return result.rowcount == 1
+
+    async def sweep(self) -> int:
+        async with self._session_factory() as session:
+            result = await session.execute(
+                delete(PasswordResetCode).where(PasswordResetCode.expires_at <= get_now())
+            )
+            await session.commit()
+            return result.rowcount
+
+
+class FilePasswordResetStore(PasswordResetStore):
+    """
+    单机多 worker 共享的文件存储（默认位于 /dev/shm，即内存文件系统）。
+
+    每次操作都在 flock 排他锁内读-改-写整个文件，条目数受 max_entries 限制。
+    """
+
+    def __init__(self, path: str, ttl_minutes: int = 10, max_entries: int = 10_000) -> None:
+        # fcntl 只在 POSIX 上存在：在这里导入，Windows 上选择其他后端时模块仍可导入
+        import fcntl
+
+        super().__init__(ttl_minutes)
+        self._fcntl = fcntl
+        self._path = Path(path)
+        self._max_entries = max_entries
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+
+    def _locked(self, mutate):
+        fd = os.open(self._path, os.O_RDWR | os.O_CREAT, 0o600)
+        with os.fdopen(fd, "r+", encoding="utf-8") as f:
+            self._fcntl.flock(f, self._fcntl.LOCK_EX)
+            try:
+                raw = f.read()
+                entries = json.loads(raw) if raw else {}
+                result, changed = mutate(entries, get_now().timestamp())
+                if changed:
+                    f.seek(0)
+                    f.truncate()
+                    json.dump(entries, f)
+                    f.flush()
+                return result
+            finally:
+                self._fcntl.flock(f, self._fcntl.LOCK_UN)
+
+    @staticmethod
+    def _drop_expired(entries: dict, now: float) -> int:
+        expired = [key for key, (_, expires_at) in entries.items() if now > expires_at]
+        for key in expired:
+            del entries[key]
+        return len(expired)
+
+    async def issue(self, email: str) -> str:
+        key = email.lower()
+        code = _generate_code()
+        ttl = self._ttl.total_seconds()
+
+        def mutate(entries: dict, now: float):
+            entries.pop(key, None)
+            if len(entries) >= self._max_entries:
+                self._drop_expired(entries, now)
+            while len(entries) >= self._max_entries:
+                entries.pop(next(iter(entries)))
+            entries[key] = [code, now + ttl]
+            return code, True
+
+        return await asyncio.to_thread(self._locked, mutate)
+
+    async def verify(self, email: str, code: str, consume: bool = True) -> bool:
+        key = email.lower()
+
+        def mutate(entries: dict, now: float):
+            entry = entries.get(key)
+            if not entry:
+                return False, False
+            stored_code, expires_at = entry
+            if now > expires_at:
+                del entries[key]
+                return False, True
+            if stored_code != code:
+                return False, False
+            if consume:
+                del entries[key]
+            return True, consume
+
+        return await asyncio.to_thread(self._locked, mutate)
+
+    async def sweep(self) -> int:
+        def mutate(entries: dict, now: float):
+            removed = self._drop_expired(entries, now)
+            return removed, removed > 0
+
+        return await asyncio.to_thread(self._locked, mutate)
+
+
+def create_password_reset_store() -> PasswordResetStore:
+    backend = settings.PASSWORD_RESET_BACKEND
+    if backend == "sql":
+        from app.db.session import SessionLocal
+
+        return SqlPasswordResetStore(SessionLocal, ttl_minutes=settings.PASSWORD_RESET_TTL_MINUTES)
+    if backend == "file":
+        return FilePasswordResetStore(
+            settings.PASSWORD_RESET_FILE_PATH,
+            ttl_minutes=settings.PASSWORD_RESET_TTL_MINUTES,
+            max_entries=settings.PASSWORD_RESET_MAX_ENTRIES,
+        )
+    if backend == "memory":
+        return InMemoryPasswordResetStore(
+            ttl_minutes=settings.PASSWORD_RESET_TTL_MINUTES,
+            max_entries=settings.PASSWORD_RESET_MAX_ENTRIES,
+        )
+    raise ValueError(f"Unknown PASSWORD_RESET_BACKEND: {backend}")
+
 
-password_reset_store = PasswordResetStore()
+password_reset_store = create_password_reset_store()
@@ -0,0 +1,10 @@
+from app.core.config import settings
+from app.core.ttl_cache import TTLCache
+
+# 学生待完成作业数的进程内缓存（按 student id 索引），学生首页轮询时避免每次都查库。
+# 改变计数的代码路径（提交作业、新建 / 删除作业、选课 / 退课）在提交事务之后调用 invalidate()；
+# 读取见 app/crud/scores.get_student_pending_task_count，查库前取 generation、写入时带回。
+pending_task_cache: TTLCache[int, int] = TTLCache(
+    ttl_seconds=settings.PENDING_TASK_CACHE_TTL_SECONDS,
+    max_entries=settings.PENDING_TASK_CACHE_MAX_ENTRIES,
+)
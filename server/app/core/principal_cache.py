@@ -0,0 +1,25 @@
+from dataclasses import dataclass
+
+from app.core.config import settings
+from app.core.ttl_cache import TTLCache
+
+
+@dataclass(frozen=True)
+class Principal:
+    """已认证用户的不可变快照，仅包含鉴权所需字段。"""
+
+    id: int
+    role_id: int
+    is_active: bool
+    username: str
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(id=user.id, role_id=user.role_id, is_active=bool(user.is_active), username=user.username)
+
+
+# 进程内的 Principal 缓存（按 user id 索引）；写入用户的代码路径需要调用 invalidate()
+principal_cache: TTLCache[int, Principal] = TTLCache(
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+)
@@ -0,0 +1,200 @@
+"""
+按请求的采样分析器（管理员在请求头中带 X-Profile 时启用）。
+
+采样线程每隔 interval 读取事件循环线程的调用栈（sys._current_frames），只保留栈中包含该请求
+中间件帧的样本，因此并发的其他请求不会混进来；cProfile 会记录同一线程上交替执行的所有协程，不适用。
+样本汇总为调用树，并按最内层可识别的帧归类到 router / crud / orm / serialization / db_driver 等；
+DB 等待时间取自该请求的 SQL 统计（QueryStats）。结果保存在环形缓冲区中供管理员接口读取。
+"""
+from collections import deque
+import itertools
+import os
+import sys
+import threading
+import time
+from typing import Optional
+
+from app.core.config import BASE_DIR, settings
+from app.core.ring_buffer import newest_first
+
+# (分类, 路径片段)，按帧从内到外匹配，取第一个命中的分类
+CATEGORIES = (
+    ("orm", f"sqlalchemy{os.sep}orm{os.sep}"),
+    ("db_driver", f"sqlalchemy{os.sep}"),
+    ("db_driver", f"aiosqlite{os.sep}"),
+    ("db_driver", f"aiomysql{os.sep}"),
+    ("db_driver", f"pymysql{os.sep}"),
+    ("serialization", f"pydantic{os.sep}"),
+    ("serialization", f"pydantic_core{os.sep}"),
+    ("serialization", f"fastapi{os.sep}encoders.py"),
+    ("serialization", f"{os.sep}json{os.sep}"),
+    ("crud", f"app{os.sep}crud{os.sep}"),
+    ("router", f"app{os.sep}routers{os.sep}"),
+    ("app", f"app{os.sep}"),
+    ("framework", f"fastapi{os.sep}"),
+    ("framework", f"starlette{os.sep}"),
+)
+MAX_TREE_DEPTH = 60
+MIN_NODE_SHARE = 0.01  # 占比低于 1% 的子树不保存
+
+
+def _short_path(filename: str) -> str:
+    marker = f"site-packages{os.sep}"
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    server_dir = str(BASE_DIR) + os.sep
+    return filename[len(server_dir):] if filename.startswith(server_dir) else filename
+
+
+def categorize(filenames: list[str]) -> str:
+    """filenames 从外到内；返回最内层可识别帧的分类。"""
+    for filename in reversed(filenames):
+        for category, fragment in CATEGORIES:
+            if fragment in filename:
+                return category
+    return "other"
+
+
+class ProfileSession:
+    """一个请求的采样：在独立线程中运行，直到 stop()。"""
+
+    def __init__(self, profile_id: int, anchor_frame, loop_thread_id: int, interval_ms: float) -> None:
+        self.profile_id = profile_id
+        self._anchor = anchor_frame
+        self._loop_thread_id = loop_thread_id
+        self._interval = interval_ms / 1000
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self.ticks = 0
+        self.stacks: list[list[tuple[str, str, int]]] = []
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            self.ticks += 1
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = []
+            while frame is not None and frame is not self._anchor:
+                code = frame.f_code
+                stack.append((code.co_filename, code.co_name, code.co_firstlineno))
+                frame = frame.f_back
+            if frame is self._anchor:  # 事件循环此刻正在执行本请求的代码
+                stack.reverse()
+                self.stacks.append(stack)
+
+
+def build_tree(stacks: list[list[tuple[str, str, int]]], ms_per_sample: float) -> dict:
+    root: dict = {"name": "request", "samples": 0, "children": {}}
+    for stack in stacks:
+        root["samples"] += 1
+        node = root
+        for filename, name, lineno in stack[:MAX_TREE_DEPTH]:
+            key = f"{name} ({_short_path(filename)}:{lineno})"
+            child = node["children"].get(key)
+            if child is None:
+                child = node["children"][key] = {"name": key, "samples": 0, "children": {}}
+            child["samples"] += 1
+            node = child
+
+    min_samples = max(1, root["samples"] * MIN_NODE_SHARE)
+
+    def finalize(node: dict) -> dict:
+        children = sorted(node["children"].values(), key=lambda child: -child["samples"])
+        return {
+            "name": node["name"],
+            "samples": node["samples"],
+            "ms": round(node["samples"] * ms_per_sample, 2),
+            "children": [finalize(child) for child in children if child["samples"] >= min_samples],
+        }
+
+    return finalize(root)
+
+
+class RequestProfiler:
+    def __init__(self, max_concurrent: int = 2, interval_ms: float = 1, max_stored: int = 50) -> None:
+        self.max_concurrent = max_concurrent
+        self.interval_ms = interval_ms
+        self._profiles: deque[dict] = deque(maxlen=max_stored)
+        self._ids = itertools.count(1)
+        self.active = 0
+        self.profiled = 0
+        self.rejected_busy = 0
+        self.rejected_unauthorized = 0
+
+    def try_acquire(self) -> bool:
+        if self.active >= self.max_concurrent:
+            self.rejected_busy += 1
+            return False
+        self.active += 1
+        return True
+
+    def begin(self, anchor_frame) -> ProfileSession:
+        session = ProfileSession(next(self._ids), anchor_frame, threading.get_ident(), self.interval_ms)
+        session.start()
+        return session
+
+    def finish(self, session: ProfileSession, *, method: str, route: str, status_code: int,
+               wall_ms: float, db_ms: Optional[float], query_count: Optional[int]) -> dict:
+        session.stop()
+        self.active -= 1
+        self.profiled += 1
+        ms_per_sample = wall_ms / session.ticks if session.ticks else self.interval_ms
+        categories: dict[str, float] = {}
+        for stack in session.stacks:
+            category = categorize([filename for filename, _, _ in stack])
+            categories[category] = categories.get(category, 0.0) + ms_per_sample
+        on_loop_ms = len(session.stacks) * ms_per_sample
+        profile = {
+            "id": session.profile_id,
+            "at": time.time(),
+            "method": method,
+            "route": route,
+            "status_code": status_code,
+            "wall_ms": round(wall_ms, 2),
+            "samples": len(session.stacks),
+            "ticks": session.ticks,
+            "interval_ms": self.interval_ms,
+            "breakdown_ms": {
+                **{category: round(ms, 2) for category, ms in sorted(categories.items(), key=lambda item: -item[1])},
+                "db_wait": round(db_ms, 2) if db_ms is not None else None,
+                # 本请求既不在事件循环上执行、也不在等 SQL 的时间（其他 IO、让出给其他请求等）
+                "awaiting_other": round(max(0.0, wall_ms - on_loop_ms - (db_ms or 0.0)), 2),
+            },
+            "query_count": query_count,
+            "tree": build_tree(session.stacks, ms_per_sample),
+        }
+        self._profiles.append(profile)
+        return profile
+
+    def get(self, profile_id: int) -> Optional[dict]:
+        return next((profile for profile in self._profiles if profile["id"] == profile_id), None)
+
+    def summaries(self, limit: Optional[int] = None) -> list[dict]:
+        """最近的分析结果（不含调用树），新的在前。"""
+        return [
+            {key: value for key, value in profile.items() if key != "tree"}
+            for profile in newest_first(self._profiles, limit)
+        ]
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "active": self.active,
+            "profiled": self.profiled,
+            "rejected_busy": self.rejected_busy,
+            "rejected_unauthorized": self.rejected_unauthorized,
+            "stored": len(self._profiles),
+        }
+
+
+request_profiler = RequestProfiler(
+    max_concurrent=settings.PROFILER_MAX_CONCURRENT,
+    interval_ms=settings.PROFILER_SAMPLE_INTERVAL_MS,
+    max_stored=settings.PROFILER_MAX_STORED,
+)
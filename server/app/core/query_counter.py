@@ -0,0 +1,99 @@
+"""
+按请求统计 SQL：条数、总耗时，以及同一语句重复执行的次数（疑似 N+1）。
+
+订阅 statement_timer 发布的语句耗时（见 app/core/statement_timing.py），计入当前 contextvar 中的 QueryStats；
+QueryCountMiddleware 为每个请求创建一个 QueryStats，请求结束后由 QueryCounter.finish 检查
+是否有语句（参数化后的 SQL 文本相同）执行次数达到阈值，达到则记录为疑似 N+1。
+"""
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+import logging
+import time
+from typing import Iterator, Optional
+
+from app.core.config import settings
+from app.core.ring_buffer import newest_first
+from app.core.statement_timing import statement_timer
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration_ms = 0.0
+        self.statements: Counter[str] = Counter()
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """执行次数不少于 threshold 的语句及次数，多的在前。"""
+        return [(statement, n) for statement, n in self.statements.most_common() if n >= threshold]
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryStats]:
+    """统计代码块内当前上下文执行的 SQL（引擎需已 install 到 query_counter）。"""
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+class QueryCounter:
+    def __init__(self, n_plus_one_threshold: int = 5, max_suspects: int = 200) -> None:
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self._suspects: deque[dict] = deque(maxlen=max_suspects)
+        self.requests = 0
+        self.queries = 0
+        self.flagged_requests = 0
+
+    def install(self, engine) -> None:
+        statement_timer.subscribe(engine, self._on_statement)
+
+    def uninstall(self, engine) -> None:
+        statement_timer.unsubscribe(engine, self._on_statement)
+
+    def _on_statement(self, cursor, statement, parameters, executemany, started, ended) -> None:
+        stats = _current_stats.get()
+        if stats is None:
+            return
+        stats.count += 1
+        stats.duration_ms += (ended - started) * 1000
+        stats.statements[statement] += 1
+
+    def finish(self, stats: QueryStats, route: Optional[str]) -> list[tuple[str, int]]:
+        """请求结束时调用：累计总数，返回并记录疑似 N+1 的语句。"""
+        self.requests += 1
+        self.queries += stats.count
+        repeated = stats.repeated(self.n_plus_one_threshold)
+        if repeated:
+            self.flagged_requests += 1
+            for statement, n in repeated:
+                logger.warning(f"Suspected N+1 on {route}: statement executed {n} times: {statement[:200]}")
+                self._suspects.append({"at": time.time(), "route": route, "count": n, "statement": statement})
+        return repeated
+
+    def suspects(self, limit: Optional[int] = None) -> list[dict]:
+        """最近的疑似 N+1，新的在前。"""
+        return newest_first(self._suspects, limit)
+
+    def stats(self) -> dict:
+        return {
+            "n_plus_one_threshold": self.n_plus_one_threshold,
+            "requests": self.requests,
+            "queries": self.queries,
+            "avg_queries_per_request": round(self.queries / self.requests, 2) if self.requests else 0.0,
+            "flagged_requests": self.flagged_requests,
+        }
+
+
+query_counter = QueryCounter(n_plus_one_threshold=settings.N_PLUS_ONE_THRESHOLD)
@@ -0,0 +1,8 @@
+from collections import deque
+from itertools import islice
+from typing import Optional
+
+
+def newest_first(records: deque, limit: Optional[int] = None) -> list:
+    """环形缓冲区（定长 deque）中最近的 limit 条记录，新的在前；limit 为 None 时返回全部。"""
+    return list(islice(reversed(records), None if limit is None else max(limit, 0)))
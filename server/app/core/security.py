@@ -1,10 +1,17 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Union
+import threading
+import time
+from typing import Any, Callable, TypeVar, Union
+from fastapi import HTTPException, status
 from jose import jwt
 from passlib.context import CryptContext
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+T = TypeVar("T")
 
 def create_access_token(subject: Union[str, Any], expires_delta: timedelta = None) -> str:
     if expires_delta:
@@ -20,3 +27,98 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    return pwd_context.needs_update(hashed_password)
+
+
+class _Timing:
+    """线程安全的耗时统计（毫秒）。"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, seconds: float) -> None:
+        ms = seconds * 1000
+        with self._lock:
+            self.count += 1
+            self.total_ms += ms
+            if ms > self.max_ms:
+                self.max_ms = ms
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            mean = self.total_ms / self.count if self.count else 0.0
+            return {"count": self.count, "mean_ms": round(mean, 3), "max_ms": round(self.max_ms, 3)}
+
+
+class PasswordHashPool:
+    """
+    在独立的有界线程池中执行 bcrypt，避免阻塞事件循环。
+
+    排队数超过 max_queue 时直接返回 429；max_workers 为 0 时在事件循环中同步执行。
+    """
+
+    def __init__(self, max_workers: int, max_queue: int) -> None:
+        self._max_workers = max_workers
+        self._max_queue = max_queue
+        self._executor = (
+            ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+            if max_workers > 0
+            else None
+        )
+        self._in_flight = 0
+        self.rejected = 0
+        self.hash_time = _Timing()
+        self.queue_wait = _Timing()
+
+    def _timed(self, fn: Callable[..., T], submitted_at: float, *args) -> T:
+        started_at = time.perf_counter()
+        self.queue_wait.observe(started_at - submitted_at)
+        try:
+            return fn(*args)
+        finally:
+            self.hash_time.observe(time.perf_counter() - started_at)
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        submitted_at = time.perf_counter()
+        if self._executor is None:
+            return self._timed(fn, submitted_at, *args)
+        if self._in_flight >= self._max_workers + self._max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Server is busy, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._timed, fn, submitted_at, *args)
+        finally:
+            self._in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "workers": self._max_workers,
+            "max_queue": self._max_queue,
+            "in_flight": self._in_flight,
+            "rejected": self.rejected,
+            "hash_time": self.hash_time.snapshot(),
+            "queue_wait": self.queue_wait.snapshot(),
+        }
+
+
+password_hash_pool = PasswordHashPool(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hash_pool.run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_hash_pool.run(get_password_hash, password)
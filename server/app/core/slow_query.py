@@ -0,0 +1,114 @@
+"""
+慢查询记录：订阅 statement_timer 发布的语句耗时（见 app/core/statement_timing.py）。
+
+超过阈值的语句全部记录，其余按 sample_rate 抽样；记录进入定长环形缓冲区（管理员接口读取），
+并可追加写入 JSONL 文件。只记录参数的“形状”（参数名 / 个数 / 行数），不记录参数值。
+"""
+from collections import deque
+import json
+import logging
+import random
+import threading
+import time
+from typing import Optional
+
+from app.core.config import settings
+from app.core.ring_buffer import newest_first
+from app.core.statement_timing import statement_timer
+from app.middleware.request_context import current_route
+
+logger = logging.getLogger(__name__)
+
+MAX_STATEMENT_LENGTH = 2000
+
+
+def params_shape(parameters, executemany: bool):
+    if executemany:
+        rows = list(parameters or [])
+        return {"rows": len(rows), "params": params_shape(rows[0], False) if rows else None}
+    if isinstance(parameters, dict):
+        return sorted(parameters)
+    if isinstance(parameters, (list, tuple)):
+        return len(parameters)
+    return None
+
+
+class SlowQueryRecorder:
+    def __init__(
+        self,
+        threshold_ms: float = 200,
+        sample_rate: float = 0.0,
+        max_entries: int = 500,
+        log_path: str = "",
+    ) -> None:
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+        self._records: deque[dict] = deque(maxlen=max_entries)
+        self._log_path = log_path
+        self._file_lock = threading.Lock()
+        self.queries = 0
+        self.slow = 0
+        self.sampled = 0
+
+    def install(self, engine) -> None:
+        statement_timer.subscribe(engine, self._on_statement)
+
+    def uninstall(self, engine) -> None:
+        statement_timer.unsubscribe(engine, self._on_statement)
+
+    def _on_statement(self, cursor, statement, parameters, executemany, started, ended) -> None:
+        duration_ms = (ended - started) * 1000
+        self.queries += 1
+
+        is_slow = duration_ms >= self.threshold_ms
+        if not is_slow and (self.sample_rate <= 0 or random.random() >= self.sample_rate):
+            return
+        if is_slow:
+            self.slow += 1
+        else:
+            self.sampled += 1
+        record = {
+            "at": time.time(),
+            "duration_ms": round(duration_ms, 3),
+            "slow": is_slow,
+            "route": current_route(),
+            "statement": statement[:MAX_STATEMENT_LENGTH],
+            "params": params_shape(parameters, executemany),
+        }
+        self._records.append(record)
+        if self._log_path:
+            self._write(record)
+
+    def _write(self, record: dict) -> None:
+        try:
+            line = json.dumps(record, ensure_ascii=False, default=str)
+            with self._file_lock, open(self._log_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError as e:
+            logger.error(f"Failed to write slow query log: {e}")
+
+    def records(self, limit: Optional[int] = None) -> list[dict]:
+        """最近的记录，新的在前。"""
+        return newest_first(self._records, limit)
+
+    def clear(self) -> None:
+        self._records.clear()
+
+    def stats(self) -> dict:
+        return {
+            "threshold_ms": self.threshold_ms,
+            "sample_rate": self.sample_rate,
+            "queries": self.queries,
+            "slow": self.slow,
+            "sampled": self.sampled,
+            "buffered": len(self._records),
+            "max_entries": self._records.maxlen,
+        }
+
+
+slow_query_recorder = SlowQueryRecorder(
+    threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+    sample_rate=settings.SLOW_QUERY_SAMPLE_RATE,
+    max_entries=settings.SLOW_QUERY_BUFFER_SIZE,
+    log_path=settings.SLOW_QUERY_LOG_PATH,
+)
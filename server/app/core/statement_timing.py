@@ -0,0 +1,55 @@
+"""
+SQL 语句计时：每个引擎只注册一对 before/after_cursor_execute 监听器，语句执行完后把起止时间
+发布给该引擎上的订阅者（查询计数、慢查询记录、链路追踪各自 subscribe）。
+
+订阅者的回调签名为 (cursor, statement, parameters, executemany, started, ended)，时间取自
+time.perf_counter()；最后一个订阅者退订时移除监听器。
+"""
+import time
+from typing import Callable
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import event
+
+StatementCallback = Callable[[object, str, object, bool, float, float], None]
+
+
+class StatementTimer:
+    def __init__(self) -> None:
+        self._subscribers: WeakKeyDictionary = WeakKeyDictionary()
+
+    def subscribe(self, engine, callback: StatementCallback) -> None:
+        sync_engine = getattr(engine, "sync_engine", engine)
+        callbacks = self._subscribers.setdefault(sync_engine, [])
+        if callback in callbacks:
+            return
+        callbacks.append(callback)
+        if not event.contains(sync_engine, "before_cursor_execute", self._before):
+            event.listen(sync_engine, "before_cursor_execute", self._before)
+            event.listen(sync_engine, "after_cursor_execute", self._after)
+
+    def unsubscribe(self, engine, callback: StatementCallback) -> None:
+        sync_engine = getattr(engine, "sync_engine", engine)
+        callbacks = self._subscribers.get(sync_engine)
+        if not callbacks or callback not in callbacks:
+            return
+        callbacks.remove(callback)
+        if not callbacks:
+            del self._subscribers[sync_engine]
+            event.remove(sync_engine, "before_cursor_execute", self._before)
+            event.remove(sync_engine, "after_cursor_execute", self._after)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault(self, []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        ended = time.perf_counter()
+        started_stack = conn.info.get(self)
+        if not started_stack:
+            return
+        started = started_stack.pop()
+        for callback in self._subscribers.get(conn.engine, ()):
+            callback(cursor, statement, parameters, executemany, started, ended)
+
+
+statement_timer = StatementTimer()
@@ -0,0 +1,396 @@
+"""
+进程内的轻量链路追踪：一个请求一条 trace，包含以下 span：
+- 请求（TracingMiddleware 创建的根 span，名称为 "<方法> <路由模板>"）；
+- 路由处理函数（instrument_router 包装 endpoint）；
+- app.crud 中的每个 async 函数 / 方法（instrument_crud 包装）；
+- 每条 SQL（订阅 statement_timer 发布的语句耗时，见 app/core/statement_timing.py）；
+- 响应序列化（处理函数返回到发出响应头之间，由中间件补记）。
+
+上下文通过 W3C traceparent 请求头传入：带有 traceparent 时沿用其 trace id 与采样标记，
+否则按 sample_rate 抽样。未采样的请求只多一次 contextvar 读取。完成的 trace 进入环形缓冲区
+（管理员接口读取），并可追加写入 JSONL 文件，不依赖外部 collector。
+
+写文件时客户端可以用采样标记强制落盘，因此这类强制采样每分钟最多 forced_samples_per_minute 条，
+超出后按 sample_rate 抽样。导出只在请求路径上入队，由后台任务批量写入（文件 IO 在线程中执行）；
+队列满时丢弃并计数。
+"""
+import asyncio
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+import functools
+import importlib
+import inspect
+import json
+import logging
+import pkgutil
+import random
+import re
+import secrets
+import time
+from typing import Iterator, Optional
+
+from app.core.config import settings
+from app.core.ring_buffer import newest_first
+from app.core.statement_timing import statement_timer
+
+logger = logging.getLogger(__name__)
+
+MAX_STATEMENT_LENGTH = 500
+MAX_SPANS_PER_TRACE = 1000
+TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+def parse_traceparent(value: str) -> Optional[tuple[str, str, bool]]:
+    """解析 traceparent 头，返回 (trace_id, parent_span_id, sampled)；格式不对时返回 None。"""
+    match = TRACEPARENT_RE.match(value.strip().lower())
+    if match is None:
+        return None
+    trace_id, parent_id, flags = match.groups()
+    if trace_id == "0" * 32 or parent_id == "0" * 16:
+        return None
+    return trace_id, parent_id, bool(int(flags, 16) & 1)
+
+
+class Trace:
+    def __init__(self, trace_id: str, parent_span_id: Optional[str]) -> None:
+        self.trace_id = trace_id
+        self.parent_span_id = parent_span_id
+        self.at = time.time()
+        self.spans: list["Span"] = []
+        self.dropped_spans = 0
+        # 路由处理函数返回的时间，中间件据此补记序列化 span
+        self.handler_ended: Optional[float] = None
+        self.token = None
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "start", "end", "attributes")
+
+    def __init__(self, trace: Trace, parent_id: Optional[str], name: str, start: float, attributes: dict) -> None:
+        self.trace = trace
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.start = start
+        self.end: Optional[float] = None
+        self.attributes = attributes
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+class Tracer:
+    def __init__(
+        self,
+        sample_rate: float = 0.0,
+        max_traces: int = 200,
+        export_path: str = "",
+        forced_samples_per_minute: int = 60,
+        max_pending_exports: int = 1000,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self._traces: deque[dict] = deque(maxlen=max_traces)
+        self._export_path = export_path
+        self._forced_per_minute = forced_samples_per_minute
+        self._forced_window_start = 0.0
+        self._forced_in_window = 0
+        self._pending: deque[dict] = deque()
+        self._max_pending = max_pending_exports
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.requests = 0
+        self.sampled = 0
+        self.forced_capped = 0
+        self.exported = 0
+        self.export_dropped = 0
+
+    # -- span 的创建 --
+
+    def start_trace(self, name: str, traceparent: Optional[str] = None) -> Optional[Span]:
+        """为一个请求创建根 span 并设为当前 span；不采样时返回 None。结束时调用 end_trace。"""
+        self.requests += 1
+        parent = parse_traceparent(traceparent) if traceparent else None
+        if parent is not None:
+            trace_id, parent_span_id, sampled = parent
+            if sampled and self._export_path and not self._allow_forced_sample():
+                self.forced_capped += 1
+                sampled = self._sample()
+        else:
+            trace_id, parent_span_id = secrets.token_hex(16), None
+            sampled = self._sample()
+        if not sampled:
+            return None
+        self.sampled += 1
+        trace = Trace(trace_id, parent_span_id)
+        root = Span(trace, parent_span_id, name, time.perf_counter(), {})
+        trace.spans.append(root)
+        trace.token = _current_span.set(root)
+        return root
+
+    def _sample(self) -> bool:
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def _allow_forced_sample(self) -> bool:
+        """客户端强制采样的限额：按分钟的固定窗口计数。"""
+        now = time.monotonic()
+        if now - self._forced_window_start >= 60:
+            self._forced_window_start = now
+            self._forced_in_window = 0
+        if self._forced_in_window >= self._forced_per_minute:
+            return False
+        self._forced_in_window += 1
+        return True
+
+    def end_trace(self, root: Span, detach: bool = True) -> dict:
+        """结束并保存 trace；detach=False 时保留当前 span，稍后在 start_trace 的上下文中调用 detach()。"""
+        root.end = time.perf_counter()
+        if detach:
+            self.detach(root)
+        exported = self._export(root)
+        self._traces.append(exported)
+        if self._export_path:
+            self._enqueue_export(exported)
+        return exported
+
+    def detach(self, root: Span) -> None:
+        _current_span.reset(root.trace.token)
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Optional[Span]]:
+        """在当前 trace 下创建子 span；当前请求未采样时什么也不做。"""
+        parent = _current_span.get()
+        if parent is None:
+            yield None
+            return
+        span = self._add_span(parent, name, time.perf_counter(), attributes)
+        if span is None:
+            yield None
+            return
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.attributes["error"] = type(e).__name__
+            raise
+        finally:
+            span.end = time.perf_counter()
+            _current_span.reset(token)
+
+    def record_span(self, name: str, start: float, end: float, **attributes) -> None:
+        """补记一个已经结束的子 span（SQL、序列化等由事件计时的片段）。"""
+        parent = _current_span.get()
+        if parent is not None:
+            span = self._add_span(parent, name, start, attributes)
+            if span is not None:
+                span.end = end
+
+    def _add_span(self, parent: Span, name: str, start: float, attributes: dict) -> Optional[Span]:
+        trace = parent.trace
+        if len(trace.spans) >= MAX_SPANS_PER_TRACE:
+            trace.dropped_spans += 1
+            return None
+        span = Span(trace, parent.span_id, name, start, attributes)
+        trace.spans.append(span)
+        return span
+
+    # -- 埋点 --
+
+    def traced(self, name: str):
+        """包装 async 函数：调用时在当前 trace 下创建名为 name 的 span。"""
+
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                if _current_span.get() is None:
+                    return await func(*args, **kwargs)
+                with self.span(name):
+                    return await func(*args, **kwargs)
+
+            wrapper.__traced__ = True
+            return wrapper
+
+        return decorator
+
+    def instrument_module(self, module, prefix: str) -> int:
+        """包装模块中定义的 async 函数，以及模块中定义的类的 async 方法；返回包装的个数。"""
+        count = 0
+        for attr, value in list(vars(module).items()):
+            if getattr(value, "__module__", None) != module.__name__:
+                continue
+            if inspect.iscoroutinefunction(value) and not getattr(value, "__traced__", False):
+                setattr(module, attr, self.traced(f"{prefix}.{attr}")(value))
+                count += 1
+            elif inspect.isclass(value):
+                for method_name, method in list(vars(value).items()):
+                    if inspect.iscoroutinefunction(method) and not getattr(method, "__traced__", False):
+                        setattr(value, method_name, self.traced(f"{prefix}.{value.__name__}.{method_name}")(method))
+                        count += 1
+        return count
+
+    def instrument_crud(self) -> int:
+        """为 app.crud 下每个模块的 async 函数 / 方法加 span（span 名如 crud.tasks.apply_grade）。"""
+        import app.crud
+
+        count = 0
+        for info in pkgutil.iter_modules(app.crud.__path__):
+            module = importlib.import_module(f"app.crud.{info.name}")
+            count += self.instrument_module(module, f"crud.{info.name}")
+        return count
+
+    def instrument_router(self, router) -> None:
+        """
+        包装 APIRouter 中各路由的 async endpoint。需在 include_router 之前调用：
+        FastAPI 按 route.endpoint 解析依赖并在请求时调用 dependant.call，两处都换成包装函数。
+        """
+        for route in router.routes:
+            endpoint = getattr(route, "endpoint", None)
+            if not inspect.iscoroutinefunction(endpoint) or getattr(endpoint, "__traced__", False):
+                continue
+            route.endpoint = self._traced_endpoint(endpoint)
+            dependant = getattr(route, "dependant", None)
+            if dependant is not None:
+                dependant.call = route.endpoint
+
+    def _traced_endpoint(self, endpoint):
+        name = f"handler.{endpoint.__module__.rsplit('.', 1)[-1]}.{endpoint.__name__}"
+
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            span = _current_span.get()
+            if span is None:
+                return await endpoint(*args, **kwargs)
+            try:
+                with self.span(name):
+                    return await endpoint(*args, **kwargs)
+            finally:
+                span.trace.handler_ended = time.perf_counter()
+
+        wrapper.__traced__ = True
+        return wrapper
+
+    def install(self, engine) -> None:
+        statement_timer.subscribe(engine, self._on_statement)
+
+    def uninstall(self, engine) -> None:
+        statement_timer.unsubscribe(engine, self._on_statement)
+
+    def _on_statement(self, cursor, statement, parameters, executemany, started, ended) -> None:
+        if _current_span.get() is None:
+            return
+        self.record_span(
+            "sql",
+            started,
+            ended,
+            statement=statement[:MAX_STATEMENT_LENGTH],
+            rows=cursor.rowcount if cursor.rowcount >= 0 else None,
+        )
+
+    # -- 导出 --
+
+    def _export(self, root: Span) -> dict:
+        trace = root.trace
+        origin = root.start
+        return {
+            "trace_id": trace.trace_id,
+            "parent_span_id": trace.parent_span_id,
+            "name": root.name,
+            "at": trace.at,
+            "duration_ms": round((root.end - origin) * 1000, 3),
+            "status_code": root.attributes.get("status_code"),
+            "dropped_spans": trace.dropped_spans,
+            "spans": [
+                {
+                    "span_id": span.span_id,
+                    "parent_id": span.parent_id,
+                    "name": span.name,
+                    "start_ms": round((span.start - origin) * 1000, 3),
+                    # 请求结束时仍未结束的 span（如被取消）按根 span 结束时间计
+                    "duration_ms": round(((span.end or root.end) - span.start) * 1000, 3),
+                    "attributes": span.attributes,
+                }
+                for span in trace.spans
+            ],
+        }
+
+    def _enqueue_export(self, record: dict) -> None:
+        """请求路径上调用：只追加到待导出队列，不做 IO。"""
+        if len(self._pending) >= self._max_pending:
+            self.export_dropped += 1
+            return
+        self._pending.append(record)
+        self._wakeup.set()
+
+    def start(self) -> None:
+        if self._export_path and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        """把待导出的 trace 写入 JSONL 文件，返回写入条数。"""
+        records = list(self._pending)
+        self._pending.clear()
+        if not records:
+            return 0
+        try:
+            await asyncio.to_thread(self._write, records)
+        except OSError as e:
+            logger.error(f"Failed to write {len(records)} traces: {e}")
+            return 0
+        self.exported += len(records)
+        return len(records)
+
+    def _write(self, records: list[dict]) -> None:
+        lines = "".join(json.dumps(record, ensure_ascii=False, default=str) + "\n" for record in records)
+        with open(self._export_path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+    def get(self, trace_id: str) -> Optional[dict]:
+        return next((trace for trace in self._traces if trace["trace_id"] == trace_id), None)
+
+    def traces(self, limit: Optional[int] = None) -> list[dict]:
+        """最近的 trace（不含 span 明细），新的在前。"""
+        return [
+            {**{key: value for key, value in trace.items() if key != "spans"}, "span_count": len(trace["spans"])}
+            for trace in newest_first(self._traces, limit)
+        ]
+
+    def stats(self) -> dict:
+        return {
+            "sample_rate": self.sample_rate,
+            "requests": self.requests,
+            "sampled": self.sampled,
+            "forced_capped": self.forced_capped,
+            "stored": len(self._traces),
+            "max_traces": self._traces.maxlen,
+            "export_pending": len(self._pending),
+            "exported": self.exported,
+            "export_dropped": self.export_dropped,
+        }
+
+
+tracer = Tracer(
+    sample_rate=settings.TRACE_SAMPLE_RATE,
+    max_traces=settings.TRACE_MAX_STORED,
+    export_path=settings.TRACE_EXPORT_PATH,
+    forced_samples_per_minute=settings.TRACE_FORCED_SAMPLES_PER_MINUTE,
+)
@@ -1,9 +1,16 @@
 from fastapi import HTTPException, status
-from sqlalchemy import select
-
-from app.core.security import get_password_hash
-from app.models import Announcement, Course, Role, User
-from app.schemas.announcements import AnnouncementCreate, AnnouncementUpdate
+from sqlalchemy import func, select
+
+from app.core.announcement_broadcast import announcement_broadcaster
+from app.core.principal_cache import principal_cache
+from app.core.security import get_password_hash_async
+from app.models import Announcement, AnnouncementBroadcast, Course, EmailOutbox, EmailStatus, Role, User
+from app.schemas.announcements import (
+    AnnouncementBroadcastCreate,
+    AnnouncementBroadcastOut,
+    AnnouncementCreate,
+    AnnouncementUpdate,
+)
 from app.schemas.user import UserCreate, UserUpdate
 
 
@@ -30,7 +37,7 @@ async def create_user(session, payload: UserCreate) -> User:
         role_id=payload.role_id,
         avatar_url=payload.avatar_url,
         is_active=payload.is_active,
-        password_hash=get_password_hash(payload.password),
+        password_hash=await get_password_hash_async(payload.password),
     )
     session.add(user)
     await session.commit()
@@ -57,9 +64,10 @@ async def update_user(session, user_id: int, payload: UserUpdate) -> User:
     if payload.is_active is not None:
         user.is_active = payload.is_active
     if payload.password:
-        user.password_hash = get_password_hash(payload.password)
+        user.password_hash = await get_password_hash_async(payload.password)
 
     await session.commit()
+    principal_cache.invalidate(user.id)
     await session.refresh(user)
     return user
 
@@ -71,6 +79,7 @@ async def deactivate_user(session, user_id: int) -> User:
 
     user.is_active = False
     await session.commit()
+    principal_cache.invalidate(user.id)
     await session.refresh(user)
     return user
 
@@ -109,6 +118,47 @@ async def list_announcements(session, include_inactive: bool = False) -> list[An
     return list(result.scalars().all())
 
 
+async def create_announcement_broadcast(
+    session, announcement_id: int, payload: AnnouncementBroadcastCreate, created_by: int
+) -> AnnouncementBroadcastOut:
+    announcement = await session.get(Announcement, announcement_id)
+    if not announcement:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Announcement not found")
+    if payload.course_id is not None and not await session.get(Course, payload.course_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+
+    broadcast = AnnouncementBroadcast(
+        announcement_id=announcement_id,
+        course_id=payload.course_id,
+        created_by=created_by,
+        last_student_id=0,
+        enqueued=0,
+    )
+    session.add(broadcast)
+    await session.commit()
+    await session.refresh(broadcast)
+    # 收件人解析和入队都由后台任务完成，请求立即返回
+    announcement_broadcaster.notify()
+    return AnnouncementBroadcastOut.model_validate(broadcast, from_attributes=True)
+
+
+async def get_announcement_broadcast(session, broadcast_id: int) -> AnnouncementBroadcastOut:
+    broadcast = await session.get(AnnouncementBroadcast, broadcast_id)
+    if not broadcast:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Broadcast not found")
+
+    result = await session.execute(
+        select(EmailOutbox.status, func.count())
+        .where(EmailOutbox.broadcast_id == broadcast_id)
+        .group_by(EmailOutbox.status)
+    )
+    counts = {row_status: count for row_status, count in result.all()}
+    out = AnnouncementBroadcastOut.model_validate(broadcast, from_attributes=True)
+    out.sent = counts.get(EmailStatus.SENT, 0)
+    out.failed = counts.get(EmailStatus.FAILED, 0)
+    return out
+
+
 async def list_users(
     session,
     skip: int = 0,
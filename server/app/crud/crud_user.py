@@ -1,11 +1,51 @@
+import asyncio
+import logging
 from typing import Any, Dict, Optional, Union
+from fastapi import HTTPException
+from sqlalchemy import or_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from app.core.security import get_password_hash, verify_password
+from app.core.security import get_password_hash_async, password_needs_rehash, verify_password_async
 from app.crud.base import CRUDBase
+from app.db.session import SessionLocal
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
 
+_dummy_password_hash: Optional[str] = None
+_dummy_password_hash_lock = asyncio.Lock()
+
+async def _get_dummy_password_hash() -> str:
+    # 用户不存在时也做一次同等代价的校验，使命中/未命中的耗时一致
+    global _dummy_password_hash
+    if _dummy_password_hash is None:
+        async with _dummy_password_hash_lock:
+            if _dummy_password_hash is None:
+                _dummy_password_hash = await get_password_hash_async("dummy-password-for-timing")
+    return _dummy_password_hash
+
+_background_tasks: set[asyncio.Task] = set()
+
+logger = logging.getLogger(__name__)
+
+async def _rehash_password(user_id: int, password: str, old_hash: str) -> None:
+    # 工作因子变化后在后台重算哈希；仅当哈希未被并发修改时才写回
+    try:
+        new_hash = await get_password_hash_async(password)
+    except HTTPException:
+        return  # 线程池繁忙，下次登录再试
+    async with SessionLocal() as db:
+        await db.execute(
+            update(User)
+            .where(User.id == user_id, User.password_hash == old_hash)
+            .values(password_hash=new_hash)
+        )
+        await db.commit()
+
+def _log_task_error(task: asyncio.Task) -> None:
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception():
+        logger.error(f"Password rehash failed: {task.exception()}")
+
 class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
     async def get_by_username(self, db: AsyncSession, *, username: str) -> Optional[User]:
         result = await db.execute(select(User).filter(User.username == username))
@@ -15,12 +55,24 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         result = await db.execute(select(User).filter(User.email == email))
         return result.scalars().first()
 
+    async def get_by_login(self, db: AsyncSession, *, login: str) -> Optional[User]:
+        # 一次查询同时匹配用户名和邮箱（均有索引），用户名优先
+        emails = {login, login.lower()}
+        result = await db.execute(
+            select(User).filter(or_(User.username == login, User.email.in_(emails)))
+        )
+        users = result.scalars().all()
+        for user in users:
+            if user.username == login:
+                return user
+        return users[0] if users else None
+
     async def create(self, db: AsyncSession, *, obj_in: UserCreate) -> User:
         db_obj = User(
             username=obj_in.username,
             email=obj_in.email,
             full_name=obj_in.full_name,
-            password_hash=get_password_hash(obj_in.password),
+            password_hash=await get_password_hash_async(obj_in.password),
             role_id=obj_in.role_id,
             is_active=obj_in.is_active,
         )
@@ -30,13 +82,18 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         return db_obj
 
     async def authenticate(self, db: AsyncSession, *, username: str, password: str) -> Optional[User]:
-        user = await self.get_by_username(db, username=username)
-        if not user:
-            user = await self.get_by_email(db, email=username)
+        user = await self.get_by_login(db, login=username)
+        # 先结束只读事务、归还连接，再排队等待哈希线程：登录洪峰时排队的请求不占满连接池
+        await db.commit()
         if not user:
+            await verify_password_async(password, await _get_dummy_password_hash())
             return None
-        if not verify_password(password, user.password_hash):
+        if not await verify_password_async(password, user.password_hash):
             return None
+        if password_needs_rehash(user.password_hash):
+            task = asyncio.create_task(_rehash_password(user.id, password, user.password_hash))
+            _background_tasks.add(task)
+            task.add_done_callback(_log_task_error)
         return user
 
 user = CRUDUser(User)
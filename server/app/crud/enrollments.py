@@ -1,4 +1,5 @@
 from datetime import datetime, timezone
+from app.core.pending_cache import pending_task_cache
 from app.core.time_utils import get_now
 
 
@@ -6,6 +7,7 @@ from fastapi import HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.orm import joinedload
 
+from app.crud import grading_counters
 from app.models import Course, CourseEnrollment, EnrollmentStatus, User
 
 
@@ -31,12 +33,13 @@ async def enroll_student(session, course_id: int, student_id: int) -> CourseEnro
     result = await session.execute(stmt)
     enrollment = result.scalar_one_or_none()
 
+    if enrollment and enrollment.status != EnrollmentStatus.DROPPED:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Already enrolled")
+
+    await grading_counters.record_enrollment(session, course_id, student_id, active=True)
     if enrollment:
-        if enrollment.status == EnrollmentStatus.DROPPED:
-            enrollment.status = EnrollmentStatus.ACTIVE
-            enrollment.enrolled_at = get_now()
-        else:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Already enrolled")
+        enrollment.status = EnrollmentStatus.ACTIVE
+        enrollment.enrolled_at = get_now()
     else:
         enrollment = CourseEnrollment(
             course_id=course_id,
@@ -47,6 +50,7 @@ async def enroll_student(session, course_id: int, student_id: int) -> CourseEnro
         session.add(enrollment)
 
     await session.commit()
+    pending_task_cache.invalidate(student_id)
     await session.refresh(enrollment)
     return enrollment
 
@@ -61,8 +65,10 @@ async def drop_course(session, course_id: int, student_id: int) -> CourseEnrollm
     if not enrollment or enrollment.status == EnrollmentStatus.DROPPED:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Enrollment not found")
 
+    await grading_counters.record_enrollment(session, course_id, student_id, active=False)
     enrollment.status = EnrollmentStatus.DROPPED
     await session.commit()
+    pending_task_cache.invalidate(student_id)
     await session.refresh(enrollment)
     return enrollment
 
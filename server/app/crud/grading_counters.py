@@ -0,0 +1,159 @@
+"""
+教师待批改数的计数表 grading_counters：每个课程一行，pending 为该课程中状态为 submitted / late、
+且学生仍在读（选课为 active）的提交数，口径与原来按 submissions / tasks / courses / course_enrollments
+四表连接计数相同。
+
+- submit_task、apply_grade 在修改提交状态之前调用 record_submission / record_grade，enroll_student、
+  drop_course 在修改选课状态之前调用 record_enrollment，delete_task 在删除之前调用 remove_task；
+  调整随业务修改在同一事务中提交，状态没有跨越 待批改 / 非待批改 时不读写计数行；
+- 计数行随课程一起插入（见 app/models/grading_counter.py），迁移前的课程由迁移 0011 补齐；
+- 调整前先 insert_ignore 计数行（行已存在时不改动）再 SELECT ... FOR UPDATE：MySQL 上前者已加排他锁，
+  SQLite 上前者开启写事务、生产模式下两者都走唯一的写连接，同一课程的调整都是串行的。行确实缺失时
+  （被手工删除等）由 insert_ignore 插入占位行，加锁后按 submissions 表算出当前值；
+- reconcile_grading_counters 按 submissions 表重新计算，报告并修正偏差，scripts/reconcile_grading_counters.py
+  可定期运行。
+教师首页读取只按 courses.teacher_id 索引取该教师课程的计数行，与提交数无关。
+"""
+import logging
+from typing import Iterable, Optional
+
+from sqlalchemy import func, select
+
+from app.db.upsert import insert_ignore
+from app.models import Course, CourseEnrollment, EnrollmentStatus, GradingCounter, Submission, SubmissionStatus, Task
+
+logger = logging.getLogger(__name__)
+
+PENDING_STATUSES = (SubmissionStatus.SUBMITTED, SubmissionStatus.LATE)
+UNCOMPUTED = -1  # insert_ignore 插入的占位行的 pending，加锁后重新计算
+
+
+def _is_pending(status) -> bool:
+    return status in PENDING_STATUSES
+
+
+def _pending_query():
+    """按课程分组的待批改提交数。"""
+    return (
+        select(Task.course_id, func.count(Submission.id))
+        .join(Task, Submission.task_id == Task.id)
+        .join(
+            CourseEnrollment,
+            (CourseEnrollment.course_id == Task.course_id) & (CourseEnrollment.student_id == Submission.student_id),
+        )
+        .where(Submission.status.in_(PENDING_STATUSES), CourseEnrollment.status == EnrollmentStatus.ACTIVE)
+        .group_by(Task.course_id)
+    )
+
+
+async def _compute(session, course_ids: Optional[Iterable[int]] = None) -> dict[int, int]:
+    stmt = _pending_query()
+    if course_ids is not None:
+        stmt = stmt.where(Task.course_id.in_(list(course_ids)))
+    result = await session.execute(stmt)
+    return dict(result.all())
+
+
+def _placeholders(course_ids: Iterable[int]) -> list[dict]:
+    return [{"course_id": cid, "pending": UNCOMPUTED} for cid in course_ids]
+
+
+def _counters_for_update():
+    return select(GradingCounter).with_for_update().execution_options(populate_existing=True)
+
+
+async def _adjust(session, course_id: int, delta: int) -> None:
+    if not delta:
+        return
+    await insert_ignore(session, GradingCounter, _placeholders([course_id]), key="course_id")
+    result = await session.execute(_counters_for_update().where(GradingCounter.course_id == course_id))
+    counter = result.scalar_one()
+    if counter.pending == UNCOMPUTED:
+        counter.pending = (await _compute(session, [course_id])).get(course_id, 0)
+    counter.pending += delta
+
+
+async def record_submission(session, course_id: int, old_status, new_status) -> None:
+    """submit_task 修改 / 新建提交之前调用（学生已确认在读）；新建提交时 old_status 为 None。"""
+    await _adjust(session, course_id, _is_pending(new_status) - _is_pending(old_status))
+
+
+async def record_grade(session, submission: Submission, course_id: int, new_status) -> None:
+    """apply_grade 修改提交状态之前调用；学生已退课的提交本来就不计入。"""
+    delta = _is_pending(new_status) - _is_pending(submission.status)
+    if not delta:
+        return
+    result = await session.execute(
+        select(CourseEnrollment.status).where(
+            CourseEnrollment.course_id == course_id, CourseEnrollment.student_id == submission.student_id
+        )
+    )
+    if result.scalar_one_or_none() == EnrollmentStatus.ACTIVE:
+        await _adjust(session, course_id, delta)
+
+
+async def record_enrollment(session, course_id: int, student_id: int, active: bool) -> None:
+    """选课状态在 在读 / 非在读 之间变化之前调用：该学生在此课程中的待批改提交整体计入或移出。"""
+    result = await session.execute(
+        select(func.count(Submission.id))
+        .join(Task, Submission.task_id == Task.id)
+        .where(
+            Task.course_id == course_id,
+            Submission.student_id == student_id,
+            Submission.status.in_(PENDING_STATUSES),
+        )
+    )
+    count = result.scalar_one()
+    await _adjust(session, course_id, count if active else -count)
+
+
+async def remove_task(session, task: Task) -> None:
+    """delete_task 删除作业之前调用：减去该作业的待批改提交。"""
+    result = await session.execute(
+        _pending_query().where(Task.id == task.id)
+    )
+    count = dict(result.all()).get(task.course_id, 0)
+    await _adjust(session, task.course_id, -count)
+
+
+async def get_teacher_pending_count(session, teacher_id: int) -> int:
+    result = await session.execute(
+        select(func.coalesce(func.sum(GradingCounter.pending), 0))
+        .join(Course, GradingCounter.course_id == Course.id)
+        .where(Course.teacher_id == teacher_id)
+    )
+    return result.scalar_one()
+
+
+async def reconcile_grading_counters(session, course_id: Optional[int] = None) -> dict:
+    """
+    按 submissions 表重新计算计数（course_id 为空时检查所有课程），修正偏差并补齐缺少的行；调用方负责提交。
+    返回检查的课程数、新建的行数和偏差列表。
+    """
+    counter_query = _counters_for_update()
+    course_query = select(Course.id)
+    if course_id is not None:
+        counter_query = counter_query.where(GradingCounter.course_id == course_id)
+        course_query = course_query.where(Course.id == course_id)
+    course_ids = list((await session.execute(course_query)).scalars())
+
+    # 先补齐并锁住计数行再计算：期间的调整会等待本事务结束
+    await insert_ignore(session, GradingCounter, _placeholders(course_ids), key="course_id")
+    counters = {counter.course_id: counter for counter in (await session.execute(counter_query)).scalars()}
+    actual = await _compute(session, course_ids if course_id is not None else None)
+
+    drift = []
+    created = 0
+    for cid in course_ids:
+        expected = actual.get(cid, 0)
+        counter = counters[cid]
+        if counter.pending == UNCOMPUTED:
+            created += 1
+        elif counter.pending != expected:
+            drift.append({"course_id": cid, "stored": counter.pending, "actual": expected})
+        counter.pending = expected
+    for item in drift:
+        logger.warning(
+            f"grading_counters drift for course {item['course_id']}: stored {item['stored']}, actual {item['actual']}"
+        )
+    return {"checked": len(course_ids), "created": created, "drift": drift}
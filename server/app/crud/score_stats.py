@@ -0,0 +1,271 @@
+"""
+成绩统计的增量维护：score_stats 表中每个作业、每个课程各一行。
+
+每行保存提交数、已评分数、分数和与平方和（得到均值、方差）、最小 / 最大值，以及每分一个桶的直方图
+（0..100，超出范围的分数计入两端的桶）。直方图与各项计数可以直接相加减，作业的统计合并即为课程的统计；
+近似分位数由直方图在桶内线性插值得到，误差不超过 1 分。
+
+- submit_task 新建提交时提交数 + 1；apply_grade 从统计中去掉旧分数、加入新分数；delete_task 从课程统计中
+  减去该作业的统计。这些函数需在修改 / 删除之前、同一事务中调用，随业务修改一起提交；
+- 统计行随作业 / 课程一起插入（见 app/models/score_stats.py），迁移前的数据由迁移 0010 补齐；
+- 修改前先对要改的行执行 insert_ignore（行已存在时不改动）再 SELECT ... FOR UPDATE：MySQL 上前者已加排他锁，
+  SQLite 上前者开启写事务、生产模式下两者都走唯一的写连接，同一统计行的修改都是串行的。行确实缺失时
+  （被手工删除等）由 insert_ignore 插入占位行，加锁后按 submissions 表算出当前值；
+- scripts/rebuild_score_stats.py 可全量重建，用于修复。
+读取一个课程的统计只读 1 + 作业数 行，与提交数无关。
+"""
+from typing import Iterable, Optional
+
+from sqlalchemy import and_, delete, func, or_, select
+
+from app.db.upsert import insert_ignore
+from app.models import Course, ScoreStats, Submission, Task
+from app.models.score_stats import HISTOGRAM_BUCKETS
+
+TASK = "task"
+COURSE = "course"
+UNCOMPUTED = -1  # insert_ignore 插入的占位行的 submissions，加锁后重新计算
+PERCENTILES = (25, 50, 75, 90)
+DISTRIBUTION_WIDTH = 10  # 返回的分布每 10 分一段，100 分计入最后一段
+
+
+def _bucket(score: float) -> int:
+    return min(HISTOGRAM_BUCKETS - 1, max(0, int(score)))
+
+
+def _empty(scope: str, scope_id: int) -> ScoreStats:
+    return ScoreStats(
+        scope=scope,
+        scope_id=scope_id,
+        submissions=0,
+        graded=0,
+        score_sum=0.0,
+        score_sq_sum=0.0,
+        histogram=[0] * HISTOGRAM_BUCKETS,
+    )
+
+
+def _add_scores(stats: ScoreStats, score: float, n: int = 1) -> None:
+    stats.graded += n
+    stats.score_sum += score * n
+    stats.score_sq_sum += score * score * n
+    stats.min_score = score if stats.min_score is None else min(stats.min_score, score)
+    stats.max_score = score if stats.max_score is None else max(stats.max_score, score)
+    histogram = list(stats.histogram)  # 重新赋值，JSON 列才会被标记为已修改
+    histogram[_bucket(score)] += n
+    stats.histogram = histogram
+
+
+def _remove_score(stats: ScoreStats, score: float) -> bool:
+    """去掉一个分数；返回 True 表示去掉的是最小或最大值，需要重新查询。"""
+    stats.graded -= 1
+    stats.score_sum -= score
+    stats.score_sq_sum -= score * score
+    histogram = list(stats.histogram)
+    histogram[_bucket(score)] -= 1
+    stats.histogram = histogram
+    if stats.graded == 0:
+        stats.score_sum = stats.score_sq_sum = 0.0
+        stats.min_score = stats.max_score = None
+        return False
+    return score == stats.min_score or score == stats.max_score
+
+
+def _scope_filter(scope: str, scope_id: int):
+    """submissions 表上对应统计范围的条件。"""
+    if scope == TASK:
+        return Submission.task_id == scope_id
+    return Submission.task_id.in_(select(Task.id).where(Task.course_id == scope_id))
+
+
+async def _compute(session, scope: str, scope_id: int) -> ScoreStats:
+    """按 submissions 表计算一行统计：按分数分组，一条查询。"""
+    stats = _empty(scope, scope_id)
+    result = await session.execute(
+        select(Submission.score, func.count()).where(_scope_filter(scope, scope_id)).group_by(Submission.score)
+    )
+    for score, n in result.all():
+        stats.submissions += n
+        if score is not None:
+            _add_scores(stats, float(score), n)
+    return stats
+
+
+async def _refresh_min_max(session, stats: ScoreStats, *exclude) -> None:
+    """重新查询最小 / 最大分数，exclude 为排除正在修改的行的条件。"""
+    result = await session.execute(
+        select(func.min(Submission.score), func.max(Submission.score)).where(
+            _scope_filter(stats.scope, stats.scope_id), Submission.score.is_not(None), *exclude
+        )
+    )
+    low, high = result.one()
+    stats.min_score = float(low) if low is not None else None
+    stats.max_score = float(high) if high is not None else None
+
+
+async def _load_for_update(session, keys: Iterable[tuple[str, int]]) -> list[ScoreStats]:
+    keys = list(keys)
+    placeholders = [
+        {
+            "scope": scope,
+            "scope_id": scope_id,
+            "submissions": UNCOMPUTED,
+            "graded": 0,
+            "score_sum": 0.0,
+            "score_sq_sum": 0.0,
+            "histogram": [0] * HISTOGRAM_BUCKETS,
+        }
+        for scope, scope_id in keys
+    ]
+    await insert_ignore(session, ScoreStats, placeholders, key="scope_id")
+    result = await session.execute(
+        select(ScoreStats)
+        .where(or_(*(and_(ScoreStats.scope == scope, ScoreStats.scope_id == scope_id) for scope, scope_id in keys)))
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    found = {(stats.scope, stats.scope_id): stats for stats in result.scalars()}
+    rows = []
+    for key in keys:
+        stats = found[key]
+        if stats.submissions == UNCOMPUTED:
+            computed = await _compute(session, *key)
+            for column in ("submissions", "graded", "score_sum", "score_sq_sum", "min_score", "max_score", "histogram"):
+                setattr(stats, column, getattr(computed, column))
+        rows.append(stats)
+    return rows
+
+
+async def record_submission(session, task: Task) -> None:
+    """submit_task 新建提交（尚未 add 到会话）时调用。"""
+    for stats in await _load_for_update(session, [(TASK, task.id), (COURSE, task.course_id)]):
+        stats.submissions += 1
+
+
+async def record_grade(session, submission: Submission, course_id: int, score) -> None:
+    """apply_grade 修改分数之前调用：从统计中去掉旧分数、加入新分数。"""
+    old = float(submission.score) if submission.score is not None else None
+    new = float(score) if score is not None else None
+    if old == new:
+        return
+    for stats in await _load_for_update(session, [(TASK, submission.task_id), (COURSE, course_id)]):
+        refresh = old is not None and _remove_score(stats, old)
+        if refresh:
+            await _refresh_min_max(session, stats, Submission.id != submission.id)
+        if new is not None:
+            _add_scores(stats, new)
+
+
+async def remove_task(session, task: Task) -> None:
+    """delete_task 删除作业之前调用：从课程统计中减去该作业的统计（作业的统计行随作业删除）。"""
+    task_stats, course_stats = await _load_for_update(session, [(TASK, task.id), (COURSE, task.course_id)])
+    course_stats.submissions -= task_stats.submissions
+    course_stats.graded -= task_stats.graded
+    course_stats.score_sum -= task_stats.score_sum
+    course_stats.score_sq_sum -= task_stats.score_sq_sum
+    course_stats.histogram = [a - b for a, b in zip(course_stats.histogram, task_stats.histogram)]
+    if course_stats.graded == 0:
+        course_stats.score_sum = course_stats.score_sq_sum = 0.0
+        course_stats.min_score = course_stats.max_score = None
+    elif task_stats.min_score == course_stats.min_score or task_stats.max_score == course_stats.max_score:
+        await _refresh_min_max(session, course_stats, Submission.task_id != task.id)
+
+
+def _percentile(stats: ScoreStats, pct: float) -> Optional[float]:
+    if not stats.graded:
+        return None
+    rank = pct / 100 * stats.graded
+    seen = 0
+    value = float(HISTOGRAM_BUCKETS - 1)
+    for bucket, n in enumerate(stats.histogram):
+        if n and seen + n >= rank:
+            value = bucket + (rank - seen) / n  # 桶 b 覆盖 [b, b + 1)
+            break
+        seen += n
+    return round(min(max(value, stats.min_score), stats.max_score), 2)
+
+
+def summarize(stats: ScoreStats) -> dict:
+    graded = stats.graded
+    mean = stats.score_sum / graded if graded else None
+    variance = max(0.0, stats.score_sq_sum / graded - mean * mean) if graded else None
+    distribution = [0] * (HISTOGRAM_BUCKETS // DISTRIBUTION_WIDTH)
+    for bucket, n in enumerate(stats.histogram):
+        distribution[min(bucket // DISTRIBUTION_WIDTH, len(distribution) - 1)] += n
+    return {
+        "submissions": stats.submissions,
+        "graded": graded,
+        "mean": round(mean, 2) if mean is not None else None,
+        "variance": round(variance, 2) if variance is not None else None,
+        "stddev": round(variance ** 0.5, 2) if variance is not None else None,
+        "min": stats.min_score,
+        "max": stats.max_score,
+        "percentiles": {f"p{pct}": _percentile(stats, pct) for pct in PERCENTILES},
+        "distribution": {"bucket_width": DISTRIBUTION_WIDTH, "counts": distribution},
+    }
+
+
+async def get_course_score_stats(session, course_id: int) -> dict | None:
+    """课程及其各作业的统计；课程不存在时返回 None。"""
+    course_row = await session.execute(
+        select(Course.id, ScoreStats)
+        .outerjoin(ScoreStats, and_(ScoreStats.scope == COURSE, ScoreStats.scope_id == Course.id))
+        .where(Course.id == course_id)
+    )
+    found = course_row.first()
+    if found is None:
+        return None
+    course_stats = found[1] or _empty(COURSE, course_id)
+
+    task_rows = await session.execute(
+        select(Task.id, Task.title, ScoreStats)
+        .outerjoin(ScoreStats, and_(ScoreStats.scope == TASK, ScoreStats.scope_id == Task.id))
+        .where(Task.course_id == course_id)
+        .order_by(Task.id)
+    )
+    tasks = []
+    for task_id, title, stats in task_rows.all():
+        stats = stats or _empty(TASK, task_id)
+        tasks.append({"task_id": task_id, "title": title, **summarize(stats)})
+    return {"course_id": course_id, **summarize(course_stats), "tasks": tasks}
+
+
+async def rebuild_score_stats(session, course_id: Optional[int] = None) -> int:
+    """按 submissions 表全量重建（course_id 为空时重建所有课程），返回写入的行数；调用方负责提交。"""
+    task_query = select(Task.id, Task.course_id)
+    course_query = select(Course.id)
+    if course_id is not None:
+        task_query = task_query.where(Task.course_id == course_id)
+        course_query = course_query.where(Course.id == course_id)
+
+    # 先删除旧行：拿到写锁后再读 submissions，重建期间的评分会等待本事务结束
+    if course_id is None:
+        await session.execute(delete(ScoreStats))
+    else:
+        await session.execute(
+            delete(ScoreStats).where(
+                or_(
+                    and_(ScoreStats.scope == COURSE, ScoreStats.scope_id == course_id),
+                    and_(ScoreStats.scope == TASK, ScoreStats.scope_id.in_(task_query.with_only_columns(Task.id))),
+                )
+            )
+        )
+
+    task_course = dict((await session.execute(task_query)).all())
+    rows = {(COURSE, cid): _empty(COURSE, cid) for cid in (await session.execute(course_query)).scalars()}
+    rows.update({(TASK, task_id): _empty(TASK, task_id) for task_id in task_course})
+
+    # 按 (作业, 分数) 分组一次扫描，同时累加到作业和课程
+    result = await session.execute(
+        select(Submission.task_id, Submission.score, func.count())
+        .where(Submission.task_id.in_(task_query.with_only_columns(Task.id)))
+        .group_by(Submission.task_id, Submission.score)
+    )
+    for task_id, score, n in result.all():
+        for stats in (rows[(TASK, task_id)], rows[(COURSE, task_course[task_id])]):
+            stats.submissions += n
+            if score is not None:
+                _add_scores(stats, float(score), n)
+
+    session.add_all(rows.values())
+    return len(rows)
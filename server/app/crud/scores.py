@@ -1,61 +1,47 @@
 import csv
 import io
-from typing import Iterable
+from typing import AsyncIterator, Iterable
 
 from fastapi import HTTPException, status
 from sqlalchemy import select, func
-from app.models import Submission, Task, Course, SubmissionStatus, CourseEnrollment, EnrollmentStatus
+
+from app.core.pending_cache import pending_task_cache
+from app.crud import grading_counters
+from app.models import Submission, Task, Course, SubmissionStatus, CourseEnrollment, EnrollmentStatus, User
 
 async def get_teacher_pending_grading_count(session, teacher_id: int) -> int:
+    """读取 grading_counters 中该教师各课程的计数，不再每次连接四张表计数。"""
+    return await grading_counters.get_teacher_pending_count(session, teacher_id)
+
+
+async def count_student_pending_tasks(session, student_id: int) -> int:
+    """
+    学生在读课程中尚未提交的作业数，一条查询：选课 → 作业，再左连接该学生的提交，取没有提交的行（反连接）。
+    三张表都走索引（选课的 student_id、作业的 course_id、提交的 (task_id, student_id) 唯一索引）。
+    """
     stmt = (
-        select(func.count(Submission.id))
-        .join(Task, Submission.task_id == Task.id)
-        .join(Course, Task.course_id == Course.id)
-        .join(CourseEnrollment, (CourseEnrollment.course_id == Course.id) & (CourseEnrollment.student_id == Submission.student_id))
-        .where(Course.teacher_id == teacher_id)
-        .where(Submission.status.in_([SubmissionStatus.SUBMITTED, SubmissionStatus.LATE]))
-        .where(CourseEnrollment.status == EnrollmentStatus.ACTIVE)
+        select(func.count(Task.id))
+        .select_from(CourseEnrollment)
+        .join(Task, Task.course_id == CourseEnrollment.course_id)
+        .outerjoin(Submission, (Submission.task_id == Task.id) & (Submission.student_id == student_id))
+        .where(
+            CourseEnrollment.student_id == student_id,
+            CourseEnrollment.status == EnrollmentStatus.ACTIVE,
+            Submission.id.is_(None),
+        )
     )
     result = await session.execute(stmt)
     return result.scalar_one()
 
 
 async def get_student_pending_task_count(session, student_id: int) -> int:
-    # 1. Get active enrolled course IDs
-    from app.models import CourseEnrollment, EnrollmentStatus
-    stmt_courses = select(CourseEnrollment.course_id).where(
-        CourseEnrollment.student_id == student_id,
-        CourseEnrollment.status == EnrollmentStatus.ACTIVE
-    )
-    result_courses = await session.execute(stmt_courses)
-    course_ids = result_courses.scalars().all()
-
-    if not course_ids:
-        return 0
-
-    # 2. Get submitted task IDs
-    stmt_submissions = select(Submission.task_id).where(Submission.student_id == student_id)
-    result_submissions = await session.execute(stmt_submissions)
-    submitted_task_ids = set(result_submissions.scalars().all())
-
-    # 3. Count tasks in these courses that are NOT in submitted_task_ids
-    # Note: We can do this in one complex SQL query, but this is readable and reasonably efficient for typical sizes.
-    # SQL way:
-    # SELECT count(*) FROM tasks 
-    # WHERE course_id IN (...) 
-    # AND id NOT IN (SELECT task_id FROM submissions WHERE student_id = ...)
-    
-    stmt_count = (
-        select(func.count(Task.id))
-        .where(Task.course_id.in_(course_ids))
-    )
-    
-    if submitted_task_ids:
-        stmt_count = stmt_count.where(Task.id.not_in(submitted_task_ids))
-        
-    result = await session.execute(stmt_count)
-    return result.scalar_one()
-
+    cached = pending_task_cache.get(student_id)
+    if cached is not None:
+        return cached
+    generation = pending_task_cache.generation
+    count = await count_student_pending_tasks(session, student_id)
+    pending_task_cache.put(student_id, count, generation)
+    return count
 
 
 async def get_scores_for_student(session, student_id: int) -> list[dict]:
@@ -116,18 +102,128 @@ async def get_scores_for_course(session, course_id: int) -> list[dict]:
     return scores
 
 
-async def export_scores_csv(session, course_id: int) -> str:
-    scores = await get_scores_for_course(session, course_id)
-    output = io.StringIO()
-    writer = csv.DictWriter(
-        output,
-        fieldnames=["submission_id", "course_id", "task_id", "task_title", "student_id", "score", "status", "graded_at"],
-    )
-    writer.writeheader()
-    writer.writerows(_coerce_to_strings(scores))
-    return output.getvalue()
+async def get_gradebook(session, course_id: int) -> dict | None:
+    """
+    课程成绩矩阵（学生 × 作业），课程不存在时返回 None。
 
-
-def _coerce_to_strings(rows: Iterable[dict]) -> Iterable[dict]:
+    一条查询完成：课程左连接作业、在读选课（status=active）与提交，得到每个 (学生, 作业) 一行，
+    没有提交的格子提交列为 NULL；学生总分 / 提交数与作业平均分 / 提交数用窗口函数在同一查询中算出。
+    以课程为起点左连接，没有作业或没有学生的课程也会返回另一维的列表。
+    结果按列存放：scores[i][j] 是第 i 个学生第 j 个作业的分数（未评分为 null），
+    missing[i] 是第 i 个学生未提交的作业下标。
+    """
+    student_id = CourseEnrollment.student_id
+    stmt = (
+        select(
+            Task.id,
+            Task.title,
+            student_id,
+            User.full_name,
+            User.username,
+            Submission.id,
+            Submission.score,
+            func.sum(Submission.score).over(partition_by=student_id),
+            func.count(Submission.id).over(partition_by=student_id),
+            func.avg(Submission.score).over(partition_by=Task.id),
+            func.count(Submission.id).over(partition_by=Task.id),
+        )
+        .select_from(Course)
+        .outerjoin(Task, Task.course_id == Course.id)
+        .outerjoin(
+            CourseEnrollment,
+            (CourseEnrollment.course_id == Course.id) & (CourseEnrollment.status == EnrollmentStatus.ACTIVE),
+        )
+        .outerjoin(User, User.id == student_id)
+        .outerjoin(Submission, (Submission.task_id == Task.id) & (Submission.student_id == student_id))
+        .where(Course.id == course_id)
+    )
+    rows = (await session.execute(stmt)).all()
+    if not rows:
+        return None
+
+    tasks: dict[int, tuple] = {}
+    students: dict[int, tuple] = {}
+    cells: dict[tuple[int, int], tuple] = {}
+    for (task_id, title, sid, full_name, username, submission_id, score,
+         student_total, student_submitted, task_average, task_submitted) in rows:
+        if task_id is not None:
+            tasks[task_id] = (title, _to_float(task_average), task_submitted)
+        if sid is not None:
+            students[sid] = (full_name or username, _to_float(student_total), student_submitted)
+        if task_id is not None and sid is not None and submission_id is not None:
+            cells[(sid, task_id)] = _to_float(score)
+
+    task_ids = sorted(tasks)
+    student_ids = sorted(students)
+    return {
+        "course_id": course_id,
+        "task_ids": task_ids,
+        "task_titles": [tasks[task_id][0] for task_id in task_ids],
+        "task_averages": [_round(tasks[task_id][1]) for task_id in task_ids],
+        "task_submitted": [tasks[task_id][2] for task_id in task_ids],
+        "student_ids": student_ids,
+        "student_names": [students[sid][0] for sid in student_ids],
+        "student_totals": [_round(students[sid][1]) for sid in student_ids],
+        "student_submitted": [students[sid][2] for sid in student_ids],
+        "scores": [[cells.get((sid, task_id)) for task_id in task_ids] for sid in student_ids],
+        "missing": [
+            [index for index, task_id in enumerate(task_ids) if (sid, task_id) not in cells] for sid in student_ids
+        ],
+    }
+
+
+def _to_float(value) -> float | None:
+    return float(value) if value is not None else None
+
+
+def _round(value: float | None) -> float | None:
+    return round(value, 2) if value is not None else None
+
+
+SCORE_EXPORT_COLUMNS = ["submission_id", "course_id", "task_id", "task_title", "student_id", "score", "status", "graded_at"]
+EXPORT_BATCH_ROWS = 1000
+
+
+async def stream_scores_csv(session, course_id: int, batch_rows: int = EXPORT_BATCH_ROWS) -> AsyncIterator[str]:
+    """
+    逐批生成课程成绩 CSV（供 StreamingResponse 使用）。
+
+    只查询导出的列（不加载 answer_text 等大字段和 ORM 对象），用服务端游标每次取 batch_rows 行，
+    每批写成一段 CSV 后立即交出，内存占用与课程的提交数无关。按 (task_id, student_id) 排序，可直接走
+    uq_submissions_task_student 索引，不需要额外排序。
+    """
+    stmt = (
+        select(
+            Submission.id,
+            Task.course_id,
+            Task.id,
+            Task.title,
+            Submission.student_id,
+            Submission.score,
+            Submission.status,
+            Submission.graded_at,
+        )
+        .join(Task, Submission.task_id == Task.id)
+        .where(Task.course_id == course_id)
+        .order_by(Task.id, Submission.student_id)
+        .execution_options(yield_per=batch_rows)
+    )
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(SCORE_EXPORT_COLUMNS)
+    yield output.getvalue()
+
+    result = await session.stream(stmt)
+    try:
+        async for rows in result.partitions():
+            output.seek(0)
+            output.truncate()
+            writer.writerows(_coerce_to_strings(rows))
+            yield output.getvalue()
+    finally:
+        await result.close()
+
+
+def _coerce_to_strings(rows: Iterable[tuple]) -> Iterable[tuple]:
     for row in rows:
-        yield {k: (v.isoformat() if hasattr(v, "isoformat") else v) for k, v in row.items()}
+        yield tuple(v.isoformat() if hasattr(v, "isoformat") else v for v in row)
@@ -1,10 +1,12 @@
 from datetime import datetime, timezone
+from app.core.pending_cache import pending_task_cache
 from app.core.time_utils import get_now
 
 from fastapi import HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.orm import joinedload
 
+from app.crud import grading_counters, score_stats
 from app.models import Course, CourseEnrollment, EnrollmentStatus, Submission, SubmissionStatus, Task, TaskType, User
 from app.schemas.submissions import GradeUpdate, SubmissionCreate
 from app.schemas.tasks import TaskCreate
@@ -30,6 +32,15 @@ async def _get_student_enrollment(session, course_id: int, student_id: int) -> C
     return enrollment
 
 
+async def _active_student_ids(session, course_id: int) -> list[int]:
+    stmt = select(CourseEnrollment.student_id).where(
+        CourseEnrollment.course_id == course_id,
+        CourseEnrollment.status == EnrollmentStatus.ACTIVE,
+    )
+    result = await session.execute(stmt)
+    return list(result.scalars().all())
+
+
 async def create_task(session, course_id: int, payload: TaskCreate) -> Task:
     course = await _get_course(session, course_id)
     if course.teacher_id != payload.teacher_id:
@@ -45,7 +56,9 @@ async def create_task(session, course_id: int, payload: TaskCreate) -> Task:
         deadline=payload.deadline,
     )
     session.add(task)
+    student_ids = await _active_student_ids(session, course_id)
     await session.commit()
+    pending_task_cache.invalidate(*student_ids)
     await session.refresh(task)
     return task
 
@@ -81,6 +94,10 @@ async def submit_task(session, task_id: int, payload: SubmissionCreate) -> Submi
     stmt = select(Submission).where(Submission.task_id == task_id, Submission.student_id == payload.student_id)
     result = await session.execute(stmt)
     submission = result.scalar_one_or_none()
+    created = False
+    await grading_counters.record_submission(
+        session, task.course_id, submission.status if submission else None, status_value
+    )
 
     if submission:
         submission.answer_text = payload.answer_text
@@ -88,6 +105,7 @@ async def submit_task(session, task_id: int, payload: SubmissionCreate) -> Submi
         submission.status = status_value
         submission.submitted_at = now
     else:
+        await score_stats.record_submission(session, task)
         submission = Submission(
             task_id=task_id,
             student_id=payload.student_id,
@@ -97,8 +115,11 @@ async def submit_task(session, task_id: int, payload: SubmissionCreate) -> Submi
             submitted_at=now,
         )
         session.add(submission)
+        created = True
 
     await session.commit()
+    if created:
+        pending_task_cache.invalidate(payload.student_id)
     await session.refresh(submission)
     return submission
 
@@ -117,9 +138,12 @@ async def get_submission_with_course(session, submission_id: int) -> Submission:
 
 
 async def apply_grade(session, submission: Submission, payload: GradeUpdate) -> Submission:
+    new_status = payload.status or SubmissionStatus.GRADED
+    await score_stats.record_grade(session, submission, submission.task.course_id, payload.score)
+    await grading_counters.record_grade(session, submission, submission.task.course_id, new_status)
     submission.score = payload.score
     submission.feedback = payload.feedback
-    submission.status = payload.status or SubmissionStatus.GRADED
+    submission.status = new_status
     submission.graded_at = get_now()
 
 
@@ -160,8 +184,12 @@ async def update_task(session, task_id: int, payload) -> Task:
 
 async def delete_task(session, task_id: int) -> Task:
     task = await get_task(session, task_id)
+    await score_stats.remove_task(session, task)
+    await grading_counters.remove_task(session, task)
+    student_ids = await _active_student_ids(session, task.course_id)
     await session.delete(task)
     await session.commit()
+    pending_task_cache.invalidate(*student_ids)
     return task
 
 
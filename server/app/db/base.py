@@ -7,4 +7,9 @@ from app.models.section import CourseSection
 from app.models.enrollment import CourseEnrollment
 from app.models.task import Task
 from app.models.submission import Submission
-from app.models.announcement import Announcement
+from app.models.announcement import Announcement, AnnouncementBroadcast
+from app.models.password_reset import PasswordResetCode
+from app.models.email_outbox import EmailOutbox
+from app.models.heartbeat import DbHeartbeat
+from app.models.score_stats import ScoreStats
+from app.models.grading_counter import GradingCounter
@@ -0,0 +1,112 @@
+"""
+启动时的表结构检查：比较库中 alembic_version 与迁移脚本的 head。
+
+版本一致时不执行任何 DDL（只有一次建表检查和一次 SELECT）；落后时按 DB_AUTO_MIGRATE
+在进程内执行 alembic upgrade head，或报错要求先迁移。多进程部署应在发布步骤中执行
+`alembic upgrade head` 并关闭 DB_AUTO_MIGRATE，避免多个 worker 同时迁移。
+"""
+from functools import lru_cache
+import os
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect
+
+from app.core.config import BASE_DIR
+
+# 引入 Alembic 之前由 create_all 建出的库对应的版本
+BASELINE_REVISION = "0001"
+# 该版本的表及列；没有 alembic_version 的库只有包含全部这些表和列时才 stamp 为 BASELINE_REVISION
+BASELINE_SCHEMA = {
+    "roles": {"id", "name", "description"},
+    "users": {
+        "id", "username", "password_hash", "full_name", "email", "phone", "role_id", "avatar_url",
+        "is_active", "created_at", "updated_at",
+    },
+    "course_categories": {"id", "name", "description", "created_at", "updated_at"},
+    "courses": {
+        "id", "teacher_id", "title", "description", "cover_url", "material_url", "video_url", "category_id",
+        "created_at", "updated_at", "is_active",
+    },
+    "course_sections": {
+        "id", "course_id", "title", "content", "material_url", "video_url", "order_index", "created_at", "updated_at",
+    },
+    "course_enrollments": {"id", "course_id", "student_id", "enrolled_at", "status"},
+    "tasks": {
+        "id", "course_id", "teacher_id", "title", "description", "file_url", "type", "deadline",
+        "created_at", "updated_at",
+    },
+    "submissions": {
+        "id", "task_id", "student_id", "answer_text", "file_url", "score", "feedback", "submitted_at",
+        "graded_at", "status",
+    },
+    "announcements": {"id", "title", "content", "created_by", "created_at", "is_active"},
+    "operation_logs": {"id", "user_id", "action", "created_at"},
+    "server_resources": {"id", "filename", "file_path", "url", "file_type", "size_bytes", "created_at", "created_by"},
+}
+
+
+def alembic_config() -> Config:
+    config = Config(os.path.join(BASE_DIR, "alembic.ini"))
+    config.attributes["configure_logger"] = False  # 不覆盖应用 / uvicorn 的日志配置
+    return config
+
+
+@lru_cache(maxsize=1)
+def script_heads() -> tuple[str, ...]:
+    return tuple(sorted(ScriptDirectory.from_config(alembic_config()).get_heads()))
+
+
+def _current_heads(sync_conn) -> tuple[str, ...]:
+    return tuple(sorted(MigrationContext.configure(sync_conn).get_current_heads()))
+
+
+def _missing_baseline_schema(sync_conn) -> list[str]:
+    """与 BASELINE_SCHEMA 相比缺少的表 / 列（"表" 或 "表.列"）。"""
+    inspector = inspect(sync_conn)
+    tables = set(inspector.get_table_names())
+    missing = []
+    for table, columns in BASELINE_SCHEMA.items():
+        if table not in tables:
+            missing.append(table)
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table)}
+        missing.extend(f"{table}.{column}" for column in sorted(columns - existing))
+    return missing
+
+
+def _upgrade(sync_conn) -> None:
+    config = alembic_config()
+    config.attributes["connection"] = sync_conn
+    if not MigrationContext.configure(sync_conn).get_current_heads() and inspect(sync_conn).has_table("users"):
+        # 旧版 create_all 建出的库：表结构完整时才视为 BASELINE_REVISION，之后的版本补齐新增的表和列
+        missing = _missing_baseline_schema(sync_conn)
+        if missing:
+            raise RuntimeError(
+                f"Database has no alembic_version and does not match the revision {BASELINE_REVISION} schema "
+                f"(missing: {', '.join(missing)}); migrate it manually before starting"
+            )
+        command.stamp(config, BASELINE_REVISION)
+    command.upgrade(config, "head")
+
+
+async def get_db_revision(engine) -> tuple[str, ...]:
+    async with engine.connect() as conn:
+        return await conn.run_sync(_current_heads)
+
+
+async def ensure_schema(engine, auto_migrate: bool = True) -> str:
+    """返回 "current"（无需迁移）或 "upgraded"。"""
+    current = await get_db_revision(engine)
+    if current == script_heads():
+        return "current"
+    if not auto_migrate:
+        raise RuntimeError(
+            f"Database schema is at {current or 'no revision'}, expected {script_heads()}; "
+            "run `alembic upgrade head` first"
+        )
+    async with engine.begin() as conn:
+        await conn.run_sync(_upgrade)
+    return "upgraded"
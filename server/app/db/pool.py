@@ -0,0 +1,71 @@
+"""
+带统计的连接池：在 AsyncAdaptedQueuePool 之上记录取连接的等待时间和超时次数。
+"""
+import asyncio
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.metrics import Histogram
+
+
+class PoolMetrics:
+    def __init__(self) -> None:
+        self.checkout_wait_ms = Histogram()
+        self.checkouts = 0
+        self.timeouts = 0
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    connect() 的耗时即请求等待连接的时间：池中有空闲连接时接近 0，
+    需要新建连接时包含建连耗时，池满时包含排队时间（超过 pool_timeout 抛出 TimeoutError）。
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        finally:
+            self.metrics.checkout_wait_ms.observe((time.perf_counter() - started) * 1000)
+        self.metrics.checkouts += 1
+        return connection
+
+    def stats(self) -> dict:
+        return {
+            "pool_size": self.size(),
+            "max_overflow": self._max_overflow,
+            "timeout_seconds": self.timeout(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "checkouts": self.metrics.checkouts,
+            "timeouts": self.metrics.timeouts,
+            "checkout_wait_ms": self.metrics.checkout_wait_ms.snapshot(),
+        }
+
+
+def pool_stats(engine) -> dict:
+    pool = engine.pool
+    if isinstance(pool, InstrumentedQueuePool):
+        return pool.stats()
+    return {"pool": pool.status()}
+
+
+async def warm_pool(engine, connections: int) -> int:
+    """预先建立 connections 个连接并放回池中，返回实际建立的数量。"""
+    if connections <= 0:
+        return 0
+    opened = await asyncio.gather(*(engine.connect().start() for _ in range(connections)), return_exceptions=True)
+    ready = [conn for conn in opened if not isinstance(conn, BaseException)]
+    for conn in ready:
+        await conn.close()
+    return len(ready)
@@ -0,0 +1,191 @@
+"""
+只读从库路由：只读接口通过 get_read_db 读从库，下列情况回退到主库：
+
+- 从库不可用，或复制延迟超过 REPLICA_MAX_LAG_SECONDS（由心跳检测得出）；
+- 当前用户在 REPLICA_PIN_SECONDS 内写过主库（读自己写）。
+
+读自己写要跨 worker 生效：写请求提交后，ReplicaPinMiddleware 在响应里下发短期 cookie（PIN_COOKIE，值为固定截止的
+Unix 时间戳），之后无论落在哪个 worker，带着该 cookie 的请求都读主库。截止时间超过 now + REPLICA_PIN_SECONDS 的值
+视为伪造并忽略，最多让客户端自己多读几秒主库。不保存 cookie 的客户端退回进程内的固定表（按 Authorization 头区分），
+只在处理写请求的同一 worker 内有效。
+
+延迟检测：主库每隔 REPLICA_CHECK_SECONDS 写入 db_heartbeat，再从从库读回，差值即延迟。
+"""
+import asyncio
+from collections import OrderedDict
+import hashlib
+import logging
+import time
+from typing import Optional
+
+from sqlalchemy import event, select
+
+from app.middleware.request_context import current_scope
+
+logger = logging.getLogger(__name__)
+
+PIN_COOKIE = "replica_pin"
+# 本请求提交过写操作时写入 scope，值为固定截止的 Unix 时间戳，由 ReplicaPinMiddleware 下发为 cookie
+PIN_UNTIL_KEY = "app.replica_pin_until"
+
+
+def request_pin_key() -> Optional[str]:
+    """当前请求的固定键：Authorization 头的摘要；匿名请求或请求之外返回 None。"""
+    scope = current_scope.get()
+    if scope is None:
+        return None
+    for name, value in scope.get("headers", []):
+        if name == b"authorization":
+            return hashlib.sha256(value).hexdigest()
+    return None
+
+
+def request_pin_cookie() -> Optional[float]:
+    """当前请求携带的 PIN_COOKIE 截止时间；没有或格式不对时返回 None。"""
+    scope = current_scope.get()
+    if scope is None:
+        return None
+    for name, value in scope.get("headers", []):
+        if name != b"cookie":
+            continue
+        for part in value.decode("latin-1").split(";"):
+            key, _, raw = part.strip().partition("=")
+            if key == PIN_COOKIE:
+                try:
+                    return float(raw)
+                except ValueError:
+                    return None
+    return None
+
+
+class ReplicaRouter:
+    def __init__(self, pin_seconds: float = 5, max_lag_seconds: float = 5, max_pins: int = 10_000) -> None:
+        self._pin_seconds = pin_seconds
+        self._max_lag = max_lag_seconds
+        self._max_pins = max_pins
+        self._pins: OrderedDict[str, float] = OrderedDict()
+        self.available = False
+        self.lag_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.replica_reads = 0
+        self.pinned_reads = 0
+        self.fallback_reads = 0
+
+    def pin(self, key: str) -> None:
+        self._pins[key] = time.monotonic() + self._pin_seconds
+        self._pins.move_to_end(key)
+        while len(self._pins) > self._max_pins:
+            self._pins.popitem(last=False)
+
+    @property
+    def pin_seconds(self) -> float:
+        return self._pin_seconds
+
+    def cookie_pinned(self, until: Optional[float]) -> bool:
+        """PIN_COOKIE 的截止时间是否仍有效；超过 now + pin_seconds 的值不是本服务下发的，忽略。"""
+        if until is None:
+            return False
+        now = time.time()
+        return now < until <= now + self._pin_seconds
+
+    def is_pinned(self, key: Optional[str]) -> bool:
+        if key is None:
+            return False
+        until = self._pins.get(key)
+        if until is None:
+            return False
+        if time.monotonic() >= until:
+            del self._pins[key]
+            return False
+        return True
+
+    def use_replica(self, key: Optional[str], pinned_until: Optional[float] = None) -> bool:
+        if not self.available:
+            self.fallback_reads += 1
+            return False
+        if self.cookie_pinned(pinned_until) or self.is_pinned(key):
+            self.pinned_reads += 1
+            return False
+        self.replica_reads += 1
+        return True
+
+    def mark_unavailable(self, error: Exception) -> None:
+        if self.available:
+            logger.warning(f"Read replica unavailable, reading from primary: {error}")
+        self.available = False
+        self.last_error = str(error)
+
+    def track_writes(self, session_class) -> None:
+        """
+        主库会话提交了写操作时，固定当前用户到主库。
+
+        session_class 必须是主库会话专用的 Session 子类：监听器注册在全局 Session 上会连从库会话一起跟踪。
+        """
+
+        @event.listens_for(session_class, "after_flush")
+        def _mark_flush(session, flush_context):
+            session.info[self] = True
+
+        @event.listens_for(session_class, "do_orm_execute")
+        def _mark_dml(orm_execute_state):
+            if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+                orm_execute_state.session.info[self] = True
+
+        @event.listens_for(session_class, "after_commit")
+        def _pin_writer(session):
+            if session.info.pop(self, False):
+                key = request_pin_key()
+                if key is not None:
+                    self.pin(key)
+                scope = current_scope.get()
+                if scope is not None:
+                    scope[PIN_UNTIL_KEY] = time.time() + self._pin_seconds
+
+        @event.listens_for(session_class, "after_rollback")
+        def _forget_writes(session):
+            session.info.pop(self, None)
+
+    async def check(self, primary_session_factory, replica_engine) -> None:
+        from app.models.heartbeat import DbHeartbeat
+
+        async with primary_session_factory() as session:
+            await session.merge(DbHeartbeat(id=1, beat_at=time.time()))
+            await session.commit()
+        try:
+            async with replica_engine.connect() as conn:
+                beat_at = (await conn.execute(select(DbHeartbeat.beat_at).where(DbHeartbeat.id == 1))).scalar()
+        except Exception as e:
+            self.lag_seconds = None
+            self.mark_unavailable(e)
+            return
+        if beat_at is None:
+            self.lag_seconds = None
+            self.mark_unavailable(RuntimeError("no heartbeat replicated yet"))
+            return
+        self.lag_seconds = max(0.0, time.time() - beat_at)
+        if self.lag_seconds > self._max_lag:
+            self.mark_unavailable(RuntimeError(f"replica lag {self.lag_seconds:.1f}s"))
+            return
+        if not self.available:
+            logger.info(f"Read replica available (lag {self.lag_seconds:.2f}s)")
+        self.available = True
+        self.last_error = None
+
+    async def run_monitor(self, primary_session_factory, replica_engine, interval_seconds: float) -> None:
+        while True:
+            try:
+                await self.check(primary_session_factory, replica_engine)
+            except Exception as e:
+                self.mark_unavailable(e)
+            await asyncio.sleep(interval_seconds)
+
+    def stats(self) -> dict:
+        return {
+            "available": self.available,
+            "lag_seconds": self.lag_seconds,
+            "last_error": self.last_error,
+            "pinned_users": len(self._pins),
+            "replica_reads": self.replica_reads,
+            "pinned_reads": self.pinned_reads,
+            "fallback_reads": self.fallback_reads,
+        }
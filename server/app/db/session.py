@@ -1,6 +1,13 @@
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from app.core.config import settings
+from app.core.query_counter import query_counter
+from app.core.slow_query import slow_query_recorder
+from app.core.tracing import tracer
+from app.db.pool import InstrumentedQueuePool
+from app.db.replica import ReplicaRouter, request_pin_cookie, request_pin_key
+from app.db.sqlite import apply_sqlite_pragmas, make_routing_session
 
 # 根据数据库类型设置不同的连接参数
 connect_args = {}
@@ -12,23 +19,102 @@ elif "mysql" in settings.DATABASE_URL:
         "charset": "utf8mb4",
     }
 
+sqlite_production = "sqlite" in settings.DATABASE_URL and settings.SQLITE_PRODUCTION_MODE
+
 engine = create_async_engine(
     settings.DATABASE_URL,
-    echo=True,  # 生产环境建议设为 False
+    echo=settings.SQL_ECHO,
     future=True,
     connect_args=connect_args,
-    pool_pre_ping=True,  # 连接池健康检查
-    pool_recycle=3600,   # 1小时回收连接，防止 MySQL 超时
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.SQLITE_READ_POOL_SIZE if sqlite_production else settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,  # 连接池健康检查
+    pool_recycle=settings.DB_POOL_RECYCLE,    # 默认 1 小时回收连接，防止 MySQL 超时
+)
+
+# 建表、迁移等需要写库的地方使用 write_engine；非 SQLite 生产模式下它就是 engine
+write_engine = engine
+if sqlite_production:
+    write_engine = create_async_engine(
+        settings.DATABASE_URL,
+        echo=settings.SQL_ECHO,
+        future=True,
+        connect_args=connect_args,
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    apply_sqlite_pragmas(engine)
+    apply_sqlite_pragmas(write_engine)
+
+# 只读从库（可选）
+replica_engine = None
+if settings.DATABASE_REPLICA_URL:
+    replica_engine = create_async_engine(
+        settings.DATABASE_REPLICA_URL,
+        echo=settings.SQL_ECHO,
+        future=True,
+        connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_REPLICA_URL else connect_args,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+replica_router = ReplicaRouter(
+    pin_seconds=settings.REPLICA_PIN_SECONDS,
+    max_lag_seconds=settings.REPLICA_MAX_LAG_SECONDS,
 )
 
+if settings.QUERY_COUNTER_ENABLED:
+    query_counter.install(engine)
+    query_counter.install(write_engine)
+    if replica_engine is not None:
+        query_counter.install(replica_engine)
+
+if settings.TRACING_ENABLED:
+    tracer.install(engine)
+    tracer.install(write_engine)
+    if replica_engine is not None:
+        tracer.install(replica_engine)
+
+if settings.SLOW_QUERY_LOG_ENABLED:
+    slow_query_recorder.install(engine)
+    slow_query_recorder.install(write_engine)
+    if replica_engine is not None:
+        slow_query_recorder.install(replica_engine)
+
+class PrimarySession(Session):
+    """主库会话；读自己写的监听器只注册在主库会话类上，从库会话仍用普通 Session。"""
+
+
+PrimarySessionClass = make_routing_session(engine, write_engine) if sqlite_production else PrimarySession
+
 SessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
     bind=engine,
     class_=AsyncSession,
+    sync_session_class=PrimarySessionClass,
     expire_on_commit=False
 )
 
+ReplicaSessionLocal = None
+if replica_engine is not None:
+    ReplicaSessionLocal = sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        bind=replica_engine,
+        class_=AsyncSession,
+        expire_on_commit=False
+    )
+    replica_router.track_writes(PrimarySessionClass)
+
 Base = declarative_base()
 
 async def get_db():
@@ -37,3 +123,22 @@ async def get_db():
             yield session
         finally:
             await session.close()
+
+
+async def get_read_db():
+    """只读接口使用：可用时读从库，否则（或当前用户刚写过）读主库。"""
+    session = None
+    if ReplicaSessionLocal is not None and replica_router.use_replica(request_pin_key(), request_pin_cookie()):
+        session = ReplicaSessionLocal()
+        try:
+            await session.connection()
+        except (DBAPIError, OSError) as e:
+            replica_router.mark_unavailable(e)
+            await session.close()
+            session = None
+    if session is None:
+        session = SessionLocal()
+    try:
+        yield session
+    finally:
+        await session.close()
@@ -0,0 +1,72 @@
+"""
+SQLite 生产模式：连接建立时设置 WAL 等 PRAGMA，读走连接池，写走唯一的写连接。
+
+写引擎的连接池只有 1 个连接（max_overflow=0），取连接的请求在池的异步队列中排队，
+因此同一时刻只有一个写事务，写事务之间不会互相等锁或报 "database is locked"；
+WAL 模式下读连接不阻塞写，也不被写阻塞。
+"""
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+from app.core.config import settings
+
+_WRITING = "routing_session_writing"
+
+
+def sqlite_pragmas() -> list[str]:
+    return [
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_KB}",  # 负数表示以 KiB 为单位
+        f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}",
+        f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+        "PRAGMA foreign_keys=ON",
+    ]
+
+
+def apply_sqlite_pragmas(engine) -> None:
+    pragmas = sqlite_pragmas()
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+class RoutingSession(Session):
+    """
+    flush、INSERT/UPDATE/DELETE 和 SELECT ... FOR UPDATE（读后要写）使用写引擎，其余查询使用读引擎。
+
+    事务中一旦写过，后续查询也走写连接，才能读到本事务尚未提交的修改；事务结束后恢复读写分离。
+    """
+
+    read_bind = None
+    write_bind = None
+
+    def get_bind(self, mapper=None, *, clause=None, **kw):
+        if (
+            self.info.get(_WRITING)
+            or self._flushing
+            or isinstance(clause, UpdateBase)
+            or getattr(clause, "_for_update_arg", None) is not None
+        ):
+            self.info[_WRITING] = True
+            return self.write_bind
+        return self.read_bind
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _release_writer(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(_WRITING, None)
+
+
+def make_routing_session(read_engine, write_engine) -> type[RoutingSession]:
+    return type(
+        "SQLiteRoutingSession",
+        (RoutingSession,),
+        {"read_bind": read_engine.sync_engine, "write_bind": write_engine.sync_engine},
+    )
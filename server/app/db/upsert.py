@@ -0,0 +1,30 @@
+"""
+插入时跳过已存在的行（按主键 / 唯一索引判断）。各方言写法不同：
+
+- SQLite、PostgreSQL：INSERT ... ON CONFLICT DO NOTHING；
+- MySQL：INSERT ... ON DUPLICATE KEY UPDATE key = key。不修改已有行，但和 UPDATE 一样给它加排他锁，
+  随后的 SELECT ... FOR UPDATE 不必再升级锁（INSERT IGNORE 对重复行只加共享锁，两个事务同时升级会死锁）。
+
+SQLite 上这条语句会开启写事务，同一事务之后的读取与其他写事务串行。
+"""
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+BATCH_ROWS = 500  # 每条语句的行数，避免超出 SQLite 的绑定参数上限
+
+
+def _statement(dialect: str, table, rows: list[dict], key: str):
+    if dialect == "mysql":
+        stmt = mysql.insert(table).values(rows)
+        return stmt.on_duplicate_key_update({key: table.c[key]})
+    if dialect == "postgresql":
+        return postgresql.insert(table).values(rows).on_conflict_do_nothing()
+    if dialect == "sqlite":
+        return sqlite.insert(table).values(rows).on_conflict_do_nothing()
+    raise NotImplementedError(f"insert_ignore does not support the {dialect} dialect")
+
+
+async def insert_ignore(session, model, rows: list[dict], key: str) -> None:
+    """插入 rows 中尚不存在的行；key 为唯一键中的任一列，MySQL 上把它赋值为自身。"""
+    dialect = session.get_bind().dialect.name
+    for start in range(0, len(rows), BATCH_ROWS):
+        await session.execute(_statement(dialect, model.__table__, rows[start:start + BATCH_ROWS], key))
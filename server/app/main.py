@@ -1,4 +1,10 @@
+import time
+
+_import_started = time.perf_counter()
+
+import asyncio
 from contextlib import asynccontextmanager
+import logging
 from pathlib import Path
 import os
 import sys
@@ -6,34 +12,64 @@ import sys
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from sqlalchemy import select
 
+from app.core.announcement_broadcast import announcement_broadcaster
 from app.core.config import settings
-from app.db.session import Base, SessionLocal, engine
+from app.core.email_outbox import email_outbox_sender
+from app.core.loop_monitor import loop_lag_monitor
+from app.core.operation_log import operation_log_writer
+from app.core.password_reset import password_reset_store
+from app.core.tracing import tracer
+from app.db.migrations import ensure_schema
+from app.db.pool import warm_pool
+from app.db.session import SessionLocal, engine, replica_engine, replica_router, write_engine
+from app.middleware.metrics import MetricsMiddleware
 from app.middleware.operation_log import OperationLogMiddleware
-from app.models.role import Role
+from app.middleware.profiler import ProfilerMiddleware
+from app.middleware.query_count import QueryCountMiddleware
+from app.middleware.replica_pin import ReplicaPinMiddleware
+from app.middleware.request_context import RequestContextMiddleware
+from app.middleware.tracing import TracingMiddleware
+
+logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Create tables
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    
-    # Seed roles
-    async with SessionLocal() as session:
-        result = await session.execute(select(Role))
-        roles = result.scalars().all()
-        if not roles:
-            roles_to_create = [
-                Role(id=1, name="student", description="Student role"),
-                Role(id=2, name="teacher", description="Teacher role"),
-                Role(id=3, name="admin", description="Admin role"),
-            ]
-            session.add_all(roles_to_create)
-            await session.commit()
-            print("Roles seeded.")
-            
+    # 表结构与 alembic head 一致时跳过 DDL；角色由迁移 0003 写入
+    bootstrap_started = time.perf_counter()
+    schema = await ensure_schema(write_engine, auto_migrate=settings.DB_AUTO_MIGRATE)
+    startup_timings["db_bootstrap_ms"] = (time.perf_counter() - bootstrap_started) * 1000
+
+    if settings.DB_POOL_WARMUP > 0:
+        await warm_pool(engine, settings.DB_POOL_WARMUP)
+
+    sweeper = asyncio.create_task(password_reset_store.run_sweeper(settings.PASSWORD_RESET_SWEEP_SECONDS))
+    replica_monitor = None
+    if replica_engine is not None:
+        replica_monitor = asyncio.create_task(
+            replica_router.run_monitor(SessionLocal, replica_engine, settings.REPLICA_CHECK_SECONDS)
+        )
+    email_outbox_sender.start()
+    announcement_broadcaster.start()
+    operation_log_writer.start()
+    tracer.start()
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_lag_monitor.start()
+    startup_timings["ready_ms"] = (time.perf_counter() - _import_started) * 1000
+    logger.info(
+        f"Startup: import {startup_timings['import_ms']:.0f}ms, "
+        f"db bootstrap {startup_timings['db_bootstrap_ms']:.0f}ms (schema {schema}), "
+        f"ready {startup_timings['ready_ms']:.0f}ms"
+    )
     yield
+    await loop_lag_monitor.stop()
+    await tracer.stop()
+    await operation_log_writer.stop()
+    await announcement_broadcaster.stop()
+    await email_outbox_sender.stop()
+    sweeper.cancel()
+    if replica_monitor is not None:
+        replica_monitor.cancel()
 
 app = FastAPI(title=settings.PROJECT_NAME, openapi_url=f"{settings.API_V1_STR}/openapi.json", lifespan=lifespan)
 
@@ -46,7 +82,8 @@ RESOURCE_DIR = Path(__file__).resolve().parent.parent / "resource"
 RESOURCE_DIR.mkdir(parents=True, exist_ok=True)
 app.mount("/resources", StaticFiles(directory=str(RESOURCE_DIR)), name="resources")
 
-app.add_middleware(OperationLogMiddleware)
+if settings.OPERATION_LOG_ENABLED:
+    app.add_middleware(OperationLogMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -54,6 +91,16 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if settings.PROFILER_ENABLED:
+    app.add_middleware(ProfilerMiddleware, header=settings.PROFILER_HEADER)
+app.add_middleware(QueryCountMiddleware, timing_header=settings.DEV_MODE)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+if settings.TRACING_ENABLED:
+    app.add_middleware(TracingMiddleware)
+if replica_engine is not None:
+    app.add_middleware(ReplicaPinMiddleware, router=replica_router)
+app.add_middleware(RequestContextMiddleware)
 
 @app.get("/")
 async def root():
@@ -64,6 +111,14 @@ from app.routers import admin as admin_router
 from app.routers import enrollments, scores, tasks
 from app.routers import uploads as uploads_router
 from app.routers import resources as resources_router
+from app.routers import metrics as metrics_router
+
+if settings.TRACING_ENABLED:
+    # 需在 include_router 之前包装 endpoint
+    tracer.instrument_crud()
+    for router_module in (auth, users, courses, sections, enrollments, tasks, scores,
+                          admin_router, uploads_router, resources_router):
+        tracer.instrument_router(router_module.router)
 
 app.include_router(auth.router, prefix=f"{settings.API_V1_STR}/auth", tags=["auth"])
 app.include_router(users.router, prefix=f"{settings.API_V1_STR}/users", tags=["users"])
@@ -75,6 +130,12 @@ app.include_router(scores.router, prefix=settings.API_V1_STR, tags=["scores"])
 app.include_router(admin_router.router, prefix=settings.API_V1_STR, tags=["admin"])
 app.include_router(uploads_router.router, prefix=settings.API_V1_STR, tags=["uploads"])
 app.include_router(resources_router.router, prefix=settings.API_V1_STR, tags=["resources"])
+if settings.METRICS_ENABLED:
+    app.include_router(metrics_router.router, tags=["metrics"])
+
+# 启动耗时（毫秒）：模块导入、表结构检查 / 迁移、从导入开始到可以接收请求
+startup_timings = {"import_ms": (time.perf_counter() - _import_started) * 1000}
+app.state.startup_timings = startup_timings
 
 
 if __name__ == "__main__":
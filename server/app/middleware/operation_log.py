@@ -1,17 +1,50 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-import logging
-
-logger = logging.getLogger("uvicorn")
-
-class OperationLogMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        # Log the request
-        logger.info(f"Request: {request.method} {request.url}")
-        
-        response = await call_next(request)
-        
-        # Log the response status
-        logger.info(f"Response status: {response.status_code}")
-        
-        return response
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.operation_log import OperationLogWriter, operation_log_writer
+from app.core.time_utils import get_now
+from app.middleware.request_context import USER_ID_KEY, route_path
+
+
+class OperationLogMiddleware:
+    """
+    纯 ASGI 中间件：记录用户、路由模板、方法、状态码和耗时，交给 OperationLogWriter 批量写库。
+
+    不包装响应体，文件 / 视频流式响应原样透传；耗时统计到响应发送完毕。
+    """
+
+    def __init__(self, app: ASGIApp, writer: OperationLogWriter = operation_log_writer) -> None:
+        self.app = app
+        self.writer = writer
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            method = scope["method"]
+            route = route_path(scope)
+            self.writer.record(
+                {
+                    "user_id": scope.get(USER_ID_KEY),
+                    "action": f"{method} {route}"[:255],
+                    "method": method,
+                    "route": route[:255],
+                    "status_code": status_code,
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+                    "created_at": get_now(),
+                }
+            )
@@ -0,0 +1,92 @@
+import sys
+import time
+
+from fastapi import HTTPException
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.profiler import RequestProfiler, request_profiler
+from app.core.query_counter import current_query_stats
+from app.db.session import SessionLocal
+from app.middleware.request_context import route_path
+from app.routers import _decode_token, load_principal
+
+
+def _header(scope: Scope, name: bytes) -> bytes:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value
+    return b""
+
+
+async def _is_admin(scope: Scope) -> bool:
+    authorization = _header(scope, b"authorization").decode("latin-1")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        user_id = int(_decode_token(token).sub)
+    except (HTTPException, TypeError, ValueError):
+        return False
+    async with SessionLocal() as db:
+        principal = await load_principal(db, user_id)
+    return principal is not None and principal.is_active and principal.role_id == 3
+
+
+class ProfilerMiddleware:
+    """
+    纯 ASGI 中间件：管理员请求带 X-Profile 头时在采样分析器下运行，响应头 X-Profile-Id 返回结果编号
+    （GET /admin/profiles/{id} 读取）。普通请求只多一次请求头查找。
+    """
+
+    def __init__(self, app: ASGIApp, profiler: RequestProfiler = request_profiler, header: str = "x-profile") -> None:
+        self.app = app
+        self.profiler = profiler
+        self.header = header.lower().encode("latin-1")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not _header(scope, self.header):
+            await self.app(scope, receive, send)
+            return
+        if not await _is_admin(scope):
+            self.profiler.rejected_unauthorized += 1
+            await self.app(scope, receive, send)
+            return
+        if not self.profiler.try_acquire():
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        session = self.profiler.begin(sys._getframe())
+        started = time.perf_counter()
+        finished = False
+
+        def finish() -> None:
+            nonlocal finished
+            finished = True
+            stats = current_query_stats()
+            self.profiler.finish(
+                session,
+                method=scope["method"],
+                route=route_path(scope),
+                status_code=status_code,
+                wall_ms=(time.perf_counter() - started) * 1000,
+                db_ms=stats.duration_ms if stats is not None else None,
+                query_count=stats.count if stats is not None else None,
+            )
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("X-Profile-Id", str(session.profile_id))
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                # 在发出最后一块响应体之前保存结果，客户端收到响应后即可按 X-Profile-Id 读取
+                finish()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if not finished:
+                finish()
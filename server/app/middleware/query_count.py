@@ -0,0 +1,36 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.query_counter import count_queries, query_counter
+from app.middleware.request_context import current_route
+
+
+class QueryCountMiddleware:
+    """
+    纯 ASGI 中间件：统计每个请求执行的 SQL 条数与耗时，请求结束后检查疑似 N+1。
+
+    timing_header 为真时（开发模式）在响应头加 Server-Timing: db;dur=<毫秒>;desc="<条数> queries"，
+    只统计响应头发出之前执行的语句。
+    """
+
+    def __init__(self, app: ASGIApp, timing_header: bool = False) -> None:
+        self.app = app
+        self.timing_header = timing_header
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with count_queries() as stats:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start" and self.timing_header:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", f'db;dur={stats.duration_ms:.1f};desc="{stats.count} queries"')
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                query_counter.finish(stats, current_route())
@@ -0,0 +1,36 @@
+import math
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.db.replica import PIN_COOKIE, PIN_UNTIL_KEY, ReplicaRouter
+
+
+class ReplicaPinMiddleware:
+    """
+    纯 ASGI 中间件：请求提交过主库写操作时，在响应里下发 PIN_COOKIE（见 app/db/replica.py），
+    让之后落在任意 worker 上的读请求在 REPLICA_PIN_SECONDS 内读主库。只处理响应头发出之前提交的写操作。
+    """
+
+    def __init__(self, app: ASGIApp, router: ReplicaRouter) -> None:
+        self.app = app
+        self.router = router
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                until = scope.get(PIN_UNTIL_KEY)
+                if until is not None:
+                    headers = MutableHeaders(scope=message)
+                    headers.append(
+                        "Set-Cookie",
+                        f"{PIN_COOKIE}={until:.3f}; Max-Age={math.ceil(self.router.pin_seconds)}; "
+                        "Path=/; HttpOnly; SameSite=Lax",
+                    )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,65 @@
+from contextvars import ContextVar
+from typing import Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# 当前请求的 ASGI scope；路由匹配后 Starlette 会把 route 写入同一个 scope 字典
+current_scope: ContextVar[Optional[Scope]] = ContextVar("current_scope", default=None)
+
+
+# 认证依赖解析出当前用户后写入 scope，供操作日志等外层中间件读取
+USER_ID_KEY = "app.user_id"
+
+
+def route_template(scope: Scope) -> Optional[str]:
+    """
+    路由模板（如 "/api/v1/courses/{course_id}"），未匹配到路由时返回 None。
+
+    较新的 FastAPI 中 include_router 不再复制路由，scope["route"] 是 APIRouter 里定义的原路由（不含前缀），
+    带前缀的完整模板在 scope["fastapi"]["effective_route_context"] 上；静态文件等 Mount 只留下 root_path。
+    """
+    fastapi_scope = scope.get("fastapi")
+    effective = fastapi_scope.get("effective_route_context") if isinstance(fastapi_scope, dict) else None
+    path = getattr(effective, "path_format", None) or getattr(scope.get("route"), "path_format", None)
+    if path:
+        return path
+    app_root = scope.get("app_root_path", "")
+    if scope.get("endpoint") is not None and scope.get("root_path", "") != app_root:
+        return scope["root_path"][len(app_root):] + "/{path}"
+    return None
+
+
+def route_path(scope: Scope) -> str:
+    """路由模板；未匹配到路由时为原始路径。"""
+    return route_template(scope) or scope.get("path", "")
+
+
+def current_route() -> Optional[str]:
+    """当前请求的路由模板（如 "GET /api/v1/courses/{course_id}"），请求之外返回 None。"""
+    scope = current_scope.get()
+    if scope is None:
+        return None
+    return f"{scope.get('method', '')} {route_path(scope)}"
+
+
+def set_current_user_id(user_id: int) -> None:
+    scope = current_scope.get()
+    if scope is not None:
+        scope[USER_ID_KEY] = user_id
+
+
+class RequestContextMiddleware:
+    """纯 ASGI 中间件：把请求 scope 放进 contextvar，供 SQL 事件等请求外层代码读取。"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_scope.reset(token)
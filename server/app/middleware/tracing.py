@@ -0,0 +1,57 @@
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.tracing import Tracer, tracer
+from app.middleware.request_context import route_path
+
+
+class TracingMiddleware:
+    """
+    纯 ASGI 中间件：为采样到的请求创建根 span（读取 traceparent 请求头），响应头 X-Trace-Id 返回 trace id；
+    处理函数返回后到发出响应头之间记为序列化 span。
+    """
+
+    def __init__(self, app: ASGIApp, tracer: Tracer = tracer) -> None:
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        traceparent = next((value for key, value in scope["headers"] if key == b"traceparent"), None)
+        root = self.tracer.start_trace(
+            f"{scope['method']} {scope['path']}", traceparent.decode("latin-1") if traceparent else None
+        )
+        if root is None:
+            await self.app(scope, receive, send)
+            return
+
+        ended = False
+
+        def end() -> None:
+            nonlocal ended
+            ended = True
+            root.name = f"{scope['method']} {route_path(scope)}"
+            self.tracer.end_trace(root, detach=False)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                root.attributes["status_code"] = message["status"]
+                handler_ended = root.trace.handler_ended
+                if handler_ended is not None:
+                    self.tracer.record_span("serialize_response", handler_ended, time.perf_counter())
+                MutableHeaders(scope=message).append("X-Trace-Id", root.trace.trace_id)
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                # 在发出最后一块响应体之前保存 trace，客户端收到响应后即可按 X-Trace-Id 读取
+                end()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if not ended:
+                end()
+            self.tracer.detach(root)
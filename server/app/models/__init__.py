@@ -5,8 +5,13 @@ from .course import Course, CourseCategory
 from .enrollment import CourseEnrollment, EnrollmentStatus
 from .task import Task, TaskType
 from .submission import Submission, SubmissionStatus
-from .announcement import Announcement
+from .announcement import Announcement, AnnouncementBroadcast, BroadcastStatus
 from .resource import Resource
+from .password_reset import PasswordResetCode
+from .email_outbox import EmailOutbox, EmailStatus
+from .heartbeat import DbHeartbeat
+from .score_stats import ScoreStats
+from .grading_counter import GradingCounter
 
 __all__ = [
     "Base",
@@ -21,5 +26,13 @@ __all__ = [
     "Submission",
     "SubmissionStatus",
     "Announcement",
+    "AnnouncementBroadcast",
+    "BroadcastStatus",
     "Resource",
+    "PasswordResetCode",
+    "EmailOutbox",
+    "EmailStatus",
+    "DbHeartbeat",
+    "ScoreStats",
+    "GradingCounter",
 ]
@@ -18,16 +18,16 @@ class Course(Base):
     __tablename__ = "courses"
 
     id = Column(Integer, primary_key=True, index=True)
-    teacher_id = Column(Integer, ForeignKey("users.id"))
+    teacher_id = Column(Integer, ForeignKey("users.id"), index=True)
     title = Column(String(100), index=True, nullable=False)
     description = Column(Text)
     cover_url = Column(String(255))
     material_url = Column(String(255))
     video_url = Column(String(255))
-    category_id = Column(Integer, ForeignKey("course_categories.id"))
+    category_id = Column(Integer, ForeignKey("course_categories.id"), index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
-    is_active = Column(Boolean, default=True)
+    is_active = Column(Boolean, default=True, index=True)
 
     teacher = relationship("User", backref="courses_taught")
     category = relationship("CourseCategory", back_populates="courses")
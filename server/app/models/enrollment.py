@@ -26,10 +26,11 @@ class CourseEnrollment(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     course_id: Mapped[int] = mapped_column(ForeignKey("courses.id"))
-    student_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    student_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
     enrolled_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     status: Mapped[EnrollmentStatus] = mapped_column(
-        Enum(EnrollmentStatus, name="enrollment_status", values_callable=lambda x: [e.value for e in x])
+        Enum(EnrollmentStatus, name="enrollment_status", values_callable=lambda x: [e.value for e in x]),
+        index=True,
     )
 
     course: Mapped["Course"] = relationship(back_populates="enrollments")
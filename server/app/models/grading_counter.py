@@ -0,0 +1,29 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, event
+from sqlalchemy.sql import func
+from app.db.session import Base
+from .course import Course
+
+
+class GradingCounter(Base):
+    """
+    每个课程的待批改提交数，提交、评分、选课状态变化时在同一事务中调整（见 app/crud/grading_counters.py）。
+
+    课程插入时在同一次 flush 中写入 pending 为 0 的行，删除课程前删除该行；已有课程的行由迁移 0011 补齐。
+    """
+
+    __tablename__ = "grading_counters"
+
+    course_id = Column(Integer, ForeignKey("courses.id"), primary_key=True)
+    pending = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+@event.listens_for(Course, "after_insert")
+def _course_inserted(mapper, connection, target) -> None:
+    connection.execute(GradingCounter.__table__.insert().values(course_id=target.id, pending=0))
+
+
+@event.listens_for(Course, "before_delete")
+def _course_deleted(mapper, connection, target) -> None:
+    table = GradingCounter.__table__
+    connection.execute(table.delete().where(table.c.course_id == target.id))
@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from sqlalchemy import Float, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.session import Base
+
+
+class DbHeartbeat(Base):
+    """主库定时写入的心跳（Unix 时间戳），在从库读到的值用于估算复制延迟。"""
+
+    __tablename__ = "db_heartbeat"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    beat_at: Mapped[float] = mapped_column(Float)
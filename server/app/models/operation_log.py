@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey
 from sqlalchemy.sql import func
 from app.db.session import Base
 
@@ -6,6 +6,11 @@ class OperationLog(Base):
     __tablename__ = "operation_logs"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
-    action = Column(String(255), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # 匿名请求为空；删除用户时保留其日志
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), index=True)
+    action = Column(String(255), nullable=False)  # "<方法> <路由模板>"
+    method = Column(String(10))
+    route = Column(String(255))
+    status_code = Column(Integer)
+    duration_ms = Column(Float)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
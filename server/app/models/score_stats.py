@@ -0,0 +1,71 @@
+from sqlalchemy import JSON, Column, DateTime, Float, Index, Integer, String, event
+from sqlalchemy.sql import func
+from app.db.session import Base
+from .course import Course
+from .task import Task
+
+HISTOGRAM_BUCKETS = 101
+
+
+class ScoreStats(Base):
+    """
+    按作业 / 课程汇总的成绩统计，评分和提交时增量更新（见 app/crud/score_stats.py）。
+
+    scope 为 "task" 或 "course"，scope_id 为对应的作业 / 课程 id；histogram 每分一个桶（0..100）。
+    每个作业、课程插入时在同一次 flush 中写入一行空统计、删除时删除该行，已有数据的行由迁移 0010 补齐。
+    """
+
+    __tablename__ = "score_stats"
+    __table_args__ = (Index("uq_score_stats_scope", "scope", "scope_id", unique=True),)
+
+    id = Column(Integer, primary_key=True)
+    scope = Column(String(10), nullable=False)
+    scope_id = Column(Integer, nullable=False)
+    submissions = Column(Integer, nullable=False, default=0)
+    graded = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Float, nullable=False, default=0.0)
+    score_sq_sum = Column(Float, nullable=False, default=0.0)
+    min_score = Column(Float)
+    max_score = Column(Float)
+    histogram = Column(JSON, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+def _insert_empty(connection, scope: str, scope_id: int) -> None:
+    connection.execute(
+        ScoreStats.__table__.insert().values(
+            scope=scope,
+            scope_id=scope_id,
+            submissions=0,
+            graded=0,
+            score_sum=0.0,
+            score_sq_sum=0.0,
+            histogram=[0] * HISTOGRAM_BUCKETS,
+        )
+    )
+
+
+@event.listens_for(Course, "after_insert")
+def _course_inserted(mapper, connection, target) -> None:
+    _insert_empty(connection, "course", target.id)
+
+
+@event.listens_for(Task, "after_insert")
+def _task_inserted(mapper, connection, target) -> None:
+    _insert_empty(connection, "task", target.id)
+
+
+def _delete(connection, scope: str, scope_id: int) -> None:
+    table = ScoreStats.__table__
+    connection.execute(table.delete().where(table.c.scope == scope, table.c.scope_id == scope_id))
+
+
+@event.listens_for(Course, "after_delete")
+def _course_deleted(mapper, connection, target) -> None:
+    # 不删除的话 SQLite 可能复用被删除的最大 id，新课程 / 作业插入统计行时违反唯一索引
+    _delete(connection, "course", target.id)
+
+
+@event.listens_for(Task, "after_delete")
+def _task_deleted(mapper, connection, target) -> None:
+    _delete(connection, "task", target.id)
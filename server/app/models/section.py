@@ -1,10 +1,12 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.session import Base
 
 class CourseSection(Base):
     __tablename__ = "course_sections"
+    # (course_id, order_index) 同时覆盖按 course_id 过滤，不再单独建 course_id 索引
+    __table_args__ = (Index("ix_course_sections_course_order", "course_id", "order_index"),)
 
     id = Column(Integer, primary_key=True, index=True)
     course_id = Column(Integer, ForeignKey("courses.id"))
@@ -4,7 +4,7 @@ import enum
 from datetime import datetime
 from typing import Optional, TYPE_CHECKING
 
-from sqlalchemy import DateTime, Enum, ForeignKey, Integer, Numeric, String, Text
+from sqlalchemy import DateTime, Enum, ForeignKey, Index, Integer, Numeric, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
@@ -23,19 +23,22 @@ class SubmissionStatus(str, enum.Enum):
 
 class Submission(Base):
     __tablename__ = "submissions"
+    # 每个学生每个任务只有一份提交（submit_task 按此覆盖），同时是按 task_id 查询的索引
+    __table_args__ = (Index("uq_submissions_task_student", "task_id", "student_id", unique=True),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     task_id: Mapped[int] = mapped_column(ForeignKey("tasks.id"))
-    student_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    student_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
     answer_text: Mapped[Optional[str]] = mapped_column(Text)
     file_url: Mapped[Optional[str]] = mapped_column(String(255))
     score: Mapped[Optional[float]] = mapped_column(Numeric(5, 2))
     feedback: Mapped[Optional[str]] = mapped_column(Text)
-    submitted_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    submitted_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), index=True)
     graded_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     status: Mapped[SubmissionStatus] = mapped_column(
         Enum(SubmissionStatus, name="submission_status", values_callable=lambda x: [e.value for e in x]),
-        default=SubmissionStatus.SUBMITTED
+        default=SubmissionStatus.SUBMITTED,
+        index=True,
     )
 
     task: Mapped["Task"] = relationship(back_populates="submissions")
@@ -24,15 +24,16 @@ class Task(Base):
     __tablename__ = "tasks"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    course_id: Mapped[int] = mapped_column(ForeignKey("courses.id"))
-    teacher_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    course_id: Mapped[int] = mapped_column(ForeignKey("courses.id"), index=True)
+    teacher_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
     title: Mapped[str] = mapped_column(String(100))
     description: Mapped[Optional[str]] = mapped_column(Text)
     file_url: Mapped[Optional[str]] = mapped_column(String(255))
     type: Mapped[TaskType] = mapped_column(
-        Enum(TaskType, name="task_type", values_callable=lambda x: [e.value for e in x])
+        Enum(TaskType, name="task_type", values_callable=lambda x: [e.value for e in x]),
+        index=True,
     )
-    deadline: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    deadline: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), index=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
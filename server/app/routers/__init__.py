@@ -5,8 +5,11 @@ from jose import jwt, JWTError
 from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
+from app.core.principal_cache import Principal, principal_cache
+from app.core.token_cache import token_cache
 from app.crud.crud_user import user as crud_user
 from app.db.session import get_db
+from app.middleware.request_context import set_current_user_id
 from app.models.user import User
 from app.schemas.token import TokenData
 
@@ -14,23 +17,33 @@ reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login"
 )
 
-async def get_current_user(
-    db: AsyncSession = Depends(get_db),
-    token: str = Depends(reusable_oauth2)
-) -> User:
+def _decode_token(token: str) -> TokenData:
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        token_data = TokenData(**payload)
+        payload = token_cache.get(token)
+        if payload is None:
+            payload = jwt.decode(
+                token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+            )
+            token_cache.put(token, payload)
+        return TokenData(**payload)
     except (JWTError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
+
+async def get_current_user(
+    db: AsyncSession = Depends(get_db),
+    token: str = Depends(reusable_oauth2)
+) -> User:
+    token_data = _decode_token(token)
+    # 查询前取 generation：查询期间用户被停用 / 降级并失效缓存时，不把旧的 Principal 写回
+    generation = principal_cache.generation
     user = await crud_user.get(db, id=int(token_data.sub))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    principal_cache.put(user.id, Principal.from_user(user), generation)
+    set_current_user_id(user.id)
     return user
 
 async def get_current_active_user(
@@ -40,10 +53,40 @@ async def get_current_active_user(
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
+async def load_principal(db: AsyncSession, user_id: int) -> Optional[Principal]:
+    # 命中缓存时不访问数据库（AsyncSession 在首次执行语句前不会取连接）
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        generation = principal_cache.generation
+        user = await crud_user.get(db, id=user_id)
+        if not user:
+            return None
+        principal = Principal.from_user(user)
+        principal_cache.put(user_id, principal, generation)
+    return principal
+
+async def get_current_principal(
+    db: AsyncSession = Depends(get_db),
+    token: str = Depends(reusable_oauth2)
+) -> Principal:
+    token_data = _decode_token(token)
+    principal = await load_principal(db, int(token_data.sub))
+    if principal is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    set_current_user_id(principal.id)
+    return principal
+
+async def get_current_active_principal(
+    current_user: Principal = Depends(get_current_principal),
+) -> Principal:
+    if not current_user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return current_user
+
 def require_roles(*role_ids: int):
     async def _role_checker(
-        current_user: User = Depends(get_current_active_user),
-    ) -> User:
+        current_user: Principal = Depends(get_current_active_principal),
+    ) -> Principal:
         if current_user.role_id not in role_ids:
             raise HTTPException(status_code=403, detail="Not enough permissions")
         return current_user
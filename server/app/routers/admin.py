@@ -1,11 +1,26 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.principal_cache import Principal, principal_cache
+from app.core.security import password_hash_pool
+from app.core.loop_monitor import loop_lag_monitor
+from app.core.operation_log import operation_log_writer
+from app.core.profiler import request_profiler
+from app.core.query_counter import query_counter
+from app.core.slow_query import slow_query_recorder
+from app.core.token_cache import token_cache
+from app.core.tracing import tracer
 from app.crud import admin as crud_admin
-from app.db.session import get_db
-from app.models.user import User
-from app.routers import get_current_active_user, require_roles
-from app.schemas.announcements import AnnouncementCreate, AnnouncementOut, AnnouncementUpdate
+from app.db.pool import pool_stats
+from app.db.session import engine, get_db, get_read_db, replica_engine, replica_router, write_engine
+from app.routers import get_current_active_principal, require_roles
+from app.schemas.announcements import (
+    AnnouncementBroadcastCreate,
+    AnnouncementBroadcastOut,
+    AnnouncementCreate,
+    AnnouncementOut,
+    AnnouncementUpdate,
+)
 from app.schemas.user import UserCreate, UserUpdate, UserResponse
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
@@ -15,7 +30,7 @@ router = APIRouter(prefix="/admin", tags=["Admin"])
 async def create_user(
     payload: UserCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_roles(3)),
+    current_user: Principal = Depends(require_roles(3)),
 ):
     user = await crud_admin.create_user(db, payload)
     return UserResponse.model_validate(user, from_attributes=True)
@@ -27,7 +42,7 @@ async def list_users(
     role_id: int | None = None,
     is_active: bool | None = None,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_roles(3)),
+    current_user: Principal = Depends(require_roles(3)),
 ):
     users = await crud_admin.list_users(db, skip=skip, limit=limit, role_id=role_id, is_active=is_active)
     return [UserResponse.model_validate(user, from_attributes=True) for user in users]
@@ -38,7 +53,7 @@ async def update_user(
     user_id: int,
     payload: UserUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_roles(3)),
+    current_user: Principal = Depends(require_roles(3)),
 ):
     user = await crud_admin.update_user(db, user_id, payload)
     return UserResponse.model_validate(user, from_attributes=True)
@@ -48,17 +63,126 @@ async def update_user(
 async def delete_user(
     user_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_roles(3)),
+    current_user: Principal = Depends(require_roles(3)),
 ):
     user = await crud_admin.deactivate_user(db, user_id)
     return UserResponse.model_validate(user, from_attributes=True)
 
 
+@router.get("/principal-cache/stats")
+async def get_principal_cache_stats(
+    current_user: Principal = Depends(require_roles(3)),
+):
+    return principal_cache.stats()
+
+
+@router.get("/password-hash/stats")
+async def get_password_hash_stats(
+    current_user: Principal = Depends(require_roles(3)),
+):
+    return password_hash_pool.stats()
+
+
+@router.get("/token-cache/stats")
+async def get_token_cache_stats(
+    current_user: Principal = Depends(require_roles(3)),
+):
+    return token_cache.stats()
+
+
+@router.get("/db-pool/stats")
+async def get_db_pool_stats(
+    current_user: Principal = Depends(require_roles(3)),
+):
+    stats = pool_stats(engine)
+    if write_engine is not engine:
+        stats["writer"] = pool_stats(write_engine)
+    if replica_engine is not None:
+        stats["replica"] = pool_stats(replica_engine)
+    return stats
+
+
+@router.get("/replica/stats")
+async def get_replica_stats(
+    current_user: Principal = Depends(require_roles(3)),
+):
+    return {"configured": replica_engine is not None, **replica_router.stats()}
+
+
+@router.get("/slow-queries")
+async def get_slow_queries(
+    limit: int = 100,
+    current_user: Principal = Depends(require_roles(3)),
+):
+    return {"stats": slow_query_recorder.stats(), "records": slow_query_recorder.records(limit)}
+
+
+@router.get("/loop-lag")
+async def get_loop_lag(
+    limit: int = 50,
+    current_user: Principal = Depends(require_roles(3)),
+):
+    return {"stats": loop_lag_monitor.stats(), "reports": loop_lag_monitor.reports(limit)}
+
+
+@router.get("/profiles")
+async def list_profiles(
+    limit: int = 50,
+    current_user: Principal = Depends(require_roles(3)),
+):
+    return {"stats": request_profiler.stats(), "profiles": request_profiler.summaries(limit)}
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(
+    profile_id: int,
+    current_user: Principal = Depends(require_roles(3)),
+):
+    profile = request_profiler.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
+
+
+@router.get("/traces")
+async def list_traces(
+    limit: int = 50,
+    current_user: Principal = Depends(require_roles(3)),
+):
+    return {"stats": tracer.stats(), "traces": tracer.traces(limit)}
+
+
+@router.get("/traces/{trace_id}")
+async def get_trace(
+    trace_id: str,
+    current_user: Principal = Depends(require_roles(3)),
+):
+    trace = tracer.get(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    return trace
+
+
+@router.get("/operation-logs/stats")
+async def get_operation_log_stats(
+    current_user: Principal = Depends(require_roles(3)),
+):
+    return operation_log_writer.stats()
+
+
+@router.get("/query-stats")
+async def get_query_stats(
+    limit: int = 100,
+    current_user: Principal = Depends(require_roles(3)),
+):
+    return {"stats": query_counter.stats(), "n_plus_one": query_counter.suspects(limit)}
+
+
 @router.delete("/courses/{course_id}")
 async def delete_course(
     course_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_roles(3)),
+    current_user: Principal = Depends(require_roles(3)),
 ):
     course = await crud_admin.deactivate_course(db, course_id)
     return {"course_id": course.id, "is_active": course.is_active}
@@ -68,7 +192,7 @@ async def delete_course(
 async def create_announcement(
     payload: AnnouncementCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_roles(3)),
+    current_user: Principal = Depends(require_roles(3)),
 ):
     return await crud_admin.create_announcement(db, payload)
 
@@ -76,20 +200,39 @@ async def create_announcement(
 @router.get("/announcements", response_model=list[AnnouncementOut])
 async def list_announcements(
     include_inactive: bool = False,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_active_principal),
 ):
     if include_inactive and current_user.role_id != 3:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     return await crud_admin.list_announcements(db, include_inactive)
 
 
+@router.post("/announcements/{announcement_id}/email", response_model=AnnouncementBroadcastOut, status_code=202)
+async def email_announcement(
+    announcement_id: int,
+    payload: AnnouncementBroadcastCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(require_roles(3)),
+):
+    return await crud_admin.create_announcement_broadcast(db, announcement_id, payload, current_user.id)
+
+
+@router.get("/announcements/broadcasts/{broadcast_id}", response_model=AnnouncementBroadcastOut)
+async def get_announcement_broadcast(
+    broadcast_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(require_roles(3)),
+):
+    return await crud_admin.get_announcement_broadcast(db, broadcast_id)
+
+
 @router.put("/announcements/{announcement_id}", response_model=AnnouncementOut)
 async def update_announcement(
     announcement_id: int,
     payload: AnnouncementUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_roles(3)),
+    current_user: Principal = Depends(require_roles(3)),
 ):
     return await crud_admin.update_announcement(db, announcement_id, payload)
 
@@ -98,6 +241,6 @@ async def update_announcement(
 async def delete_announcement(
     announcement_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_roles(3)),
+    current_user: Principal = Depends(require_roles(3)),
 ):
     return await crud_admin.delete_announcement(db, announcement_id)
@@ -5,8 +5,11 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.routers import get_current_active_user
 from app.core import security
+from app.core.email import render_verification_email
+from app.core.email_outbox import enqueue_email
 from app.core.password_reset import password_reset_store
-from app.core.security import get_password_hash
+from app.core.principal_cache import principal_cache
+from app.core.security import get_password_hash_async
 from app.core.config import settings
 from app.crud.crud_user import user as crud_user
 from app.schemas.password_reset import (
@@ -80,33 +83,12 @@ async def request_password_reset(
         raise HTTPException(status_code=400, detail="Inactive user")
     
     # 生成验证码
-    code = password_reset_store.issue(payload.email)
+    code = await password_reset_store.issue(payload.email)
     
-    # 生成验证码
-    code = password_reset_store.issue(payload.email)
-    
-    # 发送邮件
-    from app.core.email import email_service
-    success = email_service.send_verification_code(
-        to_email=payload.email,
-        code=code,
-        purpose="密码重置"
-    )
+    # 写入发件箱，由后台发送器投递，不在请求中等待 SMTP
+    subject, html_body = render_verification_email(code, purpose="密码重置")
+    await enqueue_email(db, payload.email, subject, html_body)
     
-    # 如果发送失败
-    if not success:
-        # 如果是开发模式，发送失败时允许通过响应返回验证码作为回退方案
-        if settings.DEV_MODE:
-            return PasswordResetResponse(
-                message="[Dev] Email failed, code returned directly",
-                code=code
-            )
-        raise HTTPException(
-            status_code=500,
-            detail="Failed to send verification email. Please try again later."
-        )
-    
-    # 发送成功
     # 在开发模式下，为了方便，也可以在message里带上code（可选）
     return PasswordResetResponse(
         message="Verification code sent to your email",
@@ -122,10 +104,15 @@ async def confirm_password_reset(
     user = await crud_user.get_by_email(db, email=payload.email)
     if not user:
         raise HTTPException(status_code=404, detail="Email not found")
-    if not password_reset_store.verify(payload.email, payload.code):
+    if not await password_reset_store.verify(payload.email, payload.code, consume=False):
+        raise HTTPException(status_code=400, detail="Invalid or expired code")
+    # 先计算哈希再消费验证码：哈希线程池排队已满返回 429 时验证码仍然有效，用户可以直接重试
+    password_hash = await get_password_hash_async(payload.new_password)
+    if not await password_reset_store.verify(payload.email, payload.code):
         raise HTTPException(status_code=400, detail="Invalid or expired code")
-    user.password_hash = get_password_hash(payload.new_password)
+    user.password_hash = password_hash
     db.add(user)
     await db.commit()
+    principal_cache.invalidate(user.id)
     await db.refresh(user)
     return PasswordResetResponse(message="Password updated")
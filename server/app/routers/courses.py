@@ -1,17 +1,17 @@
 from typing import Any, List
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.routers import get_current_active_user, require_roles
+from app.routers import get_current_active_principal, require_roles
 from app.crud.crud_course import course as crud_course, category as crud_category
 from app.schemas.course import Course, CourseCreate, CourseUpdate, CourseCategory, CourseCategoryCreate
-from app.models.user import User
-from app.db.session import get_db
+from app.core.principal_cache import Principal
+from app.db.session import get_db, get_read_db
 
 router = APIRouter()
 
 @router.get("/", response_model=List[Course])
 async def read_courses(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     skip: int = 0,
     limit: int = 100,
 ) -> Any:
@@ -22,7 +22,7 @@ async def create_course(
     *,
     db: AsyncSession = Depends(get_db),
     course_in: CourseCreate,
-    current_user: User = Depends(require_roles(2, 3)),
+    current_user: Principal = Depends(require_roles(2, 3)),
 ) -> Any:
     # TODO: Check if user is teacher
     # if current_user.role_id != TEACHER_ROLE_ID:
@@ -60,7 +60,7 @@ async def update_course(
     db: AsyncSession = Depends(get_db),
     id: int,
     course_in: CourseUpdate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
 ) -> Any:
     course = await crud_course.get(db, id=id)
     if not course:
@@ -75,7 +75,7 @@ async def delete_course(
     *,
     db: AsyncSession = Depends(get_db),
     id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
 ) -> Any:
     course = await crud_course.get(db, id=id)
     if not course:
@@ -99,7 +99,7 @@ async def create_category(
     *,
     db: AsyncSession = Depends(get_db),
     category_in: CourseCategoryCreate,
-    current_user: User = Depends(require_roles(3)),
+    current_user: Principal = Depends(require_roles(3)),
 ) -> Any:
     # Check admin permission
     return await crud_category.create(db, obj_in=category_in)
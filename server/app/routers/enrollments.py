@@ -1,11 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.principal_cache import Principal
 from app.crud import enrollments as crud_enrollments
 from app.db.session import get_db
 from app.models import Course
-from app.models.user import User
-from app.routers import get_current_active_user
+from app.routers import get_current_active_principal
 from app.schemas.enrollments import EnrollmentCreate, EnrollmentOut, EnrollmentWithCourse, EnrollmentWithStudent
 
 router = APIRouter(tags=["Enrollments"])
@@ -16,7 +16,7 @@ async def enroll(
     course_id: int,
     payload: EnrollmentCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
 ):
     if current_user.role_id not in (1, 3):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
@@ -30,7 +30,7 @@ async def drop(
     course_id: int,
     payload: EnrollmentCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
 ):
     if current_user.role_id not in (1, 3):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
@@ -43,7 +43,7 @@ async def drop(
 async def my_enrollments(
     student_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
 ):
     if current_user.role_id not in (1, 3):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
@@ -56,7 +56,7 @@ async def my_enrollments(
 async def course_students(
     course_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
 ):
     if current_user.role_id not in (2, 3):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
@@ -0,0 +1,29 @@
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from app.core.config import settings
+from app.core.metrics import render_prometheus, request_metrics
+from app.db.pool import pool_stats
+from app.db.session import engine, replica_engine, write_engine
+
+router = APIRouter()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics(authorization: Optional[str] = Header(default=None)):
+    # 指标包含路由和连接池信息，不对外公开：未配置 METRICS_TOKEN 时拒绝，配置后要求以 Bearer 方式携带
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="METRICS_TOKEN is not configured")
+    if not secrets.compare_digest(authorization or "", f"Bearer {settings.METRICS_TOKEN}"):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    pools = {"primary": pool_stats(engine)}
+    if write_engine is not engine:
+        pools["writer"] = pool_stats(write_engine)
+    if replica_engine is not None:
+        pools["replica"] = pool_stats(replica_engine)
+    return PlainTextResponse(render_prometheus(request_metrics, pools), media_type=CONTENT_TYPE)
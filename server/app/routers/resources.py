@@ -5,8 +5,8 @@ from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_db
-from app.models.user import User
-from app.routers import require_roles, get_current_active_user
+from app.core.principal_cache import Principal
+from app.routers import require_roles, get_current_active_principal
 from app.schemas.resources import ResourceOut, ResourceCreate
 from app.crud import resources as crud_resources
 
@@ -20,7 +20,7 @@ async def upload_resource(
     request: Request,
     file: UploadFile = File(...),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_roles(2, 3)),  # 仅教师和管理员可上传
+    current_user: Principal = Depends(require_roles(2, 3)),  # 仅教师和管理员可上传
 ):
     if not file.filename:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Empty filename")
@@ -63,7 +63,7 @@ async def upload_resource(
 async def download_resource(
     resource_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user) # 登录用户即可下载
+    current_user: Principal = Depends(get_current_active_principal) # 登录用户即可下载
 ):
     resource = await crud_resources.get_resource(db, resource_id)
     if not resource:
@@ -84,7 +84,7 @@ async def download_resource(
 async def play_video(
     resource_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_principal)
 ):
     """
     其实前端直接用 url 播放即可，但这个接口可以作为一个带权限检查的代理，
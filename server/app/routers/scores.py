@@ -1,12 +1,14 @@
-from fastapi import APIRouter, Depends, Response, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.principal_cache import Principal
+from app.crud import score_stats as crud_score_stats
 from app.crud import scores as crud_scores
 from app.db.session import get_db
 from app.models import Course
-from app.models.user import User
-from app.routers import get_current_active_user
-from app.schemas.scores import ScoreOut
+from app.routers import get_current_active_principal
+from app.schemas.scores import GradebookOut, ScoreOut
 
 router = APIRouter(tags=["Scores"])
 
@@ -15,7 +17,7 @@ router = APIRouter(tags=["Scores"])
 async def my_scores(
     student_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
 ):
     if current_user.role_id not in (1, 3):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
@@ -27,7 +29,7 @@ async def my_scores(
 @router.get("/teacher/pending-grading-count")
 async def get_pending_grading_count(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
 ):
     if current_user.role_id != 2:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not a teacher")
@@ -38,7 +40,7 @@ async def get_pending_grading_count(
 @router.get("/student/pending-tasks-count")
 async def get_student_pending_tasks_count(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
 ):
     if current_user.role_id != 1:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not a student")
@@ -51,7 +53,7 @@ async def get_student_pending_tasks_count(
 async def course_scores(
     course_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
 ):
     if current_user.role_id not in (2, 3):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
@@ -62,11 +64,47 @@ async def course_scores(
     return await crud_scores.get_scores_for_course(db, course_id)
 
 
+@router.get("/courses/{course_id}/gradebook", response_model=GradebookOut)
+async def course_gradebook(
+    course_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_principal),
+):
+    if current_user.role_id not in (2, 3):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
+    if current_user.role_id == 2:
+        course = await db.get(Course, course_id)
+        if not course or course.teacher_id != current_user.id:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
+    gradebook = await crud_scores.get_gradebook(db, course_id)
+    if gradebook is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+    return gradebook
+
+
+@router.get("/courses/{course_id}/score-stats")
+async def course_score_stats(
+    course_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_principal),
+):
+    if current_user.role_id not in (2, 3):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
+    if current_user.role_id == 2:
+        course = await db.get(Course, course_id)
+        if not course or course.teacher_id != current_user.id:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
+    stats = await crud_score_stats.get_course_score_stats(db, course_id)
+    if stats is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+    return stats
+
+
 @router.get("/courses/{course_id}/scores/export")
 async def export_scores(
     course_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
 ):
     if current_user.role_id not in (2, 3):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
@@ -74,5 +112,5 @@ async def export_scores(
         course = await db.get(Course, course_id)
         if not course or course.teacher_id != current_user.id:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
-    csv_body = await crud_scores.export_scores_csv(db, course_id)
-    return Response(content=csv_body, media_type="text/csv")
+    # 逐批写出，db 会话在响应发送完毕后才关闭
+    return StreamingResponse(crud_scores.stream_scores_csv(db, course_id), media_type="text/csv")
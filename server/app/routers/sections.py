@@ -1,19 +1,19 @@
 from typing import Any, List
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.routers import get_current_active_user
+from app.routers import get_current_active_principal
 from app.crud.crud_section import section as crud_section
 from app.crud.crud_course import course as crud_course
 from app.schemas.section import Section, SectionCreate, SectionUpdate
-from app.models.user import User
-from app.db.session import get_db
+from app.core.principal_cache import Principal
+from app.db.session import get_db, get_read_db
 
 router = APIRouter()
 
 @router.get("/courses/{course_id}/sections", response_model=List[Section])
 async def read_course_sections(
     *,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     course_id: int,
     skip: int = 0,
     limit: int = 100,
@@ -26,7 +26,7 @@ async def create_section(
     db: AsyncSession = Depends(get_db),
     course_id: int,
     section_in: SectionCreate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
 ) -> Any:
     course = await crud_course.get(db, id=course_id)
     if not course:
@@ -57,7 +57,7 @@ async def update_section(
     db: AsyncSession = Depends(get_db),
     id: int,
     section_in: SectionUpdate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
 ) -> Any:
     section = await crud_section.get(db, id=id)
     if not section:
@@ -75,7 +75,7 @@ async def delete_section(
     *,
     db: AsyncSession = Depends(get_db),
     id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
 ) -> Any:
     section = await crud_section.get(db, id=id)
     if not section:
@@ -1,11 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.principal_cache import Principal
 from app.crud import tasks as crud_tasks
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.models import Course
-from app.models.user import User
-from app.routers import get_current_active_user
+from app.routers import get_current_active_principal
 from app.schemas.submissions import GradeUpdate, SubmissionCreate, SubmissionOut, SubmissionWithStudent
 from app.schemas.tasks import TaskCreate, TaskOut, TaskUpdate
 
@@ -17,7 +17,7 @@ async def create_task(
     course_id: int,
     payload: TaskCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
 ):
     if current_user.role_id not in (2, 3):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
@@ -31,7 +31,7 @@ async def create_task(
 
 
 @router.get("/courses/{course_id}/tasks", response_model=list[TaskOut])
-async def list_tasks(course_id: int, db: AsyncSession = Depends(get_db)):
+async def list_tasks(course_id: int, db: AsyncSession = Depends(get_read_db)):
     return await crud_tasks.list_tasks(db, course_id)
 
 
@@ -45,7 +45,7 @@ async def update_task(
     task_id: int,
     payload: TaskUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
 ):
     if current_user.role_id not in (2, 3):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
@@ -60,7 +60,7 @@ async def update_task(
 async def delete_task(
     task_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
 ):
     if current_user.role_id not in (2, 3):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
@@ -76,7 +76,7 @@ async def submit_task(
     task_id: int,
     payload: SubmissionCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
 ):
     if current_user.role_id not in (1, 3):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
@@ -90,7 +90,7 @@ async def grade_submission(
     submission_id: int,
     payload: GradeUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
 ):
     if current_user.role_id not in (2, 3):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
@@ -104,7 +104,7 @@ async def grade_submission(
 async def list_submissions(
     task_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
 ):
     if current_user.role_id not in (2, 3):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
@@ -119,7 +119,7 @@ async def list_submissions(
 async def list_my_submissions(
     course_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
 ):
     if current_user.role_id != 1:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only students can list their submissions")
@@ -4,7 +4,7 @@ from uuid import uuid4
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, Request
 from starlette import status
 
-from app.models.user import User
+from app.core.principal_cache import Principal
 from app.routers import require_roles
 from app.schemas.uploads import UploadResponse
 
@@ -18,7 +18,7 @@ UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 async def upload_file(
     request: Request,
     file: UploadFile = File(...),
-    current_user: User = Depends(require_roles(1, 2, 3)),
+    current_user: Principal = Depends(require_roles(1, 2, 3)),
 ) -> UploadResponse:
     if not file.filename:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Empty filename")
@@ -3,7 +3,8 @@ from fastapi import APIRouter, Body, Depends, HTTPException
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.routers import get_current_active_user
-from app.core.security import verify_password, get_password_hash
+from app.core.principal_cache import principal_cache
+from app.core.security import verify_password_async, get_password_hash_async
 from app.crud.crud_user import user as crud_user
 from app.models.user import User
 from app.schemas.user import UserResponse, UserUpdate
@@ -22,7 +23,7 @@ async def verify_user_password(
     password: str = Body(..., embed=True),
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
-    if not verify_password(password, current_user.password_hash):
+    if not await verify_password_async(password, current_user.password_hash):
         raise HTTPException(status_code=400, detail="Incorrect password")
     return {"message": "Password verified"}
 
@@ -41,7 +42,7 @@ async def update_user_me(
     
     # Update password (hash it first)
     if password is not None:
-        current_user.password_hash = get_password_hash(password)
+        current_user.password_hash = await get_password_hash_async(password)
     
     # Update avatar_url
     if avatar_url is not None:
@@ -50,5 +51,6 @@ async def update_user_me(
     
     db.add(current_user)
     await db.commit()
+    principal_cache.invalidate(current_user.id)
     await db.refresh(current_user)
     return current_user
@@ -31,3 +31,20 @@ class AnnouncementOut(BaseModel):
     class Config:
         from_attributes = True
 
+
+
+class AnnouncementBroadcastCreate(BaseModel):
+    # 为空时发给所有在读学生，否则只发给该课程的在读学生
+    course_id: int | None = None
+
+
+class AnnouncementBroadcastOut(BaseModel):
+    id: int
+    announcement_id: int
+    course_id: int | None
+    status: str
+    enqueued: int
+    sent: int = 0
+    failed: int = 0
+    created_at: datetime
+    finished_at: datetime | None = None
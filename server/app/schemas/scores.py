@@ -19,3 +19,19 @@ class ScoreOut(BaseModel):
     feedback: Optional[str] = None
     status: SubmissionStatus
     graded_at: Optional[datetime] = None
+
+
+class GradebookOut(BaseModel):
+    """按列存放的成绩矩阵：scores[i][j] 对应 student_ids[i] 与 task_ids[j]，missing[i] 为未提交作业的下标。"""
+
+    course_id: int
+    task_ids: list[int]
+    task_titles: list[str]
+    task_averages: list[Optional[float]]
+    task_submitted: list[int]
+    student_ids: list[int]
+    student_names: list[Optional[str]]
+    student_totals: list[Optional[float]]
+    student_submitted: list[int]
+    scores: list[list[Optional[float]]]
+    missing: list[list[int]]
@@ -0,0 +1,125 @@
+"""
+公告群发：5,000 名选课学生，从创建群发任务到全部投递到本地 aiosmtpd。
+
+    python -m benchmarks.bench_announcement_fanout [--students 5000]
+
+输出 HTTP 请求耗时（只创建任务）、全部写入发件箱的耗时和全部发送完成的耗时。
+"""
+import argparse
+import asyncio
+import os
+import socket
+import time
+
+from benchmarks.common import app_client, register_and_login, use_temp_database
+
+
+class _CountingHandler:
+    def __init__(self) -> None:
+        self.count = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.count += 1
+        return "250 OK"
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, default=5000)
+    args = parser.parse_args()
+
+    from aiosmtpd.controller import Controller
+
+    handler = _CountingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    use_temp_database()
+    os.environ.update(
+        SMTP_HOST="127.0.0.1",
+        SMTP_PORT=str(controller.port),
+        SMTP_USER="",
+        SMTP_USE_TLS="false",
+        FROM_EMAIL="noreply@bench.example.com",
+        EMAIL_OUTBOX_SMTP_CONNECTIONS="4",
+        EMAIL_OUTBOX_BATCH_SIZE="200",
+        EMAIL_OUTBOX_POLL_SECONDS="0.2",
+    )
+
+    from sqlalchemy import insert
+
+    from app.db.session import SessionLocal, engine
+    from app.models import AnnouncementBroadcast, BroadcastStatus, Course, CourseEnrollment, EnrollmentStatus, User
+
+    engine.echo = False
+    async with app_client() as client:
+        admin_headers = await register_and_login(client, "bench_admin", role_id=3)
+        admin_id = (await client.get("/users/me", headers=admin_headers)).json()["id"]
+
+        async with SessionLocal() as session:
+            session.add(Course(id=1, title="Bench course", teacher_id=admin_id))
+            first_id = admin_id + 1
+            await session.execute(
+                insert(User),
+                [
+                    {
+                        "id": first_id + i,
+                        "username": f"fanout{i}",
+                        "password_hash": "x",
+                        "full_name": f"Student {i}",
+                        "email": f"fanout{i}@bench.example.com",
+                        "role_id": 1,
+                        "is_active": True,
+                    }
+                    for i in range(args.students)
+                ],
+            )
+            await session.execute(
+                insert(CourseEnrollment),
+                [
+                    {"course_id": 1, "student_id": first_id + i, "status": EnrollmentStatus.ACTIVE}
+                    for i in range(args.students)
+                ],
+            )
+            await session.commit()
+
+        response = await client.post(
+            "/admin/announcements",
+            json={"title": "Exam moved", "content": "The exam is now on Friday.", "created_by": admin_id},
+            headers=admin_headers,
+        )
+        announcement_id = response.json()["id"]
+
+        started = time.perf_counter()
+        response = await client.post(
+            f"/admin/announcements/{announcement_id}/email", json={"course_id": 1}, headers=admin_headers
+        )
+        request_ms = (time.perf_counter() - started) * 1000
+        broadcast_id = response.json()["id"]
+        print(f"POST /announcements/{{id}}/email: {response.status_code} in {request_ms:.1f}ms")
+
+        enqueued_at = None
+        while handler.count < args.students:
+            if enqueued_at is None:
+                async with SessionLocal() as session:
+                    broadcast = await session.get(AnnouncementBroadcast, broadcast_id)
+                    if broadcast.status == BroadcastStatus.DONE:
+                        enqueued_at = time.perf_counter() - started
+            await asyncio.sleep(0.1)
+        delivered_at = time.perf_counter() - started
+
+        progress = (await client.get(f"/admin/announcements/broadcasts/{broadcast_id}", headers=admin_headers)).json()
+
+    controller.stop()
+    print(f"all {args.students} recipients enqueued after {enqueued_at:.2f}s")
+    print(f"all delivered after {delivered_at:.2f}s ({args.students / delivered_at:.0f} msg/s)")
+    print(f"progress endpoint: {progress}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
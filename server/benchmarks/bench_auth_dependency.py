@@ -0,0 +1,43 @@
+"""
+认证依赖的微基准：get_current_principal 在 JWT claims 缓存开启/关闭时的单次耗时。
+
+    python -m benchmarks.bench_auth_dependency [--iterations 20000]
+
+Principal 缓存保持预热，因此测得的是 token 校验本身的开销（不访问数据库）。
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import use_temp_database
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=20_000)
+    args = parser.parse_args()
+
+    use_temp_database()
+    from app.core.principal_cache import Principal, principal_cache
+    from app.core.security import create_access_token
+    from app.core.token_cache import token_cache
+    from app.routers import get_current_principal
+
+    token = create_access_token(1)
+    principal_cache.put(1, Principal(id=1, role_id=1, is_active=True, username="bench"))
+
+    for label, cached in (("jwt.decode every call", False), ("claims cache", True)):
+        token_cache.clear()
+        started = time.perf_counter()
+        for _ in range(args.iterations):
+            if not cached:
+                token_cache.clear()
+            await get_current_principal(db=None, token=token)
+        elapsed = time.perf_counter() - started
+        print(f"{label}: {elapsed / args.iterations * 1e6:.1f} us/call")
+
+    print("token cache stats:", token_cache.stats())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,101 @@
+"""
+邮件发件箱吞吐量：向本地 aiosmtpd 投递 1,000 封排队邮件。
+
+    python -m benchmarks.bench_email_outbox [--messages 1000]
+
+对比旧的“每封邮件新建连接”方式与发件箱发送器（复用 1/2/4 个 SMTP 连接）。
+"""
+import argparse
+import asyncio
+import socket
+import time
+
+from benchmarks.common import use_temp_database
+
+
+class _CountingHandler:
+    def __init__(self) -> None:
+        self.count = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.count += 1
+        return "250 OK"
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=1000)
+    args = parser.parse_args()
+
+    use_temp_database()
+    from aiosmtpd.controller import Controller
+    from sqlalchemy import delete
+
+    from app.core.email import build_message, open_smtp_connection
+    from app.core.email_outbox import EmailOutboxSender, SMTPConnectionPool
+    from app.core.time_utils import get_now
+    from app.db.base import Base
+    from app.db.session import SessionLocal, engine
+    from app.models import EmailOutbox, EmailStatus
+
+    engine.echo = False
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    handler = _CountingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    sender_address = "noreply@bench.example.com"
+
+    def per_message_connections() -> None:
+        for i in range(args.messages):
+            message = build_message(sender_address, f"s{i}@bench.example.com", "Notice", "<p>hi</p>").as_string()
+            smtp = open_smtp_connection("127.0.0.1", controller.port, "", "", use_tls=False)
+            smtp.sendmail(sender_address, [f"s{i}@bench.example.com"], message)
+            smtp.quit()
+
+    started = time.perf_counter()
+    await asyncio.to_thread(per_message_connections)
+    elapsed = time.perf_counter() - started
+    print(f"connect per message: {args.messages / elapsed:.0f} msg/s ({elapsed:.2f}s)")
+
+    for connections in (1, 2, 4):
+        async with SessionLocal() as session:
+            await session.execute(delete(EmailOutbox))
+            session.add_all(
+                EmailOutbox(
+                    to_email=f"s{i}@bench.example.com",
+                    subject="Notice",
+                    html_body="<p>hi</p>",
+                    status=EmailStatus.PENDING,
+                    attempts=0,
+                    next_attempt_at=get_now(),
+                )
+                for i in range(args.messages)
+            )
+            await session.commit()
+
+        pool = SMTPConnectionPool("127.0.0.1", controller.port, "", "", use_tls=False, size=connections)
+        sender = EmailOutboxSender(SessionLocal, pool, sender_address=sender_address, batch_size=100)
+        started = time.perf_counter()
+        while await sender.process_batch():
+            pass
+        elapsed = time.perf_counter() - started
+        await sender.stop()
+        print(
+            f"outbox, {connections} pooled connection(s): {args.messages / elapsed:.0f} msg/s "
+            f"({elapsed:.2f}s, {pool.connections_opened} connections opened)"
+        )
+
+    controller.stop()
+    print(f"smtp server received {handler.count} messages")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
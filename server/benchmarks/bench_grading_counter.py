@@ -0,0 +1,83 @@
+"""
+教师待批改数：原实现（每次按 submissions / tasks / courses / course_enrollments 四表连接计数）
+与读取 grading_counters 计数行的耗时对比。
+
+    python -m benchmarks.bench_grading_counter [--courses 10] [--tasks 200] [--students 500] [--requests 20]
+
+数据与 bench_pending_count 相同：每个学生选全部课程、提交一半作业，提交均为待批改。
+计数行先用 reconcile_grading_counters 生成。
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.bench_pending_count import seed
+from benchmarks.common import use_temp_database
+
+TEACHER_ID = 1
+
+
+async def legacy_pending_grading_count(session, teacher_id: int) -> int:
+    """被替换的实现，仅用于对比。"""
+    from sqlalchemy import func, select
+
+    from app.models import Course, CourseEnrollment, EnrollmentStatus, Submission, SubmissionStatus, Task
+
+    stmt = (
+        select(func.count(Submission.id))
+        .join(Task, Submission.task_id == Task.id)
+        .join(Course, Task.course_id == Course.id)
+        .join(
+            CourseEnrollment,
+            (CourseEnrollment.course_id == Course.id) & (CourseEnrollment.student_id == Submission.student_id),
+        )
+        .where(Course.teacher_id == teacher_id)
+        .where(Submission.status.in_([SubmissionStatus.SUBMITTED, SubmissionStatus.LATE]))
+        .where(CourseEnrollment.status == EnrollmentStatus.ACTIVE)
+    )
+    return (await session.execute(stmt)).scalar_one()
+
+
+async def run(label: str, count_fn, session_factory, requests: int) -> int:
+    result = None
+    started = time.perf_counter()
+    async with session_factory() as session:
+        for _ in range(requests):
+            result = await count_fn(session, TEACHER_ID)
+    elapsed = time.perf_counter() - started
+    print(f"{label}: {elapsed / requests * 1000:.3f}ms/request, count={result}")
+    return result
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--courses", type=int, default=10)
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+
+    path = use_temp_database()
+    import app.db.base  # noqa: F401
+    from app.crud.grading_counters import reconcile_grading_counters
+    from app.crud.scores import get_teacher_pending_grading_count
+    from app.db.migrations import ensure_schema
+    from app.db.session import SessionLocal, engine, write_engine
+
+    await ensure_schema(write_engine)
+    seed(path, args.courses, args.tasks, args.students)
+    async with SessionLocal() as session:
+        await reconcile_grading_counters(session)
+        await session.commit()
+
+    results = {
+        await run("legacy (4-table join)", legacy_pending_grading_count, SessionLocal, args.requests),
+        await run("grading_counters", get_teacher_pending_grading_count, SessionLocal, args.requests),
+    }
+    assert len(results) == 1, results
+    await engine.dispose()
+    await write_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
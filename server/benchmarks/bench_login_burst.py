@@ -0,0 +1,84 @@
+"""
+登录洪峰期间其他请求的延迟：bcrypt 在事件循环中同步计算 vs. 在线程池中计算。
+
+    python -m benchmarks.bench_login_burst [--logins 200]
+
+两种模式分别在子进程中运行（通过 PASSWORD_HASH_WORKERS 切换，0 表示同步计算）。
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.common import SERVER_DIR, app_client, register_and_login, summarize, use_temp_database
+
+
+async def run_burst(logins: int) -> None:
+    use_temp_database()
+    from app.core.security import password_hash_pool
+    from app.db.session import engine
+
+    engine.echo = False
+    async with app_client() as client:
+        await register_and_login(client, "bench_burst")
+        get_latencies: list[float] = []
+        get_errors: list[float] = []
+        statuses: dict[int | str, int] = {}
+        burst_done = asyncio.Event()
+
+        async def login() -> None:
+            try:
+                response = await client.post("/auth/login", data={"username": "bench_burst", "password": "bench-pass"})
+                outcome = response.status_code
+            except Exception as e:  # 例如连接池等待超时：计入结果，不中断测量
+                outcome = type(e).__name__
+            statuses[outcome] = statuses.get(outcome, 0) + 1
+
+        async def poll_gets() -> None:
+            while not burst_done.is_set():
+                started = time.perf_counter()
+                try:
+                    await client.get("/courses/")
+                except Exception:
+                    get_errors.append(time.perf_counter() - started)
+                    continue
+                get_latencies.append((time.perf_counter() - started) * 1000)
+                await asyncio.sleep(0.005)
+
+        poller = asyncio.create_task(poll_gets())
+        started = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - started
+        burst_done.set()
+        await poller
+
+        print(f"  {logins} logins in {elapsed:.2f}s, statuses={statuses}")
+        print("  " + summarize("concurrent GET /courses/", get_latencies) + f", failed={len(get_errors)}")
+        print(f"  hash pool: {password_hash_pool.stats()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        asyncio.run(run_burst(args.logins))
+        return
+
+    for label, workers in (("before (inline bcrypt)", "0"), ("after (hash pool)", "4")):
+        print(label)
+        env = dict(os.environ, PASSWORD_HASH_WORKERS=workers, PASSWORD_HASH_MAX_QUEUE=str(args.logins))
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_login_burst", "--child", "--logins", str(args.logins)],
+            cwd=SERVER_DIR,
+            env=env,
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+登录吞吐量：在预置 50k 用户的 SQLite 数据库上，固定并发下的 requests/sec 与 p99。
+
+    python -m benchmarks.bench_login_throughput [--users 50000] [--concurrency 8] [--requests 400] [--logins 40]
+
+分两部分：
+  1. 仅用户查找：旧的 get_by_username + get_by_email 两次查询（users.email 无索引）
+     vs. get_by_login 单次查询（有索引）；
+  2. 端到端 POST /auth/login（包含 bcrypt，命中与未命中耗时应接近）。
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from benchmarks.common import app_client, percentile, use_temp_database
+
+PASSWORD = "bench-pass"
+
+
+async def seed_users(count: int) -> None:
+    from sqlalchemy import insert
+
+    from app.core.security import get_password_hash
+    from app.db.session import engine
+    from app.models import User
+
+    password_hash = get_password_hash(PASSWORD)
+    rows = [
+        {
+            "username": f"user{i:06d}",
+            "email": f"user{i:06d}@bench.example.com",
+            "full_name": f"User {i}",
+            "password_hash": password_hash,
+            "role_id": 1,
+            "is_active": True,
+        }
+        for i in range(count)
+    ]
+    async with engine.begin() as conn:
+        await conn.execute(insert(User), rows)
+
+
+def make_logins(users: int, total: int) -> list[str]:
+    rng = random.Random(42)
+    logins = []
+    for _ in range(total):
+        i = rng.randrange(users)
+        kind = rng.random()
+        if kind < 0.5:
+            logins.append(f"user{i:06d}")
+        elif kind < 0.8:
+            logins.append(f"USER{i:06d}@bench.example.com".lower())
+        else:
+            logins.append(f"missing{i:06d}")
+    return logins
+
+
+async def run_fixed_concurrency(logins: list[str], concurrency: int, call) -> tuple[float, list[float]]:
+    queue = list(logins)
+    latencies: list[float] = []
+
+    async def worker() -> None:
+        while queue:
+            login = queue.pop()
+            started = time.perf_counter()
+            await call(login)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - started, latencies
+
+
+def report(label: str, elapsed: float, latencies: list[float]) -> None:
+    print(
+        f"{label}: {len(latencies) / elapsed:.1f} req/s, "
+        f"p50={percentile(latencies, 50):.2f}ms p99={percentile(latencies, 99):.2f}ms"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--logins", type=int, default=40)
+    args = parser.parse_args()
+
+    use_temp_database()
+    from sqlalchemy import text
+
+    from app.crud.crud_user import user as crud_user
+    from app.db.session import SessionLocal, engine
+
+    engine.echo = False
+    async with app_client() as client:
+        await seed_users(args.users)
+        logins = make_logins(args.users, args.requests)
+
+        async def two_queries(login: str) -> None:
+            async with SessionLocal() as db:
+                found = await crud_user.get_by_username(db, username=login)
+                if not found:
+                    await crud_user.get_by_email(db, email=login)
+
+        async def one_query(login: str) -> None:
+            async with SessionLocal() as db:
+                await crud_user.get_by_login(db, login=login)
+
+        async with engine.begin() as conn:
+            await conn.execute(text("DROP INDEX ix_users_email"))
+        report("lookup, username then email (no email index)", *await run_fixed_concurrency(logins, args.concurrency, two_queries))
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE INDEX ix_users_email ON users (email)"))
+        report("lookup, get_by_login", *await run_fixed_concurrency(logins, args.concurrency, one_query))
+
+        statuses: dict[int, int] = {}
+
+        async def login(login: str) -> None:
+            response = await client.post("/auth/login", data={"username": login, "password": PASSWORD})
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        hits = [f"user{i:06d}" for i in range(args.logins)]
+        misses = [f"missing{i:06d}" for i in range(args.logins)]
+        report("POST /auth/login, known users", *await run_fixed_concurrency(hits, args.concurrency, login))
+        report("POST /auth/login, unknown users", *await run_fixed_concurrency(misses, args.concurrency, login))
+        print(f"login statuses: {statuses}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+"""
+请求指标的开销：同一个最小 ASGI 应用，带 / 不带 MetricsMiddleware 的单请求耗时差，
+以及 RequestMetrics.observe 本身和渲染 /metrics 的耗时。
+
+    python -m benchmarks.bench_metrics_overhead [--requests 200000]
+
+直接调用 ASGI 接口（不经过 HTTP / httpx），只测量中间件本身。
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.common import use_temp_database
+
+
+async def _endpoint(scope, receive, send) -> None:
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+class _Route:
+    path_format = "/api/v1/tasks/{task_id}/submit"
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message) -> None:
+    pass
+
+
+async def time_app(app, requests: int) -> float:
+    """每请求平均耗时（微秒）。"""
+    scope = {"type": "http", "method": "POST", "path": "/api/v1/tasks/1/submit", "route": _Route()}
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app(scope, _receive, _send)
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    use_temp_database()
+    from app.core.metrics import RequestMetrics, render_prometheus
+    from app.middleware.metrics import MetricsMiddleware
+
+    metrics = RequestMetrics()
+    wrapped = MetricsMiddleware(_endpoint, metrics=metrics)
+    await time_app(_endpoint, 10_000)  # 预热
+    await time_app(wrapped, 10_000)
+
+    bare, instrumented = [], []
+    for _ in range(args.rounds):
+        bare.append(await time_app(_endpoint, args.requests))
+        instrumented.append(await time_app(wrapped, args.requests))
+    bare_us, instrumented_us = statistics.median(bare), statistics.median(instrumented)
+    print(f"bare ASGI app:          {bare_us:.2f} us/request")
+    print(f"with MetricsMiddleware: {instrumented_us:.2f} us/request")
+    print(f"overhead:               {instrumented_us - bare_us:.2f} us/request")
+
+    started = time.perf_counter()
+    for i in range(args.requests):
+        metrics.observe("GET", "/api/v1/courses/{course_id}", 200, i % 300)
+    print(f"RequestMetrics.observe: {(time.perf_counter() - started) / args.requests * 1e6:.2f} us/call")
+
+    for i in range(100):
+        metrics.observe("GET", f"/api/v1/route{i}/{{id}}", 200, 5.0)
+    started = time.perf_counter()
+    body = render_prometheus(metrics, {})
+    print(f"render /metrics with {len(metrics.routes())} routes: {(time.perf_counter() - started) * 1000:.2f} ms, {len(body)} bytes")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,134 @@
+"""
+学生待完成作业数：原实现（选课 id、全部已提交作业 id 两次查询，再用 NOT IN 字面量列表计数）
+与反连接单查询、以及加上按学生缓存后的耗时 / SQL 条数对比。
+
+    python -m benchmarks.bench_pending_count [--courses 10] [--tasks 200] [--students 500] [--requests 500]
+
+被测学生选了 --courses 门课，每门课 --tasks 个作业，已提交其中一半；其他学生同样选课并提交，
+使 submissions 表的规模接近真实课程。缓存一栏模拟首页轮询：每 --invalidate-every 次请求发生一次提交。
+SQLite 在进程内执行、没有网络往返，单查询与原实现耗时接近；MySQL 上省下的是两次往返和随已提交数增长的 IN 列表。
+"""
+import argparse
+import asyncio
+import sqlite3
+import time
+
+from benchmarks.common import use_temp_database
+
+STUDENT_ID = 1000
+
+
+def seed(path, courses: int, tasks: int, students: int) -> None:
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("INSERT OR IGNORE INTO roles (id, name) VALUES (1, 'student'), (2, 'teacher')")
+        conn.execute("INSERT INTO users (id, username, password_hash, role_id) VALUES (1, 'teacher', 'x', 2)")
+        conn.executemany(
+            "INSERT INTO users (id, username, password_hash, role_id) VALUES (?, ?, 'x', 1)",
+            ((STUDENT_ID + i, f"student{i}") for i in range(students)),
+        )
+        conn.executemany(
+            "INSERT INTO courses (id, teacher_id, title) VALUES (?, 1, ?)",
+            ((course_id, f"Course {course_id}") for course_id in range(1, courses + 1)),
+        )
+        conn.executemany(
+            "INSERT INTO tasks (id, course_id, teacher_id, title, type) VALUES (?, ?, 1, ?, 'assignment')",
+            ((task_id, 1 + (task_id - 1) // tasks, f"Task {task_id}") for task_id in range(1, courses * tasks + 1)),
+        )
+        conn.executemany(
+            "INSERT INTO course_enrollments (course_id, student_id, status) VALUES (?, ?, 'active')",
+            ((course_id, STUDENT_ID + i) for i in range(students) for course_id in range(1, courses + 1)),
+        )
+        conn.executemany(
+            "INSERT INTO submissions (task_id, student_id, status) VALUES (?, ?, 'submitted')",
+            (
+                (task_id, STUDENT_ID + i)
+                for i in range(students)
+                for task_id in range(1 + i % 2, courses * tasks + 1, 2)
+            ),
+        )
+    conn.close()
+
+
+async def legacy_pending_count(session, student_id: int) -> int:
+    """被替换的实现，仅用于对比。"""
+    from sqlalchemy import func, select
+
+    from app.models import CourseEnrollment, EnrollmentStatus, Submission, Task
+
+    result_courses = await session.execute(
+        select(CourseEnrollment.course_id).where(
+            CourseEnrollment.student_id == student_id, CourseEnrollment.status == EnrollmentStatus.ACTIVE
+        )
+    )
+    course_ids = result_courses.scalars().all()
+    if not course_ids:
+        return 0
+    result_submissions = await session.execute(select(Submission.task_id).where(Submission.student_id == student_id))
+    submitted_task_ids = set(result_submissions.scalars().all())
+    stmt_count = select(func.count(Task.id)).where(Task.course_id.in_(course_ids))
+    if submitted_task_ids:
+        stmt_count = stmt_count.where(Task.id.not_in(submitted_task_ids))
+    return (await session.execute(stmt_count)).scalar_one()
+
+
+async def run(label: str, count_fn, session_factory, requests: int, invalidate_every: int = 0) -> int:
+    from app.core.pending_cache import pending_task_cache
+    from app.core.query_counter import count_queries
+
+    pending_task_cache.clear()
+    queries = 0
+    result = None
+    started = time.perf_counter()
+    async with session_factory() as session:
+        for n in range(requests):
+            if invalidate_every and n % invalidate_every == 0:
+                pending_task_cache.invalidate(STUDENT_ID)
+            with count_queries() as stats:
+                result = await count_fn(session, STUDENT_ID)
+            queries += stats.count
+    elapsed = time.perf_counter() - started
+    print(
+        f"{label}: {elapsed / requests * 1000:.3f}ms/request, "
+        f"{queries / requests:.2f} queries/request, count={result}"
+    )
+    return result
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--courses", type=int, default=10)
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--invalidate-every", type=int, default=20)
+    args = parser.parse_args()
+
+    path = use_temp_database()
+    from app.core.query_counter import query_counter
+    from app.crud.scores import count_student_pending_tasks, get_student_pending_task_count
+    from app.db.migrations import ensure_schema
+    from app.db.session import SessionLocal, engine, write_engine
+
+    await ensure_schema(write_engine)
+    seed(path, args.courses, args.tasks, args.students)
+    query_counter.install(engine)
+
+    results = {
+        await run("legacy (3 queries, NOT IN list)", legacy_pending_count, SessionLocal, args.requests),
+        await run("anti-join (1 query)", count_student_pending_tasks, SessionLocal, args.requests),
+        await run(
+            f"anti-join + cache (invalidated every {args.invalidate_every})",
+            get_student_pending_task_count,
+            SessionLocal,
+            args.requests,
+            args.invalidate_every,
+        ),
+    }
+    assert len(results) == 1, results
+    await engine.dispose()
+    await write_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
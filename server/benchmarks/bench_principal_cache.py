@@ -0,0 +1,47 @@
+"""
+对比 Principal 缓存开启/关闭时，已认证 GET 请求的 SQL 语句数。
+
+    python -m benchmarks.bench_principal_cache
+"""
+import asyncio
+
+from benchmarks.common import app_client, register_and_login, use_temp_database
+
+REQUESTS = 50
+
+
+async def main() -> None:
+    use_temp_database()
+    from sqlalchemy import event
+
+    from app.core.principal_cache import principal_cache
+    from app.db.session import engine
+
+    engine.echo = False
+    statements = 0
+
+    def _count(*_args, **_kwargs):
+        nonlocal statements
+        statements += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _count)
+
+    async with app_client() as client:
+        headers = await register_and_login(client, "bench_principal")
+        student_id = (await client.get("/users/me", headers=headers)).json()["id"]
+
+        for label, cached in (("cache off", False), ("cache on", True)):
+            principal_cache.clear()
+            statements = 0
+            for _ in range(REQUESTS):
+                if not cached:
+                    principal_cache.clear()
+                response = await client.get("/me/enrollments", params={"student_id": student_id}, headers=headers)
+                response.raise_for_status()
+            print(f"{label}: {statements / REQUESTS:.2f} statements per GET /me/enrollments")
+
+        print("principal cache stats:", principal_cache.stats())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
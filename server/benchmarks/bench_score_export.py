@@ -0,0 +1,135 @@
+"""
+成绩导出：原实现（加载 Submission / Task ORM 对象 → dict 列表 → 整个 CSV 写进 StringIO）
+与流式实现（只查导出列、服务端游标按批读取、逐批生成 CSV）的耗时与内存峰值对比。
+
+    python -m benchmarks.bench_score_export [--submissions 500000] [--tasks 100]
+
+数据直接用 sqlite3 批量写入临时数据库；每条提交带 2KB 的 answer_text，模拟真实作答内容。
+内存峰值用 tracemalloc 统计 Python 分配（单独跑一遍，不计入耗时）。
+"""
+import argparse
+import asyncio
+import csv
+import io
+import sqlite3
+import time
+import tracemalloc
+
+from benchmarks.common import use_temp_database
+
+COURSE_ID = 1
+ANSWER_TEXT = "SELECT * FROM submissions; -- " + "x" * 2000
+
+
+def seed(path, submissions: int, tasks: int) -> None:
+    students = -(-submissions // tasks)
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("INSERT OR IGNORE INTO roles (id, name) VALUES (1, 'student'), (2, 'teacher')")
+        conn.execute("INSERT INTO users (id, username, password_hash, role_id) VALUES (1, 'teacher', 'x', 2)")
+        conn.executemany(
+            "INSERT INTO users (id, username, password_hash, role_id) VALUES (?, ?, 'x', 1)",
+            ((1000 + i, f"student{i}") for i in range(students)),
+        )
+        conn.execute("INSERT INTO courses (id, teacher_id, title) VALUES (?, 1, 'Database')", (COURSE_ID,))
+        conn.executemany(
+            "INSERT INTO tasks (id, course_id, teacher_id, title, type) VALUES (?, ?, 1, ?, 'assignment')",
+            ((task_id, COURSE_ID, f"Task {task_id}") for task_id in range(1, tasks + 1)),
+        )
+        conn.executemany(
+            "INSERT INTO submissions (task_id, student_id, answer_text, score, status, graded_at) "
+            "VALUES (?, ?, ?, ?, 'graded', '2024-06-01 10:00:00')",
+            (
+                (1 + n % tasks, 1000 + n // tasks, ANSWER_TEXT, n % 100)
+                for n in range(submissions)
+            ),
+        )
+    conn.close()
+
+
+async def legacy_export_csv(session, course_id: int) -> str:
+    """被替换的实现（get_scores_for_course + export_scores_csv），仅用于对比。"""
+    from sqlalchemy import select
+
+    from app.crud.scores import _coerce_to_strings
+    from app.models import Submission, Task
+
+    result = await session.execute(
+        select(Submission, Task).join(Task, Submission.task_id == Task.id).where(Task.course_id == course_id)
+    )
+    scores = [
+        {
+            "submission_id": submission.id,
+            "course_id": task.course_id,
+            "task_id": task.id,
+            "task_title": task.title,
+            "student_id": submission.student_id,
+            "score": submission.score,
+            "status": submission.status,
+            "graded_at": submission.graded_at,
+        }
+        for submission, task in result.all()
+    ]
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerows(_coerce_to_strings(tuple(row.values()) for row in scores))
+    return output.getvalue()
+
+
+async def run_legacy(session_factory) -> dict:
+    started = time.perf_counter()
+    async with session_factory() as session:
+        body = await legacy_export_csv(session, COURSE_ID)
+    elapsed = time.perf_counter() - started
+    return {"total_s": elapsed, "first_chunk_s": elapsed, "bytes": len(body)}
+
+
+async def run_streaming(session_factory) -> dict:
+    from app.crud.scores import stream_scores_csv
+
+    started = time.perf_counter()
+    first_chunk = None
+    size = 0
+    async with session_factory() as session:
+        async for chunk in stream_scores_csv(session, COURSE_ID):
+            if first_chunk is None and size:  # 表头之后的第一批数据
+                first_chunk = time.perf_counter() - started
+            size += len(chunk)
+    return {"total_s": time.perf_counter() - started, "first_chunk_s": first_chunk or 0.0, "bytes": size}
+
+
+async def measure(label: str, runner, session_factory) -> None:
+    timing = await runner(session_factory)
+    tracemalloc.start()
+    await runner(session_factory)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{label}: total {timing['total_s']:.2f}s, first rows {timing['first_chunk_s'] * 1000:.0f}ms, "
+        f"{timing['bytes'] / 1e6:.1f}MB CSV, peak Python memory {peak / 1e6:.1f}MB"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--submissions", type=int, default=500_000)
+    parser.add_argument("--tasks", type=int, default=100)
+    args = parser.parse_args()
+
+    path = use_temp_database()
+    from app.db.migrations import ensure_schema
+    from app.db.session import SessionLocal, engine, write_engine
+
+    await ensure_schema(write_engine)
+    started = time.perf_counter()
+    seed(path, args.submissions, args.tasks)
+    print(f"seeded {args.submissions} submissions in {time.perf_counter() - started:.1f}s")
+
+    await measure("streaming", run_streaming, SessionLocal)
+    await measure("legacy (materialized)", run_legacy, SessionLocal)
+    await engine.dispose()
+    await write_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
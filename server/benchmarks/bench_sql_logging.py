@@ -0,0 +1,60 @@
+"""
+对比 SQL 日志方式对吞吐的影响：echo=True、关闭日志、关闭 echo 但开启慢查询记录。
+
+    python -m benchmarks.bench_sql_logging [--requests 500]
+
+echo 的输出被重定向到 /dev/null，只测量格式化和写日志本身的开销。
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import time
+
+from benchmarks.common import app_client, register_and_login, use_temp_database
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    use_temp_database()
+    from app.core.slow_query import slow_query_recorder
+    from app.db.session import engine
+
+    async with app_client() as client:
+        headers = await register_and_login(client, "bench_sql_logging")
+        student_id = (await client.get("/users/me", headers=headers)).json()["id"]
+
+        modes = (
+            ("echo=True", True, False),
+            ("logging off", False, False),
+            ("slow-query recorder", False, True),
+        )
+        for _ in range(50):  # 预热
+            await client.get("/me/enrollments", params={"student_id": student_id}, headers=headers)
+
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            results = []
+            for label, echo, recorder in modes:
+                engine.echo = echo
+                slow_query_recorder.uninstall(engine)
+                if recorder:
+                    slow_query_recorder.install(engine)
+                started = time.perf_counter()
+                for _ in range(args.requests):
+                    response = await client.get(
+                        "/me/enrollments", params={"student_id": student_id}, headers=headers
+                    )
+                    response.raise_for_status()
+                elapsed = time.perf_counter() - started
+                results.append((label, args.requests / elapsed))
+
+    for label, rate in results:
+        print(f"{label}: {rate:.0f} req/s")
+    print("slow query stats:", slow_query_recorder.stats())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
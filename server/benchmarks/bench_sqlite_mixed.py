@@ -0,0 +1,122 @@
+"""
+SQLite 读写混合吞吐：默认配置 vs. SQLITE_PRODUCTION_MODE（WAL + 读连接池 + 单写连接）。
+
+    python -m benchmarks.bench_sqlite_mixed [--workers 32] [--seconds 10] [--write-ratio 0.2]
+
+直接调用 crud 层（submit_task / list_tasks / list_submissions），排除 HTTP 开销；
+两种模式分别在子进程中运行，通过 SQLITE_PRODUCTION_MODE 切换。
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+
+from benchmarks.common import SERVER_DIR, summarize, use_temp_database
+
+STUDENTS = 200
+TASKS = 20
+
+
+async def run_mixed(workers: int, seconds: float, write_ratio: float) -> None:
+    use_temp_database()
+    from sqlalchemy import insert
+
+    from app.crud import tasks as crud_tasks
+    from app.db.base import Base
+    from app.db.session import SessionLocal, write_engine
+    from app.models import Course, CourseEnrollment, EnrollmentStatus, Role, Task, TaskType, User
+    from app.schemas.submissions import SubmissionCreate
+
+    async with write_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with SessionLocal() as session:
+        session.add_all([Role(id=1, name="student"), Role(id=2, name="teacher")])
+        await session.flush()
+        await session.execute(
+            insert(User),
+            [{"id": 1, "username": "teacher", "password_hash": "x", "role_id": 2}]
+            + [
+                {"id": i, "username": f"student{i}", "password_hash": "x", "role_id": 1}
+                for i in range(2, STUDENTS + 2)
+            ],
+        )
+        session.add(Course(id=1, title="Databases", teacher_id=1, is_active=True))
+        await session.flush()
+        await session.execute(
+            insert(CourseEnrollment),
+            [{"course_id": 1, "student_id": i, "status": EnrollmentStatus.ACTIVE} for i in range(2, STUDENTS + 2)],
+        )
+        await session.execute(
+            insert(Task),
+            [
+                {"id": t, "course_id": 1, "teacher_id": 1, "title": f"Task {t}", "type": TaskType.ASSIGNMENT}
+                for t in range(1, TASKS + 1)
+            ],
+        )
+        await session.commit()
+
+    reads: list[float] = []
+    writes: list[float] = []
+    errors: dict[str, int] = {}
+    deadline = time.perf_counter() + seconds
+
+    async def worker() -> None:
+        while time.perf_counter() < deadline:
+            is_write = random.random() < write_ratio
+            started = time.perf_counter()
+            try:
+                async with SessionLocal() as session:
+                    if is_write:
+                        await crud_tasks.submit_task(
+                            session,
+                            random.randint(1, TASKS),
+                            SubmissionCreate(student_id=random.randint(2, STUDENTS + 1), answer_text="answer"),
+                        )
+                    else:
+                        await crud_tasks.list_tasks(session, 1)
+                        await crud_tasks.list_submissions(session, random.randint(1, TASKS))
+            except Exception as e:
+                key = type(e).__name__ + (": database is locked" if "locked" in str(e) else "")
+                errors[key] = errors.get(key, 0) + 1
+                continue
+            (writes if is_write else reads).append((time.perf_counter() - started) * 1000)
+
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    total = len(reads) + len(writes)
+    print(f"  {total / seconds:.0f} ops/s ({len(reads)} reads, {len(writes)} writes), errors={errors}")
+    print("  " + summarize("read", reads))
+    print("  " + summarize("write", writes))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        asyncio.run(run_mixed(args.workers, args.seconds, args.write_ratio))
+        return
+
+    for label, mode in (("default sqlite", "false"), ("sqlite production mode", "true")):
+        print(label)
+        env = dict(os.environ, SQLITE_PRODUCTION_MODE=mode, SLOW_QUERY_LOG_ENABLED="false")
+        subprocess.run(
+            [
+                sys.executable, "-m", "benchmarks.bench_sqlite_mixed", "--child",
+                "--workers", str(args.workers), "--seconds", str(args.seconds),
+                "--write-ratio", str(args.write_ratio),
+            ],
+            cwd=SERVER_DIR,
+            env=env,
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
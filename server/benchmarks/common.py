@@ -0,0 +1,72 @@
+"""
+Benchmark 脚本的公共工具。
+
+每个脚本都在临时 SQLite 数据库上运行，通过 httpx 的 ASGITransport 直接调用应用，
+不需要单独启动服务器。运行方式（在 server 目录下）：
+
+    python -m benchmarks.bench_xxx
+"""
+from contextlib import asynccontextmanager
+import os
+import statistics
+import sys
+import tempfile
+from pathlib import Path
+
+SERVER_DIR = Path(__file__).resolve().parent.parent
+
+
+def use_temp_database(name: str = "bench.db") -> Path:
+    """把 DATABASE_URL 指向一个临时 SQLite 文件，必须在导入 app 之前调用。"""
+    path = Path(tempfile.mkdtemp(prefix="ustc-bench-")) / name
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{path}"
+    if str(SERVER_DIR) not in sys.path:
+        sys.path.insert(0, str(SERVER_DIR))
+    return path
+
+
+@asynccontextmanager
+async def app_client():
+    """运行应用的 lifespan 并返回绑定到该应用的 AsyncClient。"""
+    from httpx import ASGITransport, AsyncClient
+
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://bench/api/v1") as client:
+            yield client
+
+
+async def register_and_login(client, username: str, role_id: int = 1, password: str = "bench-pass") -> dict:
+    await client.post(
+        "/auth/register",
+        json={
+            "username": username,
+            "password": password,
+            "email": f"{username}@bench.example.com",
+            "full_name": username,
+            "role_id": role_id,
+        },
+    )
+    response = await client.post("/auth/login", data={"username": username, "password": password})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(label: str, samples_ms: list[float]) -> str:
+    if not samples_ms:
+        return f"{label}: no samples"
+    return (
+        f"{label}: n={len(samples_ms)} mean={statistics.fmean(samples_ms):.2f}ms "
+        f"p50={percentile(samples_ms, 50):.2f}ms p99={percentile(samples_ms, 99):.2f}ms "
+        f"max={max(samples_ms):.2f}ms"
+    )
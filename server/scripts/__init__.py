@@ -0,0 +1 @@
+"""Maintenance commands for the FastAPI backend (run with python -m scripts.<name>)."""
@@ -0,0 +1,70 @@
+"""
+标定 bcrypt 工作因子：在本机测量各 rounds 的哈希耗时，选出不超过目标耗时的最大值。
+
+    python -m scripts.calibrate_bcrypt --target-ms 250 [--write]
+
+--write 会把结果写入 .env 的 BCRYPT_ROUNDS；已有哈希会在用户下次登录成功后于后台重算。
+"""
+import argparse
+import re
+import statistics
+import time
+from pathlib import Path
+
+from passlib.hash import bcrypt
+
+from app.core.config import BASE_DIR, settings
+
+MIN_ROUNDS = 4
+MAX_ROUNDS = 16
+
+
+def measure(rounds: int, samples: int) -> float:
+    hasher = bcrypt.using(rounds=rounds)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        hasher.hash("calibration-password")
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def pick_rounds(target_ms: float, samples: int) -> int:
+    measure(MIN_ROUNDS, 1)  # 预热：首次调用会加载 bcrypt 后端
+    chosen = MIN_ROUNDS
+    for rounds in range(MIN_ROUNDS, MAX_ROUNDS + 1):
+        elapsed = measure(rounds, samples)
+        print(f"rounds={rounds:2d}: {elapsed:8.1f} ms")
+        if elapsed > target_ms:
+            break
+        chosen = rounds
+    return chosen
+
+
+def write_env(rounds: int, env_path: Path) -> None:
+    line = f"BCRYPT_ROUNDS={rounds}"
+    content = env_path.read_text(encoding="utf-8") if env_path.exists() else ""
+    if re.search(r"^BCRYPT_ROUNDS=.*$", content, flags=re.MULTILINE):
+        content = re.sub(r"^BCRYPT_ROUNDS=.*$", line, content, flags=re.MULTILINE)
+    else:
+        content = content.rstrip("\n") + ("\n" if content else "") + line + "\n"
+    env_path.write_text(content, encoding="utf-8")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target-ms", type=float, default=250, help="单次哈希的目标耗时（毫秒）")
+    parser.add_argument("--samples", type=int, default=3)
+    parser.add_argument("--write", action="store_true", help="写入 .env 的 BCRYPT_ROUNDS")
+    args = parser.parse_args()
+
+    rounds = pick_rounds(args.target_ms, args.samples)
+    print(f"\n目标 {args.target_ms:.0f} ms -> BCRYPT_ROUNDS={rounds}（当前配置 {settings.BCRYPT_ROUNDS}）")
+    if args.write:
+        env_path = Path(BASE_DIR) / ".env"
+        write_env(rounds, env_path)
+        print(f"已写入 {env_path}，重启服务后生效")
+
+
+if __name__ == "__main__":
+    main()
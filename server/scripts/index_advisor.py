@@ -0,0 +1,157 @@
+"""
+索引检查：对热点查询执行 EXPLAIN，报告没有用上索引的全表扫描。
+
+    python -m scripts.index_advisor [--fresh]
+
+默认连接 DATABASE_URL 指向的数据库（应已执行 alembic upgrade head）；--fresh 在临时 SQLite
+文件中按模型建表后检查，适合 CI。SQLite 中 "SCAN <表>" 且未使用索引、MySQL 中 type=ALL 视为全表扫描，
+发现全表扫描时以非零状态退出。
+"""
+import argparse
+import asyncio
+from dataclasses import dataclass, field
+import os
+import sys
+import tempfile
+
+from sqlalchemy import and_, event, exists, not_, or_, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import joinedload
+
+from app.core.config import settings
+from app.db.base import Base
+from app.models import (
+    Announcement,
+    Course,
+    CourseEnrollment,
+    EnrollmentStatus,
+    Submission,
+    Task,
+    User,
+)
+from app.models.section import CourseSection
+
+
+def hot_queries() -> dict:
+    """与 crud 层对应的热点查询；参数取值不影响执行计划。"""
+    return {
+        "list_submissions": select(Submission)
+        .options(joinedload(Submission.student).joinedload(User.role))
+        .where(Submission.task_id == 1)
+        .order_by(Submission.submitted_at.desc()),
+        "submit_task lookup": select(Submission).where(Submission.task_id == 1, Submission.student_id == 1),
+        "enrollment check": select(CourseEnrollment).where(
+            CourseEnrollment.course_id == 1,
+            CourseEnrollment.student_id == 1,
+            CourseEnrollment.status == EnrollmentStatus.ACTIVE,
+        ),
+        "list_student_submissions": select(Submission)
+        .join(Task)
+        .where(Task.course_id == 1, Submission.student_id == 1),
+        "list_tasks": select(Task).where(Task.course_id == 1).order_by(Task.created_at.desc()),
+        "list_student_enrollments": select(CourseEnrollment)
+        .options(joinedload(CourseEnrollment.course).joinedload(Course.teacher))
+        .where(CourseEnrollment.student_id == 1, CourseEnrollment.status == EnrollmentStatus.ACTIVE),
+        "list_course_students": select(CourseEnrollment)
+        .options(joinedload(CourseEnrollment.student).joinedload(User.role))
+        .where(CourseEnrollment.course_id == 1, CourseEnrollment.status == EnrollmentStatus.ACTIVE),
+        "get_by_login": select(User).where(or_(User.username == "alice", User.email.in_(["alice@example.com"]))),
+        "sections by course": select(CourseSection)
+        .where(CourseSection.course_id == 1)
+        .order_by(CourseSection.order_index)
+        .limit(100),
+        "active announcements": select(Announcement)
+        .where(Announcement.is_active.is_(True))
+        .order_by(Announcement.created_at.desc()),
+        "courses by teacher": select(Course).where(Course.teacher_id == 1),
+        "pending tasks for student": select(Task)
+        .join(CourseEnrollment, CourseEnrollment.course_id == Task.course_id)
+        .where(
+            CourseEnrollment.student_id == 1,
+            CourseEnrollment.status == EnrollmentStatus.ACTIVE,
+            not_(exists().where(and_(Submission.task_id == Task.id, Submission.student_id == 1))),
+        ),
+    }
+
+
+@dataclass
+class QueryPlan:
+    name: str
+    plan: list[str] = field(default_factory=list)
+    full_scans: list[str] = field(default_factory=list)
+
+
+def _sqlite_full_scan(detail: str) -> bool:
+    return detail.startswith("SCAN ") and "INDEX" not in detail
+
+
+async def explain_queries(engine) -> list[QueryPlan]:
+    """执行每条热点查询，截获实际发出的 SQL 和参数，再对其执行 EXPLAIN。"""
+    dialect = engine.dialect.name
+    prefix = "EXPLAIN QUERY PLAN " if dialect == "sqlite" else "EXPLAIN "
+    captured: list[tuple[str, object]] = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    results = []
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    event.listen(engine.sync_engine, "before_cursor_execute", _capture)
+    try:
+        async with session_factory() as session:
+            for name, stmt in hot_queries().items():
+                captured.clear()
+                await session.execute(stmt)
+                statement, parameters = captured[-1]
+                conn = await session.connection()
+                plan = QueryPlan(name)
+                for row in (await conn.exec_driver_sql(prefix + statement, parameters)).mappings():
+                    if dialect == "sqlite":
+                        detail = row["detail"]
+                        plan.plan.append(detail)
+                        if _sqlite_full_scan(detail):
+                            plan.full_scans.append(detail)
+                    else:
+                        detail = f"{row['table']}: type={row['type']} key={row['key']} rows={row['rows']}"
+                        plan.plan.append(detail)
+                        if row["type"] == "ALL":
+                            plan.full_scans.append(detail)
+                results.append(plan)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", _capture)
+    return results
+
+
+async def run(fresh: bool) -> int:
+    if fresh:
+        tmpdir = tempfile.TemporaryDirectory()
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmpdir.name, 'advisor.db')}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    else:
+        engine = create_async_engine(settings.DATABASE_URL)
+    try:
+        plans = await explain_queries(engine)
+    finally:
+        await engine.dispose()
+
+    scans = 0
+    for plan in plans:
+        flag = "FULL SCAN" if plan.full_scans else "ok"
+        print(f"[{flag:9s}] {plan.name}")
+        for detail in plan.plan:
+            print(f"    {detail}")
+        scans += len(plan.full_scans)
+    print(f"\n{len(plans)} 条查询，{scans} 处全表扫描")
+    return 1 if scans else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fresh", action="store_true", help="在临时 SQLite 库中按模型建表后检查")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.fresh)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+按 submissions 表全量重建 score_stats（作业 / 课程成绩统计），用于修复增量统计或迁移后一次性生成。
+
+    python -m scripts.rebuild_score_stats [--course-id 12]
+
+默认重建所有课程；重建在一个事务中完成，期间的评分会等待该事务结束（MySQL 行锁 / SQLite 写连接）。
+"""
+import argparse
+import asyncio
+import time
+from typing import Optional
+
+from app.crud.score_stats import rebuild_score_stats
+import app.db.base  # noqa: F401  注册全部模型，Course 的关系引用了 CourseSection
+from app.db.session import SessionLocal, engine, write_engine
+
+
+async def run(course_id: Optional[int]) -> None:
+    started = time.perf_counter()
+    async with SessionLocal() as session:
+        rows = await rebuild_score_stats(session, course_id)
+        await session.commit()
+    await engine.dispose()
+    await write_engine.dispose()
+    print(f"Rebuilt {rows} score_stats rows in {time.perf_counter() - started:.1f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--course-id", type=int, help="只重建该课程及其作业的统计")
+    args = parser.parse_args()
+    asyncio.run(run(args.course_id))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,41 @@
 """
 Pytest configuration and fixtures for API testing
 """
+import re
+
 import pytest
 import pytest_asyncio
 import asyncio
 from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
 from typing import AsyncGenerator, Dict
 
+from app.core.pending_cache import pending_task_cache
+from app.core.query_counter import query_counter
+from app.db.migrations import ensure_schema
+
 # Base URL for API - modify if needed
 BASE_URL = "http://localhost:8000"
 API_V1 = f"{BASE_URL}/api/v1"
 
 
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    """Session factory for a temporary SQLite database built by the Alembic migrations (roles 1..3 seeded).
+
+    Test modules seed their own rows by overriding this fixture and requesting it by the same name.
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    query_counter.install(engine)
+    await ensure_schema(engine)
+    pending_task_cache.clear()
+    yield sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    pending_task_cache.clear()
+    query_counter.uninstall(engine)
+    await engine.dispose()
+
+
 @pytest_asyncio.fixture
 async def client() -> AsyncGenerator[AsyncClient, None]:
     """Create async HTTP client for all tests"""
@@ -173,3 +197,20 @@ async def admin_token(client: AsyncClient) -> str:
 async def admin_headers(admin_token: str) -> Dict[str, str]:
     """Get authorization headers for admin"""
     return {"Authorization": f"Bearer {admin_token}"}
+
+
+def query_count(response) -> int:
+    """Number of SQL statements the request executed, from the Server-Timing header (DEV_MODE only)"""
+    match = re.search(r'db;dur=[\d.]+;desc="(\d+) queries"', response.headers.get("server-timing", ""))
+    if match is None:
+        pytest.skip("Server-Timing header not present; start the server with DEV_MODE=True")
+    return int(match.group(1))
+
+
+@pytest.fixture
+def assert_max_queries():
+    """Fail when a response executed more SQL statements than allowed"""
+    def check(response, limit: int) -> None:
+        count = query_count(response)
+        assert count <= limit, f"{response.request.method} {response.request.url.path} ran {count} queries (max {limit})"
+    return check
@@ -125,3 +125,180 @@ async def test_list_announcements(client: AsyncClient, admin_headers: Dict[str,
     data = response.json()
     assert isinstance(data, list)
     assert len(data) > 0
+
+@pytest.mark.asyncio
+async def test_deactivated_user_token_rejected(client: AsyncClient, admin_headers: Dict[str, str]):
+    import uuid
+    unique_suffix = str(uuid.uuid4())[:8]
+    user_data = {
+        "username": f"cached_user_{unique_suffix}",
+        "password": "password123",
+        "email": f"cached_{unique_suffix}@test.com",
+        "full_name": "Cached User",
+        "role_id": 1
+    }
+    create_res = await client.post("/admin/users", json=user_data, headers=admin_headers)
+    assert create_res.status_code == 200
+    user_id = create_res.json()["id"]
+
+    login_res = await client.post("/auth/login", data={"username": user_data["username"], "password": "password123"})
+    user_headers = {"Authorization": f"Bearer {login_res.json()['access_token']}"}
+
+    # Warm the principal cache, then deactivate: the cached entry must not outlive the write
+    response = await client.get("/me/enrollments", params={"student_id": user_id}, headers=user_headers)
+    assert response.status_code == 200
+    await client.delete(f"/admin/users/{user_id}", headers=admin_headers)
+
+    response = await client.get("/me/enrollments", params={"student_id": user_id}, headers=user_headers)
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_principal_cache_stats(client: AsyncClient, admin_headers: Dict[str, str]):
+    response = await client.get("/admin/principal-cache/stats", headers=admin_headers)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert {"size", "hits", "misses"} <= data.keys()
+
+@pytest.mark.asyncio
+async def test_password_hash_stats(client: AsyncClient, admin_headers: Dict[str, str]):
+    response = await client.get("/admin/password-hash/stats", headers=admin_headers)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["hash_time"]["count"] > 0
+    assert "queue_wait" in data
+
+@pytest.mark.asyncio
+async def test_token_cache_stats(client: AsyncClient, admin_headers: Dict[str, str]):
+    await client.get("/admin/announcements", headers=admin_headers)
+    response = await client.get("/admin/token-cache/stats", headers=admin_headers)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["hits"] > 0
+    assert {"size", "misses", "evictions"} <= data.keys()
+
+@pytest.mark.asyncio
+async def test_email_announcement_runs_in_background(client: AsyncClient, admin_headers: Dict[str, str]):
+    me = (await client.get("/users/me", headers=admin_headers)).json()
+    create_res = await client.post(
+        "/admin/announcements",
+        json={"title": "Broadcast", "content": "Mail me", "created_by": me["id"]},
+        headers=admin_headers
+    )
+    assert create_res.status_code == 200
+    announcement_id = create_res.json()["id"]
+
+    response = await client.post(f"/admin/announcements/{announcement_id}/email", json={}, headers=admin_headers)
+    assert response.status_code == 202
+    broadcast = response.json()
+    assert broadcast["announcement_id"] == announcement_id
+
+    response = await client.get(f"/admin/announcements/broadcasts/{broadcast['id']}", headers=admin_headers)
+    assert response.status_code == 200
+    assert {"status", "enqueued", "sent", "failed"} <= response.json().keys()
+
+    response = await client.post("/admin/announcements/999999/email", json={}, headers=admin_headers)
+    assert response.status_code == 404
+
+@pytest.mark.asyncio
+async def test_slow_query_log(client: AsyncClient, admin_headers: Dict[str, str]):
+    response = await client.get("/admin/slow-queries", params={"limit": 5}, headers=admin_headers)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["stats"]["queries"] > 0
+    assert isinstance(data["records"], list)
+
+@pytest.mark.asyncio
+async def test_db_pool_stats(client: AsyncClient, admin_headers: Dict[str, str]):
+    response = await client.get("/admin/db-pool/stats", headers=admin_headers)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["checkouts"] > 0
+    assert {"pool_size", "checked_out", "overflow", "timeouts", "checkout_wait_ms"} <= data.keys()
+
+@pytest.mark.asyncio
+async def test_replica_stats(client: AsyncClient, admin_headers: Dict[str, str]):
+    response = await client.get("/admin/replica/stats", headers=admin_headers)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert {"configured", "available", "lag_seconds", "replica_reads", "fallback_reads"} <= data.keys()
+
+@pytest.mark.asyncio
+async def test_query_budget(client: AsyncClient, admin_headers: Dict[str, str], assert_max_queries):
+    for path in ("/courses/", "/users/me", "/admin/announcements", "/admin/users"):
+        response = await client.get(path, headers=admin_headers)
+        assert response.status_code == 200
+        assert_max_queries(response, 2)
+
+    response = await client.get("/admin/query-stats", headers=admin_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["stats"]["requests"] > 0
+    assert isinstance(data["n_plus_one"], list)
+
+@pytest.mark.asyncio
+async def test_operation_log_stats(client: AsyncClient, admin_headers: Dict[str, str]):
+    response = await client.get("/admin/operation-logs/stats", headers=admin_headers)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["recorded"] > 0
+    assert {"buffered", "written", "dropped", "failed"} <= data.keys()
+
+@pytest.mark.asyncio
+async def test_loop_lag(client: AsyncClient, admin_headers: Dict[str, str]):
+    response = await client.get("/admin/loop-lag", headers=admin_headers)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["stats"]["running"] is True
+    assert data["stats"]["lag_ms"]["count"] > 0
+    assert isinstance(data["reports"], list)
+
+
+@pytest.mark.asyncio
+async def test_request_profiler(client: AsyncClient, admin_headers: Dict[str, str], student_headers: Dict[str, str]):
+    response = await client.get("/admin/users", headers={**admin_headers, "X-Profile": "1"})
+    assert response.status_code == 200
+    profile_id = response.headers["X-Profile-Id"]
+
+    response = await client.get(f"/admin/profiles/{profile_id}", headers=admin_headers)
+    assert response.status_code == 200
+    profile = response.json()
+    assert profile["route"].endswith("/admin/users")
+    assert profile["query_count"] >= 1
+    assert "db_wait" in profile["breakdown_ms"]
+    assert profile["tree"]["name"] == "request"
+
+    # 非管理员的请求头被忽略
+    response = await client.get("/users/me", headers={**student_headers, "X-Profile": "1"})
+    assert "X-Profile-Id" not in response.headers
+
+    response = await client.get("/admin/profiles", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json()["stats"]["rejected_unauthorized"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_request_trace(client: AsyncClient, admin_headers: Dict[str, str]):
+    trace_id = "0af7651916cd43dd8448eb211c80319c"
+    traceparent = f"00-{trace_id}-b7ad6b7169203331-01"
+    response = await client.get("/admin/users", headers={**admin_headers, "traceparent": traceparent})
+    assert response.status_code == 200
+    assert response.headers["X-Trace-Id"] == trace_id
+
+    response = await client.get(f"/admin/traces/{trace_id}", headers=admin_headers)
+    assert response.status_code == 200
+    names = [span["name"] for span in response.json()["spans"]]
+    assert "handler.admin.list_users" in names
+    assert "crud.admin.list_users" in names
+    assert "sql" in names
+    assert "serialize_response" in names
+
+    response = await client.get("/admin/traces/ffffffffffffffffffffffffffffffff", headers=admin_headers)
+    assert response.status_code == 404
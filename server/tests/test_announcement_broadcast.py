@@ -0,0 +1,107 @@
+"""
+Test cases for announcement email fan-out into the outbox (batching, resume, concurrent workers)
+"""
+import asyncio
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.core.announcement_broadcast import AnnouncementBroadcaster
+from app.models import (
+    Announcement,
+    AnnouncementBroadcast,
+    BroadcastStatus,
+    Course,
+    CourseEnrollment,
+    EmailOutbox,
+    EnrollmentStatus,
+    User,
+)
+
+
+@pytest_asyncio.fixture
+async def broadcast_db(tmp_path):
+    """7 students: 5 actively enrolled in course 1, one dropped, one deactivated"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'broadcast.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with factory() as session:
+        admin = User(id=1, username="admin", password_hash="x", role_id=3, email="admin@test.com")
+        course = Course(id=1, title="Databases", teacher_id=1)
+        session.add_all([admin, course])
+        for i in range(2, 9):
+            session.add(
+                User(
+                    id=i,
+                    username=f"student{i}",
+                    full_name=f"Student <{i}>",
+                    password_hash="x",
+                    role_id=1,
+                    email=f"student{i}@test.com",
+                    is_active=i != 8,
+                )
+            )
+            session.add(
+                CourseEnrollment(
+                    course_id=1,
+                    student_id=i,
+                    status=EnrollmentStatus.DROPPED if i == 7 else EnrollmentStatus.ACTIVE,
+                )
+            )
+        session.add(Announcement(id=1, title="Exam moved", content="Now on Friday.", created_by=1))
+        session.add(AnnouncementBroadcast(id=1, announcement_id=1, course_id=1, created_by=1, last_student_id=0, enqueued=0))
+        await session.commit()
+
+    yield factory
+    await engine.dispose()
+
+
+async def _recipients(factory) -> list[str]:
+    async with factory() as session:
+        result = await session.execute(select(EmailOutbox.to_email).order_by(EmailOutbox.id))
+        return list(result.scalars().all())
+
+
+@pytest.mark.asyncio
+async def test_fan_out_in_batches_and_personalize(broadcast_db):
+    broadcaster = AnnouncementBroadcaster(broadcast_db, batch_size=2)
+
+    assert await broadcaster.process_pending() == 5
+    assert await _recipients(broadcast_db) == [f"student{i}@test.com" for i in range(2, 7)]
+
+    async with broadcast_db() as session:
+        broadcast = await session.get(AnnouncementBroadcast, 1)
+        body = (await session.execute(select(EmailOutbox.html_body).limit(1))).scalar_one()
+    assert broadcast.status == BroadcastStatus.DONE
+    assert broadcast.enqueued == 5
+    assert "Student &lt;2&gt;" in body
+    assert "Exam moved" in body
+
+
+@pytest.mark.asyncio
+async def test_resume_after_restart_does_not_duplicate(broadcast_db):
+    first = AnnouncementBroadcaster(broadcast_db, batch_size=2)
+    assert await first.advance(1) == 2
+
+    # A fresh instance (e.g. after a restart) continues from last_student_id
+    second = AnnouncementBroadcaster(broadcast_db, batch_size=2)
+    assert await second.process_pending() == 3
+    recipients = await _recipients(broadcast_db)
+    assert len(recipients) == len(set(recipients)) == 5
+
+
+@pytest.mark.asyncio
+async def test_concurrent_workers_enqueue_each_recipient_once(broadcast_db):
+    workers = [AnnouncementBroadcaster(broadcast_db, batch_size=2) for _ in range(3)]
+
+    await asyncio.gather(*(worker.process_pending() for worker in workers))
+    recipients = await _recipients(broadcast_db)
+    assert len(recipients) == len(set(recipients)) == 5
+    async with broadcast_db() as session:
+        assert (await session.execute(select(func.count()).select_from(EmailOutbox))).scalar_one() == 5
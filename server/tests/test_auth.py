@@ -104,6 +104,27 @@ class TestAuth:
         response = await client.post("/auth/login", data=login_data)
         assert response.status_code == 400
     
+    @pytest.mark.asyncio
+    async def test_login_with_email(self, client: AsyncClient):
+        """Test login with email instead of username (case-insensitive)"""
+        user_data = {
+            "username": "email_login_user",
+            "password": "testpass123",
+            "email": "email_login@test.com",
+            "full_name": "Email Login User",
+            "role_id": 1
+        }
+        await client.post("/auth/register", json=user_data)
+
+        login_data = {
+            "username": "Email_Login@Test.com",
+            "password": "testpass123"
+        }
+
+        response = await client.post("/auth/login", data=login_data)
+        assert response.status_code == 200
+        assert "access_token" in response.json()
+
     @pytest.mark.asyncio
     async def test_login_nonexistent_user(self, client: AsyncClient):
         """Test login with non-existent user"""
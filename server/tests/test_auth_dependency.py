@@ -0,0 +1,43 @@
+"""
+Test cases for the cached principal used by the auth dependencies
+"""
+import pytest
+import pytest_asyncio
+
+from app.core.principal_cache import principal_cache
+from app.core.security import create_access_token
+from app.crud.crud_user import user as crud_user
+from app.models import User
+from app.routers import get_current_user, load_principal
+
+
+@pytest_asyncio.fixture
+async def session_factory(session_factory):
+    async with session_factory() as session:
+        session.add(User(id=7, username="alice", password_hash="x", role_id=2))
+        await session.commit()
+    principal_cache.clear()
+    yield session_factory
+    principal_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_invalidation_during_lookup_is_not_overwritten(session_factory, monkeypatch):
+    original_get = crud_user.get
+
+    async def get_then_demote(db, id):
+        user = await original_get(db, id=id)
+        principal_cache.invalidate(id)  # 另一个请求在查询期间修改了用户并失效缓存
+        return user
+
+    monkeypatch.setattr(crud_user, "get", get_then_demote)
+    async with session_factory() as session:
+        assert (await get_current_user(db=session, token=create_access_token(7))).id == 7
+        assert principal_cache.get(7) is None
+        assert (await load_principal(session, 7)).role_id == 2
+        assert principal_cache.get(7) is None
+
+    monkeypatch.setattr(crud_user, "get", original_get)
+    async with session_factory() as session:
+        await get_current_user(db=session, token=create_access_token(7))
+    assert principal_cache.get(7).username == "alice"
@@ -0,0 +1,42 @@
+"""
+Test cases for the instrumented connection pool and pool warm-up
+"""
+import pytest
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.pool import InstrumentedQueuePool, pool_stats, warm_pool
+
+
+def _engine(tmp_path, **kwargs):
+    return create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedQueuePool, **kwargs
+    )
+
+
+@pytest.mark.asyncio
+async def test_checkout_and_timeout_are_counted(tmp_path):
+    engine = _engine(tmp_path, pool_size=1, max_overflow=0, pool_timeout=0.05)
+
+    async with engine.connect():
+        assert pool_stats(engine)["checked_out"] == 1
+        with pytest.raises(exc.TimeoutError):
+            async with engine.connect():
+                pass
+
+    stats = pool_stats(engine)
+    assert stats["checked_out"] == 0
+    assert stats["checkouts"] == 1
+    assert stats["timeouts"] == 1
+    assert stats["checkout_wait_ms"]["count"] == 2
+    assert stats["checkout_wait_ms"]["buckets"]["+Inf"] == 2
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_warm_pool_fills_idle_connections(tmp_path):
+    engine = _engine(tmp_path, pool_size=3, max_overflow=0)
+
+    assert await warm_pool(engine, 3) == 3
+    assert pool_stats(engine)["checked_in"] == 3
+    await engine.dispose()
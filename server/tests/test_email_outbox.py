@@ -0,0 +1,88 @@
+"""
+Test cases for the email outbox sender against a local aiosmtpd stand-in
+"""
+import socket
+
+import pytest
+from aiosmtpd.controller import Controller
+from sqlalchemy import select
+
+from app.core.email_outbox import EmailOutboxSender, SMTPConnectionPool
+from app.core.time_utils import get_now
+from app.models.email_outbox import EmailOutbox, EmailStatus
+
+
+class _CollectingHandler:
+    def __init__(self):
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        return "250 OK"
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    handler = _CollectingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    yield controller, handler
+    controller.stop()
+
+
+async def _enqueue(session_factory, count: int) -> None:
+    async with session_factory() as session:
+        session.add_all(
+            EmailOutbox(
+                to_email=f"student{i}@test.com",
+                subject=f"Notice {i}",
+                html_body="<p>hello</p>",
+                status=EmailStatus.PENDING,
+                attempts=0,
+                next_attempt_at=get_now(),
+            )
+            for i in range(count)
+        )
+        await session.commit()
+
+
+async def _statuses(session_factory) -> list[EmailStatus]:
+    async with session_factory() as session:
+        result = await session.execute(select(EmailOutbox.status))
+        return list(result.scalars().all())
+
+
+@pytest.mark.asyncio
+async def test_batch_reuses_pooled_connections(smtp_server, session_factory):
+    controller, handler = smtp_server
+    pool = SMTPConnectionPool("127.0.0.1", controller.port, "", "", use_tls=False, size=2)
+    sender = EmailOutboxSender(session_factory, pool, sender_address="noreply@test.com", batch_size=20)
+    await _enqueue(session_factory, 20)
+
+    assert await sender.process_batch() == 20
+    await sender.stop()
+
+    assert len(handler.messages) == 20
+    assert pool.connections_opened <= 2
+    assert set(await _statuses(session_factory)) == {EmailStatus.SENT}
+
+
+@pytest.mark.asyncio
+async def test_failed_delivery_is_retried_then_given_up(session_factory):
+    pool = SMTPConnectionPool("127.0.0.1", _free_port(), "", "", use_tls=False, size=1, timeout=2)
+    sender = EmailOutboxSender(
+        session_factory, pool, sender_address="noreply@test.com", max_attempts=2, retry_base_seconds=0
+    )
+    await _enqueue(session_factory, 1)
+
+    assert await sender.process_batch() == 1
+    assert await _statuses(session_factory) == [EmailStatus.PENDING]
+    assert await sender.process_batch() == 1
+    assert await _statuses(session_factory) == [EmailStatus.FAILED]
+    assert sender.failed == 1
@@ -0,0 +1,73 @@
+"""
+Test cases for the course gradebook matrix
+"""
+import pytest
+import pytest_asyncio
+
+from app.core.query_counter import count_queries
+from app.crud import scores as crud_scores
+from app.models import (
+    Course, CourseEnrollment, EnrollmentStatus, Submission, SubmissionStatus, Task, TaskType, User,
+)
+
+
+@pytest_asyncio.fixture
+async def session_factory(session_factory):
+    async with session_factory() as session:
+        session.add(User(id=1, username="teacher", password_hash="x", role_id=2))
+        session.add_all([
+            User(id=10, username="alice", full_name="Alice", password_hash="x", role_id=1),
+            User(id=11, username="bob", password_hash="x", role_id=1),
+            User(id=12, username="carol", password_hash="x", role_id=1),
+        ])
+        session.add_all([
+            Course(id=1, teacher_id=1, title="DB"),
+            Course(id=2, teacher_id=1, title="Empty"),
+        ])
+        session.add_all([
+            Task(id=1, course_id=1, teacher_id=1, title="SQL", type=TaskType.ASSIGNMENT),
+            Task(id=2, course_id=1, teacher_id=1, title="Exam", type=TaskType.EXAM),
+        ])
+        session.add_all([
+            CourseEnrollment(course_id=1, student_id=10, status=EnrollmentStatus.ACTIVE),
+            CourseEnrollment(course_id=1, student_id=11, status=EnrollmentStatus.ACTIVE),
+            CourseEnrollment(course_id=1, student_id=12, status=EnrollmentStatus.DROPPED),
+            CourseEnrollment(course_id=2, student_id=10, status=EnrollmentStatus.ACTIVE),
+        ])
+        session.add_all([
+            Submission(task_id=1, student_id=10, score=80, status=SubmissionStatus.GRADED),
+            Submission(task_id=2, student_id=10, score=95, status=SubmissionStatus.GRADED),
+            Submission(task_id=1, student_id=11, score=None, status=SubmissionStatus.LATE),
+            Submission(task_id=1, student_id=12, score=60, status=SubmissionStatus.GRADED),  # 已退课
+        ])
+        await session.commit()
+    return session_factory
+
+
+@pytest.mark.asyncio
+async def test_gradebook_matrix_in_one_query(session_factory):
+    async with session_factory() as session:
+        with count_queries() as stats:
+            gradebook = await crud_scores.get_gradebook(session, 1)
+
+    assert stats.count == 1
+    assert gradebook["task_ids"] == [1, 2]
+    assert gradebook["task_titles"] == ["SQL", "Exam"]
+    assert gradebook["student_ids"] == [10, 11]
+    assert gradebook["student_names"] == ["Alice", "bob"]
+    assert gradebook["scores"] == [[80.0, 95.0], [None, None]]
+    assert gradebook["missing"] == [[], [1]]
+    assert gradebook["student_totals"] == [175.0, None]
+    assert gradebook["student_submitted"] == [2, 1]
+    assert gradebook["task_averages"] == [80.0, 95.0]
+    assert gradebook["task_submitted"] == [2, 1]
+
+
+@pytest.mark.asyncio
+async def test_gradebook_without_tasks_or_course(session_factory):
+    async with session_factory() as session:
+        gradebook = await crud_scores.get_gradebook(session, 2)
+        assert gradebook["student_ids"] == [10]
+        assert gradebook["task_ids"] == []
+        assert gradebook["scores"] == [[]]
+        assert await crud_scores.get_gradebook(session, 99) is None
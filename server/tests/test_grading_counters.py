@@ -0,0 +1,146 @@
+"""
+Test cases for the denormalized teacher pending-grading counters
+"""
+import asyncio
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete, update
+
+from app.core.query_counter import count_queries
+from app.crud import enrollments as crud_enrollments
+from app.crud import grading_counters, score_stats
+from app.crud import scores as crud_scores
+from app.crud import tasks as crud_tasks
+from app.models import Course, CourseEnrollment, EnrollmentStatus, GradingCounter, Task, TaskType, User
+from app.schemas.submissions import GradeUpdate, SubmissionCreate
+
+TEACHER = 1
+
+
+@pytest_asyncio.fixture
+async def session_factory(session_factory):
+    async with session_factory() as session:
+        session.add(User(id=TEACHER, username="teacher", password_hash="x", role_id=2))
+        session.add_all([User(id=sid, username=f"s{sid}", password_hash="x", role_id=1) for sid in (10, 11, 12)])
+        session.add_all([Course(id=1, teacher_id=TEACHER, title="DB"), Course(id=2, teacher_id=TEACHER, title="OS")])
+        session.add_all([
+            Task(id=1, course_id=1, teacher_id=TEACHER, title="SQL", type=TaskType.ASSIGNMENT),
+            Task(id=2, course_id=2, teacher_id=TEACHER, title="Paging", type=TaskType.ASSIGNMENT),
+        ])
+        session.add_all([
+            CourseEnrollment(course_id=1, student_id=10, status=EnrollmentStatus.ACTIVE),
+            CourseEnrollment(course_id=1, student_id=11, status=EnrollmentStatus.ACTIVE),
+            CourseEnrollment(course_id=2, student_id=12, status=EnrollmentStatus.ACTIVE),
+        ])
+        await session.commit()
+    return session_factory
+
+
+async def _pending(factory) -> int:
+    """教师首页读到的计数；同时与按 submissions 表直接连接计算的结果比较。"""
+    async with factory() as session:
+        count = await crud_scores.get_teacher_pending_grading_count(session, TEACHER)
+        assert count == sum((await grading_counters._compute(session)).values())
+    return count
+
+
+async def _submit(factory, task_id: int, student_id: int) -> int:
+    async with factory() as session:
+        submission = await crud_tasks.submit_task(session, task_id, SubmissionCreate(student_id=student_id))
+    return submission.id
+
+
+async def _grade(factory, submission_id: int) -> None:
+    async with factory() as session:
+        submission = await crud_tasks.get_submission_with_course(session, submission_id)
+        await crud_tasks.apply_grade(session, submission, GradeUpdate(score=Decimal(90)))
+
+
+@pytest.mark.asyncio
+async def test_counters_follow_submission_and_enrollment_changes(session_factory):
+    factory = session_factory
+    assert await _pending(factory) == 0
+
+    first = await _submit(factory, 1, 10)
+    second = await _submit(factory, 1, 11)
+    await _submit(factory, 2, 12)
+    assert await _pending(factory) == 3
+    await _submit(factory, 1, 10)  # 重新提交仍是同一份待批改
+    assert await _pending(factory) == 3
+
+    await _grade(factory, first)
+    assert await _pending(factory) == 2
+    await _grade(factory, first)
+    assert await _pending(factory) == 2
+    await _submit(factory, 1, 10)  # 评分后重新提交，再次待批改
+    assert await _pending(factory) == 3
+
+    async with factory() as session:
+        await crud_enrollments.drop_course(session, 1, 11)
+    assert await _pending(factory) == 2
+    async with factory() as session:
+        await crud_enrollments.enroll_student(session, 1, 11)
+    assert await _pending(factory) == 3
+
+    # 已退课学生的提交被批改：本来就不计入，计数不变；重新选课后也不再计入
+    async with factory() as session:
+        await crud_enrollments.drop_course(session, 1, 11)
+    await _grade(factory, second)
+    async with factory() as session:
+        await crud_enrollments.enroll_student(session, 1, 11)
+    assert await _pending(factory) == 2
+
+    async with factory() as session:
+        await crud_tasks.delete_task(session, 2)
+    assert await _pending(factory) == 1
+
+    async with factory() as session:
+        with count_queries() as stats:
+            await crud_scores.get_teacher_pending_grading_count(session, TEACHER)
+        assert stats.count == 1
+        report = await grading_counters.reconcile_grading_counters(session)
+    assert report == {"checked": 2, "created": 0, "drift": []}
+
+
+@pytest.mark.asyncio
+async def test_reconcile_fixes_drift_and_missing_rows(session_factory):
+    factory = session_factory
+    await _submit(factory, 1, 10)
+    await _submit(factory, 2, 12)
+    async with factory() as session:
+        await session.execute(update(GradingCounter).where(GradingCounter.course_id == 1).values(pending=42))
+        await session.execute(delete(GradingCounter).where(GradingCounter.course_id == 2))
+        await session.commit()
+    async with factory() as session:  # 读取不再临时计算缺失的行
+        assert await crud_scores.get_teacher_pending_grading_count(session, TEACHER) == 42
+
+    async with factory() as session:
+        report = await grading_counters.reconcile_grading_counters(session, course_id=1)
+        await session.commit()
+    assert report == {"checked": 1, "created": 0, "drift": [{"course_id": 1, "stored": 42, "actual": 1}]}
+
+    async with factory() as session:
+        report = await grading_counters.reconcile_grading_counters(session)
+        await session.commit()
+    assert report == {"checked": 2, "created": 1, "drift": []}
+    assert await _pending(factory) == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_first_submissions(session_factory):
+    factory = session_factory
+    students = range(20, 26)
+    async with factory() as session:
+        session.add_all([User(id=sid, username=f"s{sid}", password_hash="x", role_id=1) for sid in students])
+        session.add_all([
+            CourseEnrollment(course_id=1, student_id=sid, status=EnrollmentStatus.ACTIVE) for sid in students
+        ])
+        await session.commit()
+
+    submission_ids = await asyncio.gather(*(_submit(factory, 1, sid) for sid in students))
+    assert len(set(submission_ids)) == len(students)
+    assert await _pending(factory) == len(students)
+    async with factory() as session:
+        assert (await score_stats.get_course_score_stats(session, 1))["submissions"] == len(students)
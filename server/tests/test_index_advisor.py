@@ -0,0 +1,34 @@
+"""
+Test cases for the schema indexes: hot queries must not fall back to full table scans
+"""
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.base import Base
+from scripts.index_advisor import explain_queries
+
+
+@pytest_asyncio.fixture
+async def engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'advisor.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_hot_queries_use_indexes(engine):
+    plans = await explain_queries(engine)
+    assert plans
+    assert {plan.name: plan.full_scans for plan in plans if plan.full_scans} == {}
+
+
+@pytest.mark.asyncio
+async def test_missing_index_is_reported(engine):
+    async with engine.begin() as conn:
+        await conn.execute(text("DROP INDEX ix_tasks_course_id"))
+    plans = {plan.name: plan for plan in await explain_queries(engine)}
+    assert plans["list_tasks"].full_scans
@@ -0,0 +1,45 @@
+"""
+Test cases for the event-loop lag monitor
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.core.loop_monitor import LoopLagMonitor
+
+
+async def blocking_handler(scope):
+    time.sleep(0.3)  # 模拟 async 接口中的同步调用
+
+
+@pytest.mark.asyncio
+async def test_blocking_call_is_reported_with_stack_and_route():
+    monitor = LoopLagMonitor(interval_ms=20, threshold_ms=50)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.1)
+        scope = {"type": "http", "method": "POST", "path": "/api/v1/uploads/file"}
+        await blocking_handler(scope)
+        await asyncio.sleep(0.1)
+    finally:
+        await monitor.stop()
+
+    assert monitor.stats()["stalls"] >= 1
+    report = monitor.reports()[0]
+    assert report["lag_ms"] >= 200
+    assert report["route"] == "POST /api/v1/uploads/file"
+    assert any("in blocking_handler" in frame for frame in report["stack"])
+
+
+@pytest.mark.asyncio
+async def test_idle_loop_has_no_stalls():
+    monitor = LoopLagMonitor(interval_ms=10, threshold_ms=100)
+    monitor.start()
+    await asyncio.sleep(0.2)
+    await monitor.stop()
+
+    stats = monitor.stats()
+    assert stats["stalls"] == 0
+    assert stats["lag_ms"]["count"] > 0
+    assert not stats["running"]
@@ -0,0 +1,90 @@
+"""
+Test cases for per-route request metrics and the Prometheus /metrics endpoint
+"""
+import pytest
+from fastapi import APIRouter, FastAPI, HTTPException
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.core.metrics import RequestMetrics, render_prometheus
+from app.db.pool import InstrumentedQueuePool, pool_stats
+from app.middleware.metrics import MetricsMiddleware
+from app.routers import metrics as metrics_router
+
+
+def _app(metrics: RequestMetrics) -> FastAPI:
+    app = FastAPI()
+    router = APIRouter()
+
+    @router.get("/tasks/{task_id}")
+    async def read_task(task_id: int):
+        if task_id == 0:
+            raise HTTPException(status_code=404)
+        return {"id": task_id, "in_flight": metrics.in_flight}
+
+    @router.get("/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    app.include_router(router, prefix="/api/v1")
+
+    app.add_middleware(MetricsMiddleware, metrics=metrics)
+    return app
+
+
+@pytest.mark.asyncio
+async def test_requests_labelled_by_route_template():
+    metrics = RequestMetrics()
+    transport = ASGITransport(app=_app(metrics), raise_app_exceptions=False)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        assert (await client.get("/api/v1/tasks/1")).json()["in_flight"] == 1
+        await client.get("/api/v1/tasks/2")
+        await client.get("/api/v1/tasks/0")
+        assert (await client.get("/api/v1/boom")).status_code == 500
+        await client.get("/no/such/path")
+
+    routes = dict(metrics.routes())
+    assert routes[("GET", "/api/v1/tasks/{task_id}")].statuses == {200: 2, 404: 1}
+    assert routes[("GET", "/api/v1/boom")].errors == 1
+    assert ("GET", "<unmatched>") in routes
+    assert metrics.in_flight == 0
+
+    body = render_prometheus(metrics, {})
+    assert 'http_requests_total{method="GET",route="/api/v1/tasks/{task_id}",status="200"} 2' in body
+    assert 'http_request_errors_total{method="GET",route="/api/v1/boom"} 1' in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/api/v1/tasks/{task_id}",le="+Inf"} 3' in body
+    assert "http_requests_in_flight 0" in body
+
+
+@pytest.mark.asyncio
+async def test_pool_gauges(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'm.db'}", poolclass=InstrumentedQueuePool, pool_size=2)
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        body = render_prometheus(RequestMetrics(), {"primary": pool_stats(engine)})
+    await engine.dispose()
+
+    assert 'db_pool_size{pool="primary"} 2' in body
+    assert 'db_pool_checked_out{pool="primary"} 1' in body
+    assert 'db_pool_checkouts_total{pool="primary"} 1' in body
+    assert 'db_pool_checkout_wait_seconds_count{pool="primary"} 1' in body
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_requires_token(monkeypatch):
+    app = FastAPI()
+    app.include_router(metrics_router.router)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        monkeypatch.setattr(settings, "METRICS_TOKEN", "")
+        assert (await client.get("/metrics")).status_code == 503  # 没有令牌时不公开
+
+        monkeypatch.setattr(settings, "METRICS_TOKEN", "secret")
+        assert (await client.get("/metrics")).status_code == 401
+        assert (await client.get("/metrics", headers={"Authorization": "Bearer wrong"})).status_code == 401
+        response = await client.get("/metrics", headers={"Authorization": "Bearer secret"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "db_pool_checked_out" in response.text
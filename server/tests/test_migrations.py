@@ -0,0 +1,156 @@
+"""
+Test cases for the startup schema check (alembic revision instead of create_all)
+"""
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.runtime.migration import MigrationContext
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, func, inspect, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.crud import grading_counters, score_stats
+from app.db.base import Base
+from app.db.migrations import BASELINE_SCHEMA, alembic_config, ensure_schema, get_db_revision, script_heads
+from app.models import Role
+
+
+@pytest_asyncio.fixture
+async def engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'schema.db'}")
+    yield engine
+    await engine.dispose()
+
+
+def _upgrade_to(sync_conn, revision: str) -> None:
+    config = alembic_config()
+    config.attributes["connection"] = sync_conn
+    command.upgrade(config, revision)
+
+
+def _schema_diff(sync_conn) -> list:
+    return compare_metadata(MigrationContext.configure(sync_conn), Base.metadata)
+
+
+async def _role_count(engine) -> int:
+    async with engine.connect() as conn:
+        return (await conn.execute(select(func.count()).select_from(Role))).scalar()
+
+
+@pytest.mark.asyncio
+async def test_fresh_database_is_upgraded_then_skipped(engine):
+    assert await ensure_schema(engine) == "upgraded"
+    assert await get_db_revision(engine) == script_heads()
+    assert await _role_count(engine) == 3
+
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    assert await ensure_schema(engine) == "current"
+    assert statements and all(not s.lstrip().upper().startswith(("CREATE", "ALTER", "INSERT")) for s in statements)
+
+
+@pytest.mark.asyncio
+async def test_legacy_create_all_database_is_stamped(engine):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(Role.__table__.insert(), [{"id": 1, "name": "student"}])
+
+    assert await ensure_schema(engine) == "upgraded"
+    assert await get_db_revision(engine) == script_heads()
+    assert await _role_count(engine) == 3
+
+
+@pytest.mark.asyncio
+async def test_outdated_schema_without_auto_migrate(engine):
+    with pytest.raises(RuntimeError, match="alembic upgrade head"):
+        await ensure_schema(engine, auto_migrate=False)
+
+
+@pytest.mark.asyncio
+async def test_legacy_baseline_database_gets_every_later_table(engine):
+    # 0001 与旧版 create_all 的表结构一致；去掉版本号即得到一个未纳入 Alembic 的旧库
+    async with engine.begin() as conn:
+        await conn.run_sync(_upgrade_to, "0001")
+        assert set(await conn.run_sync(lambda c: inspect(c).get_table_names())) == set(BASELINE_SCHEMA) | {"alembic_version"}
+        for table, columns in BASELINE_SCHEMA.items():
+            assert {c["name"] for c in await conn.run_sync(lambda c: inspect(c).get_columns(table))} == columns
+        await conn.execute(text("DROP TABLE alembic_version"))
+
+    assert await ensure_schema(engine) == "upgraded"
+    async with engine.connect() as conn:
+        assert await conn.run_sync(_schema_diff) == []
+
+
+@pytest.mark.asyncio
+async def test_unrecognized_legacy_schema_is_not_stamped(engine):
+    async with engine.begin() as conn:
+        await conn.run_sync(_upgrade_to, "0001")
+        await conn.execute(text("DROP TABLE alembic_version"))
+        await conn.execute(text("DROP TABLE course_sections"))
+
+    with pytest.raises(RuntimeError, match="missing: course_sections"):
+        await ensure_schema(engine)
+    assert await get_db_revision(engine) == ()
+
+
+def _downgrade_to(sync_conn, revision: str) -> None:
+    config = alembic_config()
+    config.attributes["connection"] = sync_conn
+    command.downgrade(config, revision)
+
+
+@pytest.mark.asyncio
+async def test_operation_log_migration_keeps_rows(engine):
+    async with engine.begin() as conn:
+        await conn.run_sync(_upgrade_to, "0003")
+        await conn.execute(text("INSERT INTO operation_logs (user_id, action) VALUES (NULL, 'login')"))
+        await conn.run_sync(_upgrade_to, "0004")
+        assert (await conn.execute(text("SELECT action, route FROM operation_logs"))).all() == [("login", None)]
+        await conn.run_sync(_downgrade_to, "0003")
+        assert (await conn.execute(text("SELECT action FROM operation_logs"))).all() == [("login",)]
+
+
+async def _seed_legacy_scores(conn) -> None:
+    """迁移前已有的课程、作业和提交（直接写表，不经过模型的插入事件）。"""
+    await conn.execute(text(
+        "INSERT INTO users (id, username, password_hash, role_id) VALUES (1, 't', 'x', 2), (10, 'a', 'x', 1), (11, 'b', 'x', 1)"
+    ))
+    await conn.execute(text("INSERT INTO courses (id, teacher_id, title) VALUES (1, 1, 'DB'), (2, 1, 'OS')"))
+    await conn.execute(text("INSERT INTO tasks (id, course_id, teacher_id, title, type) VALUES (1, 1, 1, 'SQL', 'assignment')"))
+    await conn.execute(text(
+        "INSERT INTO course_enrollments (course_id, student_id, status) VALUES (1, 10, 'active'), (1, 11, 'active')"
+    ))
+    await conn.execute(text(
+        "INSERT INTO submissions (task_id, student_id, score, status) VALUES (1, 10, 80, 'graded'), (1, 11, NULL, 'submitted')"
+    ))
+
+
+@pytest.mark.asyncio
+async def test_score_stats_backfilled_for_existing_data(engine):
+    async with engine.begin() as conn:
+        await conn.run_sync(_upgrade_to, "0009")
+        await _seed_legacy_scores(conn)
+        await conn.run_sync(_upgrade_to, "head")
+
+    async with AsyncSession(engine) as session:
+        stats = await score_stats.get_course_score_stats(session, 1)
+        assert (stats["submissions"], stats["graded"], stats["mean"]) == (2, 1, 80.0)
+        assert stats["tasks"][0]["max"] == 80.0
+        assert (await score_stats.get_course_score_stats(session, 2))["submissions"] == 0
+        assert await score_stats.rebuild_score_stats(session) == 3  # 2 个课程、1 个作业
+        await session.flush()
+        assert await score_stats.get_course_score_stats(session, 1) == stats
+
+
+@pytest.mark.asyncio
+async def test_grading_counters_backfilled_for_existing_courses(engine):
+    async with engine.begin() as conn:
+        await conn.run_sync(_upgrade_to, "0010")
+        await _seed_legacy_scores(conn)
+        await conn.run_sync(_upgrade_to, "head")
+        assert (await conn.execute(text("SELECT course_id, pending FROM grading_counters ORDER BY course_id"))).all() == [
+            (1, 1), (2, 0),
+        ]
+
+    async with AsyncSession(engine) as session:
+        assert await grading_counters.reconcile_grading_counters(session) == {"checked": 2, "created": 0, "drift": []}
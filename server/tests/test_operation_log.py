@@ -0,0 +1,68 @@
+"""
+Test cases for the operation log middleware and its batched writer
+"""
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select
+
+from app.core.operation_log import OperationLogWriter
+from app.middleware.operation_log import OperationLogMiddleware
+from app.middleware.request_context import RequestContextMiddleware, set_current_user_id
+from app.models import User
+from app.models.operation_log import OperationLog
+
+
+@pytest_asyncio.fixture
+async def session_factory(session_factory):
+    async with session_factory() as session:
+        session.add(User(id=7, username="alice", password_hash="x", role_id=1))
+        await session.commit()
+    return session_factory
+
+
+def _app(writer: OperationLogWriter) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def read_item(item_id: int):
+        set_current_user_id(7)
+        return {"id": item_id}
+
+    app.add_middleware(OperationLogMiddleware, writer=writer)
+    app.add_middleware(RequestContextMiddleware)
+    return app
+
+
+@pytest.mark.asyncio
+async def test_requests_written_in_batches(session_factory):
+    writer = OperationLogWriter(session_factory, batch_size=3, flush_ms=60_000)
+    async with AsyncClient(transport=ASGITransport(app=_app(writer)), base_url="http://test") as client:
+        for item_id in range(4):
+            assert (await client.get(f"/items/{item_id}")).status_code == 200
+        assert (await client.get("/missing")).status_code == 404
+
+    assert writer.stats()["buffered"] == 5
+    assert await writer.flush() == 3
+    await writer.stop()  # 停止时写完剩余记录
+
+    async with session_factory() as session:
+        logs = (await session.execute(select(OperationLog).order_by(OperationLog.id))).scalars().all()
+    assert len(logs) == 5
+    assert logs[0].user_id == 7
+    assert logs[0].action == "GET /items/{item_id}"
+    assert logs[0].status_code == 200 and logs[0].duration_ms >= 0
+    assert logs[-1].user_id is None and logs[-1].route == "/missing" and logs[-1].status_code == 404
+    assert writer.stats()["written"] == 5 and writer.stats()["flushes"] == 2
+
+
+@pytest.mark.asyncio
+async def test_overflow_is_dropped_and_counted(session_factory):
+    writer = OperationLogWriter(session_factory, batch_size=10, max_buffer=2)
+    for _ in range(5):
+        writer.record({"action": "GET /", "method": "GET", "route": "/", "status_code": 200, "duration_ms": 1.0})
+
+    stats = writer.stats()
+    assert stats["buffered"] == 2
+    assert stats["dropped"] == 3
@@ -0,0 +1,199 @@
+"""
+Test cases for password reset code stores (two workers sharing one backend)
+"""
+import asyncio
+from datetime import timedelta
+import subprocess
+import sys
+
+from fastapi import HTTPException
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.db.base  # noqa: F401  (registers every model so mappers can configure)
+from app.core.password_reset import (
+    FilePasswordResetStore,
+    InMemoryPasswordResetStore,
+    PasswordResetStore,
+    SqlPasswordResetStore,
+)
+from app.models.password_reset import PasswordResetCode
+
+
+def _session_factory(url: str):
+    engine = create_async_engine(url)
+    return engine, sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.fixture
+def sqlite_url(tmp_path):
+    return f"sqlite+aiosqlite:///{tmp_path / 'reset.db'}"
+
+
+class TestSqlStore:
+    """Two SqlPasswordResetStore instances on separate engines stand in for two workers"""
+
+    @pytest.mark.asyncio
+    async def test_code_issued_by_one_worker_verifies_on_another(self, sqlite_url):
+        engine_a, factory_a = _session_factory(sqlite_url)
+        engine_b, factory_b = _session_factory(sqlite_url)
+        async with engine_a.begin() as conn:
+            await conn.run_sync(PasswordResetCode.__table__.create)
+        worker_a = SqlPasswordResetStore(factory_a)
+        worker_b = SqlPasswordResetStore(factory_b)
+
+        code = await worker_a.issue("User@Test.com")
+        assert await worker_b.verify("user@test.com", code, consume=False)
+        assert await worker_b.verify("user@test.com", code)
+        assert not await worker_a.verify("user@test.com", code)
+
+        await engine_a.dispose()
+        await engine_b.dispose()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_verify_consumes_once(self, sqlite_url):
+        engine_a, factory_a = _session_factory(sqlite_url)
+        engine_b, factory_b = _session_factory(sqlite_url)
+        async with engine_a.begin() as conn:
+            await conn.run_sync(PasswordResetCode.__table__.create)
+        worker_a = SqlPasswordResetStore(factory_a)
+        worker_b = SqlPasswordResetStore(factory_b)
+
+        code = await worker_a.issue("race@test.com")
+        results = await asyncio.gather(
+            worker_a.verify("race@test.com", code),
+            worker_b.verify("race@test.com", code),
+        )
+        assert sorted(results) == [False, True]
+
+        await engine_a.dispose()
+        await engine_b.dispose()
+
+    @pytest.mark.asyncio
+    async def test_sweep_removes_expired(self, sqlite_url):
+        engine, factory = _session_factory(sqlite_url)
+        async with engine.begin() as conn:
+            await conn.run_sync(PasswordResetCode.__table__.create)
+        store = SqlPasswordResetStore(factory)
+        store._ttl = timedelta(seconds=-1)
+
+        code = await store.issue("old@test.com")
+        assert not await store.verify("old@test.com", code)
+        assert await store.sweep() == 1
+
+        await engine.dispose()
+
+
+class TestFileStore:
+    """Two FilePasswordResetStore instances on one file stand in for two workers"""
+
+    @pytest.mark.asyncio
+    async def test_code_issued_by_one_worker_verifies_on_another(self, tmp_path):
+        path = str(tmp_path / "codes.json")
+        worker_a = FilePasswordResetStore(path)
+        worker_b = FilePasswordResetStore(path)
+
+        code = await worker_a.issue("user@test.com")
+        assert not await worker_b.verify("user@test.com", "000000" if code != "000000" else "111111")
+        assert await worker_b.verify("user@test.com", code)
+        assert not await worker_a.verify("user@test.com", code)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_verify_consumes_once(self, tmp_path):
+        path = str(tmp_path / "codes.json")
+        worker_a = FilePasswordResetStore(path)
+        worker_b = FilePasswordResetStore(path)
+
+        code = await worker_a.issue("race@test.com")
+        results = await asyncio.gather(
+            *(worker.verify("race@test.com", code) for worker in (worker_a, worker_b) * 4)
+        )
+        assert results.count(True) == 1
+
+    @pytest.mark.asyncio
+    async def test_size_cap_evicts_oldest(self, tmp_path):
+        store = FilePasswordResetStore(str(tmp_path / "codes.json"), max_entries=2)
+
+        first = await store.issue("a@test.com")
+        await store.issue("b@test.com")
+        await store.issue("c@test.com")
+        assert not await store.verify("a@test.com", first)
+
+
+class TestInMemoryStore:
+    @pytest.mark.asyncio
+    async def test_size_cap_and_sweep(self):
+        store = InMemoryPasswordResetStore(max_entries=2)
+
+        first = await store.issue("a@test.com")
+        second = await store.issue("b@test.com")
+        await store.issue("c@test.com")
+        assert not await store.verify("a@test.com", first)
+        assert await store.verify("b@test.com", second)
+
+        store._ttl = timedelta(seconds=-1)
+        await store.issue("d@test.com")
+        assert await store.sweep() == 1
+
+
+def test_store_interface_is_abstract():
+    with pytest.raises(TypeError):
+        PasswordResetStore()
+
+    class Partial(PasswordResetStore):
+        async def issue(self, email: str) -> str:
+            return "000000"
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_module_imports_without_fcntl():
+    """Windows 上没有 fcntl：默认的内存后端仍可用，只有文件后端需要它。"""
+    script = (
+        "import sys; sys.modules['fcntl'] = None\n"
+        "from app.core.password_reset import FilePasswordResetStore, InMemoryPasswordResetStore\n"
+        "InMemoryPasswordResetStore()\n"
+        "try:\n"
+        "    FilePasswordResetStore('codes.json')\n"
+        "except ImportError:\n"
+        "    print('file backend unavailable')\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "file backend unavailable"
+
+
+@pytest.mark.asyncio
+async def test_reset_code_survives_busy_hash_pool(session_factory, monkeypatch):
+    from app.models import User
+    from app.routers import auth
+    from app.schemas.password_reset import PasswordResetConfirm
+
+    async with session_factory() as session:
+        session.add(User(id=7, username="alice", email="alice@test.com", password_hash="old", role_id=1))
+        await session.commit()
+    store = InMemoryPasswordResetStore()
+    monkeypatch.setattr(auth, "password_reset_store", store)
+    code = await store.issue("alice@test.com")
+    payload = PasswordResetConfirm(email="alice@test.com", code=code, new_password="new-pass-123")
+
+    async def busy(password: str) -> str:
+        raise HTTPException(status_code=429, detail="Server is busy, please retry shortly")
+
+    monkeypatch.setattr(auth, "get_password_hash_async", busy)
+    async with session_factory() as session:
+        with pytest.raises(HTTPException) as exc_info:
+            await auth.confirm_password_reset(payload, db=session)
+    assert exc_info.value.status_code == 429
+    assert await store.verify("alice@test.com", code, consume=False)  # 验证码未被消费，可以重试
+
+    async def fake_hash(password: str) -> str:
+        return f"hashed:{password}"
+
+    monkeypatch.setattr(auth, "get_password_hash_async", fake_hash)
+    async with session_factory() as session:
+        await auth.confirm_password_reset(payload, db=session)
+        assert (await session.get(User, 7)).password_hash == "hashed:new-pass-123"
+    assert not await store.verify("alice@test.com", code, consume=False)
@@ -0,0 +1,107 @@
+"""
+Test cases for the student pending-task count and its cache
+"""
+import pytest
+import pytest_asyncio
+
+from app.core.pending_cache import pending_task_cache
+from app.core.query_counter import count_queries
+from app.crud import enrollments as crud_enrollments
+from app.crud import scores as crud_scores
+from app.crud import tasks as crud_tasks
+from app.models import (
+    Course,
+    CourseEnrollment,
+    EnrollmentStatus,
+    Submission,
+    SubmissionStatus,
+    Task,
+    TaskType,
+    User,
+)
+from app.schemas.submissions import SubmissionCreate
+from app.schemas.tasks import TaskCreate
+
+STUDENT = 10
+OTHER = 11
+
+
+@pytest_asyncio.fixture
+async def session_factory(session_factory):
+    async with session_factory() as session:
+        session.add(User(id=1, username="teacher", password_hash="x", role_id=2))
+        session.add_all([User(id=sid, username=f"s{sid}", password_hash="x", role_id=1) for sid in (STUDENT, OTHER)])
+        session.add_all([Course(id=cid, teacher_id=1, title=f"C{cid}") for cid in (1, 2, 3)])
+        # 课程 1、2 各 3 个作业；课程 3 的作业不计入（学生已退课）
+        session.add_all([
+            Task(id=task_id, course_id=1 + (task_id - 1) // 3, teacher_id=1, title=f"T{task_id}", type=TaskType.ASSIGNMENT)
+            for task_id in range(1, 10)
+        ])
+        session.add_all([
+            CourseEnrollment(course_id=1, student_id=STUDENT, status=EnrollmentStatus.ACTIVE),
+            CourseEnrollment(course_id=2, student_id=STUDENT, status=EnrollmentStatus.ACTIVE),
+            CourseEnrollment(course_id=3, student_id=STUDENT, status=EnrollmentStatus.DROPPED),
+            CourseEnrollment(course_id=1, student_id=OTHER, status=EnrollmentStatus.ACTIVE),
+        ])
+        session.add_all([
+            Submission(task_id=1, student_id=STUDENT, status=SubmissionStatus.SUBMITTED),
+            Submission(task_id=4, student_id=STUDENT, status=SubmissionStatus.GRADED),
+            Submission(task_id=2, student_id=OTHER, status=SubmissionStatus.SUBMITTED),
+        ])
+        await session.commit()
+    return session_factory
+
+
+async def _pending(factory, student_id: int = STUDENT) -> tuple[int, int]:
+    """返回 (待完成数, 执行的 SQL 条数)。"""
+    async with factory() as session:
+        with count_queries() as stats:
+            count = await crud_scores.get_student_pending_task_count(session, student_id)
+    return count, stats.count
+
+
+@pytest.mark.asyncio
+async def test_pending_count_is_one_query_and_cached(session_factory):
+    assert await _pending(session_factory) == (4, 1)
+    assert await _pending(session_factory) == (4, 0)
+    assert await _pending(session_factory, OTHER) == (2, 1)
+
+    # 查询期间发生失效时，读到的旧值不写回缓存
+    pending_task_cache.invalidate(STUDENT)
+    generation = pending_task_cache.generation
+    pending_task_cache.invalidate(OTHER)
+    pending_task_cache.put(STUDENT, 99, generation)
+    assert pending_task_cache.get(STUDENT) is None
+
+
+@pytest.mark.asyncio
+async def test_pending_count_follows_writes(session_factory):
+    factory = session_factory
+    assert (await _pending(factory))[0] == 4
+
+    async with factory() as session:
+        task = await crud_tasks.create_task(
+            session, 1, TaskCreate(teacher_id=1, title="New", type=TaskType.ASSIGNMENT)
+        )
+    assert (await _pending(factory))[0] == 5
+
+    async with factory() as session:
+        await crud_tasks.submit_task(session, task.id, SubmissionCreate(student_id=STUDENT))
+    assert (await _pending(factory))[0] == 4
+    async with factory() as session:
+        await crud_tasks.submit_task(session, task.id, SubmissionCreate(student_id=STUDENT, answer_text="v2"))
+    assert await _pending(factory) == (4, 0)  # 重新提交不改变计数，缓存保留
+
+    async with factory() as session:
+        await crud_tasks.delete_task(session, 2)
+    assert (await _pending(factory))[0] == 3
+
+    async with factory() as session:
+        await crud_enrollments.drop_course(session, 2, STUDENT)
+    assert (await _pending(factory))[0] == 1
+    async with factory() as session:
+        await crud_enrollments.enroll_student(session, 3, STUDENT)
+    assert (await _pending(factory))[0] == 4
+
+    async with factory() as session:
+        assert await crud_scores.count_student_pending_tasks(session, STUDENT) == 4
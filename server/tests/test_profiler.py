@@ -0,0 +1,63 @@
+"""
+Test cases for the per-request sampling profiler
+"""
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+from app.core.profiler import RequestProfiler, categorize
+
+
+async def busy_handler():
+    deadline = time.perf_counter() + 0.05
+    while time.perf_counter() < deadline:  # 模拟接口中的计算
+        pass
+
+
+async def other_request():
+    deadline = time.perf_counter() + 0.05
+    while time.perf_counter() < deadline:
+        pass
+
+
+@pytest.mark.asyncio
+async def test_only_samples_the_profiled_request():
+    profiler = RequestProfiler(max_concurrent=1, interval_ms=1)
+
+    async def profiled_request():
+        assert profiler.try_acquire()
+        assert not profiler.try_acquire()
+        session = profiler.begin(sys._getframe())
+        started = time.perf_counter()
+        await busy_handler()
+        await asyncio.sleep(0.02)
+        await busy_handler()
+        return profiler.finish(
+            session, method="GET", route="/x", status_code=200,
+            wall_ms=(time.perf_counter() - started) * 1000, db_ms=None, query_count=None,
+        )
+
+    profile, _ = await asyncio.gather(profiled_request(), other_request())
+
+    assert profile["samples"] > 0
+    names = [child["name"] for child in profile["tree"]["children"]]
+    assert any(name.startswith("busy_handler") for name in names)
+    assert not any(name.startswith("other_request") for name in names)
+    assert profiler.get(profile["id"]) is profile
+    assert "tree" not in profiler.summaries()[0]
+    assert profiler.stats()["active"] == 0
+    assert profiler.stats()["rejected_busy"] == 1
+
+
+def test_categorize_uses_innermost_known_frame():
+    app_dir = os.path.join("server", "app")
+    orm = os.path.join("site-packages", "sqlalchemy", "orm", "session.py")
+    pydantic = os.path.join("site-packages", "pydantic", "main.py")
+
+    assert categorize([os.path.join(app_dir, "routers", "courses.py"), orm]) == "orm"
+    assert categorize([os.path.join(app_dir, "routers", "courses.py"), pydantic]) == "serialization"
+    assert categorize([os.path.join(app_dir, "routers", "courses.py"), "<frozen abc>"]) == "router"
+    assert categorize(["<frozen abc>"]) == "other"
@@ -0,0 +1,58 @@
+"""
+Test cases for the per-request query counter and N+1 detection
+"""
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.query_counter import QueryCounter, count_queries
+from app.db.base import Base
+from app.models import Role
+
+
+@pytest_asyncio.fixture
+async def engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'queries.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_counts_only_inside_context(engine):
+    counter = QueryCounter(n_plus_one_threshold=3)
+    counter.install(engine)
+    async with engine.connect() as conn:
+        await conn.execute(select(Role))
+        with count_queries() as stats:
+            await conn.execute(select(Role))
+            await conn.execute(select(Role.id))
+        await conn.execute(select(Role))
+
+    assert stats.count == 2
+    assert stats.duration_ms > 0
+    assert counter.finish(stats, "GET /roles") == []
+    assert counter.stats()["queries"] == 2
+
+
+@pytest.mark.asyncio
+async def test_repeated_statement_flagged(engine):
+    counter = QueryCounter(n_plus_one_threshold=3)
+    counter.install(engine)
+    async with engine.connect() as conn:
+        with count_queries() as stats:
+            for role_id in range(4):
+                await conn.execute(select(Role).where(Role.id == role_id))
+
+    repeated = counter.finish(stats, "GET /roles")
+    assert len(repeated) == 1 and repeated[0][1] == 4
+    assert counter.suspects()[0]["route"] == "GET /roles"
+    assert counter.stats()["flagged_requests"] == 1
+
+    counter.uninstall(engine)
+    with count_queries() as stats:
+        async with engine.connect() as conn:
+            await conn.execute(select(Role))
+    assert stats.count == 0
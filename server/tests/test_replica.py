@@ -0,0 +1,183 @@
+"""
+Test cases for read-replica routing; two SQLite files stand in for primary and replica
+"""
+import time
+
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.base import Base
+from app.db.replica import PIN_COOKIE, PIN_UNTIL_KEY, ReplicaRouter, request_pin_cookie, request_pin_key
+from app.middleware.replica_pin import ReplicaPinMiddleware
+from app.middleware.request_context import RequestContextMiddleware, current_scope
+from app.models import DbHeartbeat, Role
+
+
+@pytest_asyncio.fixture
+async def primary_and_replica(tmp_path):
+    primary = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}")
+    replica = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+    for engine in (primary, replica):
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    yield primary, replica
+    await primary.dispose()
+    await replica.dispose()
+
+
+def _factory(engine, session_class=Session):
+    return sessionmaker(bind=engine, class_=AsyncSession, sync_session_class=session_class, expire_on_commit=False)
+
+
+async def _set_replica_heartbeat(replica, beat_at: float) -> None:
+    async with _factory(replica)() as session:
+        await session.merge(DbHeartbeat(id=1, beat_at=beat_at))
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_replica_used_only_when_heartbeat_is_fresh(primary_and_replica):
+    primary, replica = primary_and_replica
+    router = ReplicaRouter(max_lag_seconds=5)
+
+    await router.check(_factory(primary), replica)
+    assert not router.available  # nothing replicated yet
+    assert not router.use_replica(None)
+
+    await _set_replica_heartbeat(replica, time.time())
+    await router.check(_factory(primary), replica)
+    assert router.available and router.lag_seconds < 5
+    assert router.use_replica(None)
+
+    await _set_replica_heartbeat(replica, time.time() - 60)
+    await router.check(_factory(primary), replica)
+    assert not router.available and router.lag_seconds >= 60
+    assert not router.use_replica(None)
+    assert router.stats()["fallback_reads"] == 2
+
+
+@pytest.mark.asyncio
+async def test_unreachable_replica_falls_back(primary_and_replica, tmp_path):
+    primary, _ = primary_and_replica
+    missing = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    router = ReplicaRouter()
+    router.available = True
+
+    await router.check(_factory(primary), missing)
+    assert not router.available
+    assert router.last_error
+    await missing.dispose()
+
+
+@pytest.mark.asyncio
+async def test_writer_is_pinned_to_primary(primary_and_replica):
+    primary, _ = primary_and_replica
+    router = ReplicaRouter(pin_seconds=60)
+    router.available = True
+    tracked_session = type("TrackedSession", (Session,), {})
+    router.track_writes(tracked_session)
+    factory = _factory(primary, tracked_session)
+
+    writer_scope = {"type": "http", "headers": [(b"authorization", b"Bearer writer")]}
+    reader_scope = {"type": "http", "headers": [(b"authorization", b"Bearer reader")]}
+
+    token = current_scope.set(reader_scope)
+    async with factory() as session:
+        await session.get(Role, 1)  # a read-only transaction does not pin
+        await session.commit()
+    reader_key = request_pin_key()
+    current_scope.reset(token)
+
+    token = current_scope.set(writer_scope)
+    async with factory() as session:
+        session.add(Role(id=1, name="student"))
+        await session.commit()
+        await session.execute(update(Role).values(name="learner"))
+        await session.commit()
+    writer_key = request_pin_key()
+    current_scope.reset(token)
+
+    assert not router.use_replica(writer_key)
+    assert router.use_replica(reader_key)
+    assert router.stats()["pinned_reads"] == 1
+    assert PIN_UNTIL_KEY in writer_scope and PIN_UNTIL_KEY not in reader_scope
+
+
+@pytest.mark.asyncio
+async def test_untracked_sessions_do_not_pin(primary_and_replica):
+    primary, replica = primary_and_replica
+    router = ReplicaRouter(pin_seconds=60)
+    router.available = True
+    router.track_writes(type("TrackedSession", (Session,), {}))
+
+    scope = {"type": "http", "headers": [(b"authorization", b"Bearer writer")]}
+    token = current_scope.set(scope)
+    for engine in (primary, replica):  # 普通 Session（从库会话用的类）不受影响
+        async with _factory(engine)() as session:
+            session.add(Role(id=1, name="student"))
+            await session.commit()
+    key = request_pin_key()
+    current_scope.reset(token)
+
+    assert router.use_replica(key)
+    assert PIN_UNTIL_KEY not in scope
+
+
+def test_pin_cookie_is_bounded_by_pin_seconds():
+    router = ReplicaRouter(pin_seconds=5)
+    router.available = True
+    now = time.time()
+    assert not router.use_replica(None, now + 3)
+    assert router.use_replica(None, now - 1)  # 已过期
+    assert router.use_replica(None, now + 3600)  # 不是本服务下发的截止时间
+    assert router.stats()["pinned_reads"] == 1
+
+
+@pytest.mark.asyncio
+async def test_pin_cookie_reaches_other_workers(primary_and_replica):
+    primary, _ = primary_and_replica
+    tracked_session = type("TrackedSession", (Session,), {})
+    factory = _factory(primary, tracked_session)
+    # 两个 router 代表两个 worker 进程，各自有独立的进程内固定表
+    writer_worker = ReplicaRouter(pin_seconds=5)
+    writer_worker.track_writes(tracked_session)
+    reader_worker = ReplicaRouter(pin_seconds=5)
+    reader_worker.available = True
+    seen = {}
+
+    app = FastAPI()
+
+    @app.post("/roles")
+    async def create_role():
+        async with factory() as session:
+            session.add(Role(id=1, name="student"))
+            await session.commit()
+        return {}
+
+    @app.get("/roles")
+    async def list_roles():
+        seen["use_replica"] = reader_worker.use_replica(request_pin_key(), request_pin_cookie())
+        async with factory() as session:
+            return {"names": (await session.execute(select(Role.name))).scalars().all()}
+
+    app.add_middleware(ReplicaPinMiddleware, router=writer_worker)
+    app.add_middleware(RequestContextMiddleware)
+
+    headers = {"Authorization": "Bearer writer"}
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/roles", headers=headers)
+        assert PIN_COOKIE not in response.cookies
+        assert seen["use_replica"]
+
+        response = await client.post("/roles", headers=headers)
+        assert "Max-Age=5" in response.headers["set-cookie"]
+
+        response = await client.get("/roles", headers=headers)
+        assert response.json() == {"names": ["student"]}
+        assert not seen["use_replica"]
+    assert reader_worker.stats()["pinned_reads"] == 1
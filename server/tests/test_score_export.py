@@ -0,0 +1,75 @@
+"""
+Test cases for the streaming course score CSV export
+"""
+import csv
+import io
+
+import pytest
+import pytest_asyncio
+from fastapi import Depends, FastAPI
+from fastapi.responses import StreamingResponse
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud import scores as crud_scores
+from app.models import Course, Submission, SubmissionStatus, Task, TaskType, User
+
+
+@pytest_asyncio.fixture
+async def session_factory(session_factory):
+    async with session_factory() as session:
+        session.add(User(id=1, username="teacher", password_hash="x", role_id=2))
+        session.add_all([User(id=10 + i, username=f"student{i}", password_hash="x", role_id=1) for i in range(3)])
+        session.add_all([Course(id=1, teacher_id=1, title="DB"), Course(id=2, teacher_id=1, title="OS")])
+        session.add_all([
+            Task(id=1, course_id=1, teacher_id=1, title="SQL basics", type=TaskType.ASSIGNMENT),
+            Task(id=2, course_id=1, teacher_id=1, title="Joins, indexes", type=TaskType.ASSIGNMENT),
+            Task(id=3, course_id=2, teacher_id=1, title="Other course", type=TaskType.ASSIGNMENT),
+        ])
+        for task_id in (1, 2, 3):
+            for student_id in (12, 10, 11):
+                session.add(Submission(
+                    task_id=task_id,
+                    student_id=student_id,
+                    answer_text="x" * 1000,
+                    score=90 if student_id == 10 else None,
+                    status=SubmissionStatus.GRADED if student_id == 10 else SubmissionStatus.SUBMITTED,
+                ))
+        await session.commit()
+    return session_factory
+
+
+@pytest.mark.asyncio
+async def test_csv_streamed_in_batches(session_factory):
+    async with session_factory() as session:
+        chunks = [chunk async for chunk in crud_scores.stream_scores_csv(session, 1, batch_rows=2)]
+
+    assert len(chunks) == 1 + 3  # 表头 + 6 行按每批 2 行
+    rows = list(csv.reader(io.StringIO("".join(chunks))))
+    assert rows[0] == crud_scores.SCORE_EXPORT_COLUMNS
+    assert [(row[2], row[4]) for row in rows[1:]] == [
+        ("1", "10"), ("1", "11"), ("1", "12"), ("2", "10"), ("2", "11"), ("2", "12"),
+    ]
+    assert rows[4][3] == "Joins, indexes"
+    assert rows[1][5:7] == ["90.00", "graded"]
+    assert rows[2][5:7] == ["", "submitted"]
+
+
+@pytest.mark.asyncio
+async def test_streaming_response_keeps_session_open(session_factory):
+    app = FastAPI()
+
+    async def get_session():
+        async with session_factory() as session:
+            yield session
+
+    @app.get("/courses/{course_id}/scores/export")
+    async def export(course_id: int, db: AsyncSession = Depends(get_session)):
+        return StreamingResponse(crud_scores.stream_scores_csv(db, course_id, batch_rows=1), media_type="text/csv")
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/courses/2/scores/export")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert len(response.text.splitlines()) == 1 + 3
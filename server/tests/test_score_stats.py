@@ -0,0 +1,136 @@
+"""
+Test cases for incrementally maintained score statistics
+"""
+import asyncio
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete, func, select
+
+from app.core.query_counter import count_queries
+from app.crud import score_stats
+from app.crud import tasks as crud_tasks
+from app.crud.crud_course import course as crud_course
+from app.models import (
+    Course, CourseEnrollment, EnrollmentStatus, ScoreStats, Submission, SubmissionStatus, Task, TaskType, User,
+)
+from app.schemas.submissions import GradeUpdate, SubmissionCreate
+
+STUDENTS = range(10, 20)
+
+
+@pytest_asyncio.fixture
+async def session_factory(session_factory):
+    async with session_factory() as session:
+        session.add(User(id=1, username="teacher", password_hash="x", role_id=2))
+        session.add_all([User(id=sid, username=f"s{sid}", password_hash="x", role_id=1) for sid in STUDENTS])
+        session.add(Course(id=1, teacher_id=1, title="DB"))
+        session.add_all([
+            Task(id=1, course_id=1, teacher_id=1, title="SQL", type=TaskType.ASSIGNMENT),
+            Task(id=2, course_id=1, teacher_id=1, title="Exam", type=TaskType.EXAM),
+        ])
+        session.add_all([
+            CourseEnrollment(course_id=1, student_id=sid, status=EnrollmentStatus.ACTIVE) for sid in STUDENTS
+        ])
+        await session.commit()
+    return session_factory
+
+
+async def _submit_and_grade(factory, task_id: int, student_id: int, score) -> int:
+    async with factory() as session:
+        submission = await crud_tasks.submit_task(session, task_id, SubmissionCreate(student_id=student_id))
+    async with factory() as session:
+        submission = await crud_tasks.get_submission_with_course(session, submission.id)
+        await crud_tasks.apply_grade(session, submission, GradeUpdate(score=Decimal(score)))
+    return submission.id
+
+
+async def _rebuilt(factory) -> dict:
+    async with factory() as session:
+        await score_stats.rebuild_score_stats(session)
+        await session.commit()
+        return await score_stats.get_course_score_stats(session, 1)
+
+
+@pytest.mark.asyncio
+async def test_incremental_stats_match_rebuild(session_factory):
+    for index, student_id in enumerate(STUDENTS):
+        await _submit_and_grade(session_factory, 1, student_id, 50 + index * 5)  # 50, 55, ..., 95
+    regraded = await _submit_and_grade(session_factory, 2, 10, 100)
+    await _submit_and_grade(session_factory, 2, 11, "60.5")
+    async with session_factory() as session:
+        await crud_tasks.submit_task(session, 2, SubmissionCreate(student_id=12))  # 未评分
+        await crud_tasks.submit_task(session, 2, SubmissionCreate(student_id=12))  # 重新提交，不重复计数
+    async with session_factory() as session:  # 改掉最高分，最大值需要重新查询
+        submission = await crud_tasks.get_submission_with_course(session, regraded)
+        await crud_tasks.apply_grade(session, submission, GradeUpdate(score=Decimal(70)))
+
+    async with session_factory() as session:
+        with count_queries() as stats:
+            incremental = await score_stats.get_course_score_stats(session, 1)
+    assert stats.count == 2
+
+    task1, task2 = incremental["tasks"]
+    assert (task1["submissions"], task1["graded"], task1["mean"]) == (10, 10, 72.5)
+    assert (task1["min"], task1["max"]) == (50.0, 95.0)
+    assert task1["variance"] == 206.25
+    assert abs(task1["percentiles"]["p50"] - 70) <= 1  # 第 5 个分数，直方图误差不超过 1 分
+    assert task1["distribution"]["counts"] == [0, 0, 0, 0, 0, 2, 2, 2, 2, 2]
+    assert (task2["submissions"], task2["graded"], task2["max"]) == (3, 2, 70.0)
+    assert (incremental["submissions"], incremental["graded"], incremental["max"]) == (13, 12, 95.0)
+    assert incremental == await _rebuilt(session_factory)
+
+
+@pytest.mark.asyncio
+async def test_deleting_task_updates_course_stats(session_factory):
+    await _submit_and_grade(session_factory, 1, 10, 40)
+    await _submit_and_grade(session_factory, 2, 10, 90)
+    async with session_factory() as session:
+        await crud_tasks.delete_task(session, 2)
+
+    async with session_factory() as session:
+        stats = await score_stats.get_course_score_stats(session, 1)
+    assert (stats["submissions"], stats["graded"], stats["min"], stats["max"]) == (1, 1, 40.0, 40.0)
+    assert [task["task_id"] for task in stats["tasks"]] == [1]
+    assert stats == await _rebuilt(session_factory)
+
+    # 统计行随课程、作业删除；SQLite 复用被删除的 id 时重新插入不冲突
+    async with session_factory() as session:
+        await crud_course.remove(session, id=1)
+        assert (await session.execute(select(func.count()).select_from(ScoreStats))).scalar_one() == 0
+        session.add(Course(id=1, teacher_id=1, title="DB again"))
+        session.add(Task(id=1, course_id=1, teacher_id=1, title="SQL", type=TaskType.ASSIGNMENT))
+        await session.commit()
+        assert (await score_stats.get_course_score_stats(session, 1))["tasks"][0]["submissions"] == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_first_submissions(session_factory):
+    async def first_submission(student_id: int) -> None:
+        async with session_factory() as session:
+            await score_stats.record_submission(session, await session.get(Task, 1))
+            session.add(Submission(task_id=1, student_id=student_id, status=SubmissionStatus.SUBMITTED))
+            await session.commit()
+
+    await asyncio.gather(*(first_submission(student_id) for student_id in STUDENTS))
+
+    async with session_factory() as session:
+        stats = await score_stats.get_course_score_stats(session, 1)
+    assert stats["submissions"] == stats["tasks"][0]["submissions"] == len(STUDENTS)
+    assert stats == await _rebuilt(session_factory)
+
+
+@pytest.mark.asyncio
+async def test_missing_row_is_recomputed_under_lock(session_factory):
+    await _submit_and_grade(session_factory, 1, 10, 80)
+    async with session_factory() as session:
+        await session.execute(delete(ScoreStats).where(ScoreStats.scope == score_stats.TASK))
+        await session.commit()
+
+    await _submit_and_grade(session_factory, 1, 11, 60)
+    async with session_factory() as session:
+        stats = await score_stats.get_course_score_stats(session, 1)
+    assert (stats["tasks"][0]["graded"], stats["tasks"][0]["mean"]) == (2, 70.0)
+    assert stats["tasks"][1]["submissions"] == 0  # 作业 2 的行缺失时读取按空统计返回，不临时计算
+    assert stats == await _rebuilt(session_factory)
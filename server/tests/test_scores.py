@@ -40,3 +40,10 @@ async def test_export_scores(client: AsyncClient, teacher_headers: Dict[str, str
     assert response.headers["content-type"] == "text/csv"
     # Check if content looks like CSV
     assert "," in response.text or len(response.text) == 0 # Empty CSV is possible
+
+
+@pytest.mark.asyncio
+async def test_course_aggregates_unknown_course(client: AsyncClient, admin_headers: Dict[str, str]):
+    for path in ("gradebook", "score-stats"):
+        response = await client.get(f"/courses/999999/{path}", headers=admin_headers)
+        assert response.status_code == 404
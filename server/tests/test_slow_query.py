@@ -0,0 +1,53 @@
+"""
+Test cases for the slow-query recorder (threshold, sampling, parameter shape, JSONL output)
+"""
+import json
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.slow_query import SlowQueryRecorder
+
+
+@pytest.mark.asyncio
+async def test_records_queries_over_threshold_without_values(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'q.db'}")
+    log_path = tmp_path / "slow.jsonl"
+    recorder = SlowQueryRecorder(threshold_ms=0, max_entries=2, log_path=str(log_path))
+    recorder.install(engine)
+
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT :secret"), {"secret": "hunter2"})
+        await conn.execute(text("SELECT 1"))
+        await conn.execute(text("SELECT 2"))
+
+    records = recorder.records()
+    assert [r["statement"] for r in records] == ["SELECT 2", "SELECT 1"]
+    assert recorder.stats()["slow"] == 3
+
+    lines = log_path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 3
+    first = json.loads(lines[0])
+    assert first["params"] == 1
+    assert "hunter2" not in lines[0]
+    assert first["route"] is None
+
+    recorder.uninstall(engine)
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_fast_queries_are_sampled(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'q.db'}")
+    skipped = SlowQueryRecorder(threshold_ms=10_000, sample_rate=0.0)
+    sampled = SlowQueryRecorder(threshold_ms=10_000, sample_rate=1.0)
+    skipped.install(engine)
+    sampled.install(engine)
+
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+    assert skipped.records() == [] and skipped.stats()["queries"] == 1
+    assert len(sampled.records()) == 1 and sampled.records()[0]["slow"] is False
+    await engine.dispose()
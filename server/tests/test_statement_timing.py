@@ -0,0 +1,52 @@
+"""
+Test cases for the shared statement-timing hook and the newest-first ring helper
+"""
+from collections import deque
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.ring_buffer import newest_first
+from app.core.statement_timing import StatementTimer
+
+
+@pytest.mark.asyncio
+async def test_one_listener_pair_publishes_to_every_subscriber(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'q.db'}")
+    timer = StatementTimer()
+    first, second = [], []
+
+    def record_first(cursor, statement, parameters, executemany, started, ended):
+        first.append((statement, ended - started))
+
+    def record_second(cursor, statement, parameters, executemany, started, ended):
+        second.append(statement)
+
+    timer.subscribe(engine, record_first)
+    timer.subscribe(engine, record_first)  # 重复订阅不会重复发布
+    timer.subscribe(engine, record_second)
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+    assert [statement for statement, _ in first] == ["SELECT 1"] and first[0][1] >= 0
+    assert second == ["SELECT 1"]
+
+    timer.unsubscribe(engine, record_first)
+    assert event.contains(engine.sync_engine, "after_cursor_execute", timer._after)
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 2"))
+    assert len(first) == 1 and second == ["SELECT 1", "SELECT 2"]
+
+    timer.unsubscribe(engine, record_second)
+    assert not event.contains(engine.sync_engine, "before_cursor_execute", timer._before)
+    assert not event.contains(engine.sync_engine, "after_cursor_execute", timer._after)
+    await engine.dispose()
+
+
+def test_newest_first():
+    records = deque([1, 2, 3, 4], maxlen=3)
+    records.append(5)
+    assert newest_first(records) == [5, 4, 3]
+    assert newest_first(records, 2) == [5, 4]
+    assert newest_first(records, 0) == [] and newest_first(records, -1) == []
+    assert newest_first(deque(), 5) == []
@@ -0,0 +1,113 @@
+"""
+Test cases for request tracing spans and traceparent propagation
+"""
+import json
+import types
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from httpx import ASGITransport, AsyncClient
+from pydantic import BaseModel
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.tracing import Tracer, parse_traceparent
+from app.middleware.tracing import TracingMiddleware
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+class Grade(BaseModel):
+    id: int
+    score: int
+
+
+def _app(tracer: Tracer, engine) -> FastAPI:
+    crud = types.ModuleType("fake_crud")
+
+    async def get_grade(grade_id: int) -> dict:
+        async with engine.connect() as conn:
+            score = (await conn.execute(text("SELECT 90"))).scalar()
+        return {"id": grade_id, "score": score}
+
+    get_grade.__module__ = crud.__name__
+    crud.get_grade = get_grade
+    tracer.instrument_module(crud, "crud.grades")
+
+    router = APIRouter()
+
+    @router.get("/grades/{grade_id}", response_model=Grade)
+    async def read_grade(grade_id: int):
+        return await crud.get_grade(grade_id)
+
+    tracer.instrument_router(router)
+    app = FastAPI()
+    app.include_router(router, prefix="/api/v1")
+    app.add_middleware(TracingMiddleware, tracer=tracer)
+    return app
+
+
+@pytest.mark.asyncio
+async def test_spans_follow_incoming_traceparent(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'trace.db'}")
+    export_path = tmp_path / "traces.jsonl"
+    tracer = Tracer(sample_rate=0.0, export_path=str(export_path))
+    tracer.install(engine)
+    transport = ASGITransport(app=_app(tracer, engine))
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/api/v1/grades/7", headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"})
+        assert response.json() == {"id": 7, "score": 90}
+        assert response.headers["X-Trace-Id"] == TRACE_ID
+        # 未带 traceparent 且抽样率为 0：不记录
+        response = await client.get("/api/v1/grades/8")
+        assert "X-Trace-Id" not in response.headers
+    await engine.dispose()
+
+    trace = tracer.get(TRACE_ID)
+    assert trace["name"] == "GET /api/v1/grades/{grade_id}"
+    assert trace["parent_span_id"] == PARENT_ID
+    assert trace["status_code"] == 200
+    spans = {span["name"]: span for span in trace["spans"]}
+    root = spans["GET /api/v1/grades/{grade_id}"]
+    handler = spans["handler.test_tracing.read_grade"]
+    crud_span = spans["crud.grades.get_grade"]
+    assert root["parent_id"] == PARENT_ID
+    assert handler["parent_id"] == root["span_id"]
+    assert crud_span["parent_id"] == handler["span_id"]
+    assert any(span["name"] == "sql" and span["parent_id"] == crud_span["span_id"] for span in trace["spans"])
+    assert spans["serialize_response"]["parent_id"] == root["span_id"]
+
+    assert tracer.stats()["requests"] == 2
+    assert tracer.stats()["sampled"] == 1
+    # 导出只入队，写文件由后台任务完成
+    assert not export_path.exists() and tracer.stats()["export_pending"] == 1
+    assert await tracer.flush() == 1
+    exported = [json.loads(line) for line in export_path.read_text().splitlines()]
+    assert [item["trace_id"] for item in exported] == [TRACE_ID]
+
+
+@pytest.mark.asyncio
+async def test_client_forced_sampling_is_capped_when_exporting(tmp_path):
+    traceparent = f"00-{TRACE_ID}-{PARENT_ID}-01"
+    exporting = Tracer(sample_rate=0.0, export_path=str(tmp_path / "traces.jsonl"), forced_samples_per_minute=2)
+    in_memory = Tracer(sample_rate=0.0, forced_samples_per_minute=2)
+    for tracer in (exporting, in_memory):
+        for _ in range(5):
+            root = tracer.start_trace("GET /", traceparent)
+            if root is not None:
+                tracer.end_trace(root)
+
+    assert exporting.stats()["sampled"] == 2 and exporting.stats()["forced_capped"] == 3
+    assert in_memory.stats()["sampled"] == 5  # 不写文件时只占用定长缓冲区，照常沿用采样标记
+
+    exporting.start()
+    await exporting.stop()
+    assert exporting.stats()["exported"] == 2 and exporting.stats()["export_pending"] == 0
+
+
+def test_parse_traceparent():
+    assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-01") == (TRACE_ID, PARENT_ID, True)
+    assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-00") == (TRACE_ID, PARENT_ID, False)
+    assert parse_traceparent(f"00-{'0' * 32}-{PARENT_ID}-01") is None
+    assert parse_traceparent("not-a-traceparent") is None
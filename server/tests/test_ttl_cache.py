@@ -0,0 +1,34 @@
+"""
+Test cases for the in-process TTL + LRU cache shared by the principal and pending-task caches
+"""
+import time
+
+from app.core.ttl_cache import TTLCache
+
+
+def test_lru_eviction_and_expiry(monkeypatch):
+    cache: TTLCache[int, str] = TTLCache(ttl_seconds=30, max_entries=2)
+    cache.put(1, "a")
+    cache.put(2, "b")
+    assert cache.get(1) == "a"  # 1 成为最近使用
+    cache.put(3, "c")
+    assert cache.get(2) is None and cache.get(1) == "a" and cache.get(3) == "c"
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 31)
+    assert cache.get(1) is None
+    assert cache.stats() == {"size": 1, "max_entries": 2, "ttl_seconds": 30, "hits": 3, "misses": 2}
+
+
+def test_invalidation_discards_stale_puts():
+    cache: TTLCache[int, int] = TTLCache(ttl_seconds=30, max_entries=10)
+    generation = cache.generation
+    cache.invalidate(1, 2)
+    cache.put(1, 5, generation)  # 查询期间发生了失效
+    assert cache.get(1) is None
+    cache.put(1, 6, cache.generation)
+    assert cache.get(1) == 6
+
+    disabled: TTLCache[int, int] = TTLCache(ttl_seconds=0, max_entries=10)
+    disabled.put(1, 1)
+    assert disabled.get(1) is None